@@ -4,18 +4,33 @@
 Defines plot_launch's commandline entry point functionality.
 """
 # Import built-in modules
-import sys
+import argparse
+import concurrent.futures
+import datetime
 import json
 import os
 import gc
 
 # Import third-party modules
-import matplotlib
+import numpy
 
 # Any changes to the path and your own modules
+# matplotlib and launch_plotter are imported where charts are drawn, so that --show does not
+# load them
 from plot_launch import constants
+from plot_launch import image_output
+from plot_launch import launch_index
 from plot_launch import launch_info
-from plot_launch import launch_plotter
+from plot_launch import memory_profile
+from plot_launch import period_cube
+from plot_launch import pipeline
+from plot_launch import render_cache
+from plot_launch import rolling_statistics
+from plot_launch import server
+from plot_launch import watch
+from plot_launch import year_statistics
+
+__version__ = constants.VERSION
 
 
 def main():
@@ -23,9 +38,50 @@ def main():
     Run plot_launch as a command-line program.
     :return None:
     """
+    parser = argparse.ArgumentParser(prog='plot_launch')
+    parser.add_argument('config', nargs='?',
+                        help='a JSON config file which contains a config or a list of configs')
+    parser.add_argument('--force', action='store_true',
+                        help='render every chart even if its outputs are up to date')
+    parser.add_argument('--verbosity', type=int, choices=(0, 1, 2),
+                        help='0 hides parsing anomalies, 1 summarises them, 2 lists every one')
+    parser.add_argument('--sequential', action='store_true',
+                        help='parse, render and write one at a time, the default on a single CPU'
+                             ' or for a single config')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and re-render the charts of changed data files')
+    parser.add_argument('--interval', type=float, default=watch.DEFAULT_POLL_INTERVAL,
+                        help='seconds between two scans when inotify is not available')
+    parser.add_argument('--serve', action='store_true',
+                        help='serve charts on demand over HTTP instead of reading a config')
+    parser.add_argument('--host', default=server.DEFAULT_HOST,
+                        help='the host for --serve to listen on')
+    parser.add_argument('--port', type=int, default=server.DEFAULT_PORT,
+                        help='the port for --serve to listen on')
+    parser.add_argument('--cache-bytes', type=int, default=server.DEFAULT_CACHE_BYTES,
+                        help='the maximum total size of the images cached by --serve')
+    parser.add_argument('--show', metavar='编号',
+                        help='print the launch of an identifier from the data and exit')
+    args = parser.parse_args()
+
+    if args.show is not None:
+        text = show_launch(data_dir=constants.DATA_PATH, identifier=args.show)
+        if text is None:
+            parser.exit(1, '{identifier} not found\n'.format(identifier=args.show))
+        print(text)
+        return
+
+    import matplotlib  # pylint: disable=import-outside-toplevel
     matplotlib.use('Agg')
-    if len(sys.argv) > 1:
-        with open(sys.argv[1], encoding='utf-8') as config_file:
+    if args.serve:
+        server.serve(data_dir=constants.DATA_PATH,
+                     host=args.host,
+                     port=args.port,
+                     max_bytes=args.cache_bytes)
+        return
+
+    if args.config:
+        with open(args.config, encoding='utf-8') as config_file:
             config_obj = json.load(config_file)
     else:
         config_obj = None
@@ -33,110 +89,351 @@ def main():
     if not isinstance(config_obj, list):
         config_obj = [config_obj]
 
+    if args.watch:
+        watch.watch_data(config_list=config_obj,
+                         data_dir=constants.DATA_PATH,
+                         plot_function=plot_launch_info_lists,
+                         force=args.force,
+                         interval=args.interval,
+                         verbosity=args.verbosity)
+        return
+
+    if not args.sequential and len(config_obj) > 1 and (os.cpu_count() or 1) > 1:
+        # a single config has nothing to overlap, the loader process would only add the cost
+        # of pickling its data back
+        pipeline.run_pipeline(config_list=config_obj,
+                              data_dir=constants.DATA_PATH,
+                              plot_function=plot_launch_info_lists,
+                              force=args.force,
+                              verbosity=args.verbosity)
+        return
+
     for config_dict in config_obj:
         config_dict = launch_info.prcs_config_dict(config_dict)
+        if args.force:
+            config_dict['force'] = True
+        if args.verbosity is not None:
+            config_dict['diagnostics'].verbosity = args.verbosity
         plot_config(config_dict)
 
 
+def show_launch(data_dir,
+                identifier):
+    """
+    Look up a launch by its identifier in the launch index of every data file.
+    :param data_dir: A directory path contains several raw data files.
+    :param identifier: The '编号' of a launch.
+    :return text: The raw record of the launch, or None if it is not found.
+    """
+    launch_info_lists = launch_info.get_launch_info_from_files(
+        data_dir, config_dict={'time_filter': [datetime.datetime.min, datetime.datetime.max]})
+    index = launch_index.LaunchIndex(launch_info_lists)
+    i = index.get(identifier)
+    if i is None:
+        return None
+    return index.get_text(i)
+
+
+def render_chart(plot_function,
+                 filename_key,
+                 data_digest,
+                 last_time,
+                 config_dict,
+                 **kwargs):
+    """
+    Render a chart by plot_function unless its outputs already carry the same fingerprint.
+    :param plot_function: A plot_launch_* function from launch_plotter.
+    :param filename_key: The key of the chart filename in config_dict, e.g. 'step_filename'.
+    :param data_digest: The digest of the input data slice from render_cache.get_prefix_digests.
+    :param last_time: The datetime of the latest launch in the data slice, or None.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :param kwargs: Other arguments passed to plot_function.
+    :return result: True if the chart has been rendered.
+    """
+    if not config_dict.get('render_cache', True):
+        plot_function(config_dict=config_dict, **kwargs)
+        return True
+
+    fingerprint = render_cache.get_fingerprint(data_digest=data_digest,
+                                               last_time=last_time,
+                                               filename_key=filename_key,
+                                               config_dict=config_dict)
+    filename = config_dict[filename_key]
+    if not config_dict.get('force') and \
+            render_cache.is_up_to_date(filename, fingerprint, config_dict):
+        return False
+    plot_function(config_dict=config_dict, **kwargs)
+    image_writer = config_dict.get('image_writer')
+    if image_writer is None:
+        render_cache.store_fingerprint(filename, fingerprint)
+    else:
+        # after the images, as the writer runs its tasks in order
+        image_writer.submit(render_cache.store_fingerprint, filename, fingerprint)
+    return True
+
+
+def render_charts(job_list,
+                  render_threads=1):
+    """
+    Render several charts by render_chart, on a thread pool if render_threads is above 1.
+    Charts are rendered one at a time while profiling memory, so that every chart is measured
+    alone.
+    :param job_list: A list of (plot_function, filename_key, data_digest, last_time,
+    config_dict, kwargs) tuples.
+    :param render_threads: The number of threads to render on.
+    :return None:
+    """
+    if render_threads <= 1 or len(job_list) <= 1 or \
+            any('memory_profiler' in job[4] for job in job_list):
+        for *args, kwargs in job_list:
+            filename_key, config_dict = args[1], args[4]
+            with memory_profile.measure(config_dict, 'chart:{key}:{filename}'.format(
+                    key=filename_key, filename=os.path.basename(str(config_dict[filename_key])))):
+                render_chart(*args, **kwargs)
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=render_threads) as executor:
+        future_list = [executor.submit(render_chart, *args, **kwargs)
+                       for *args, kwargs in job_list]
+        for future in future_list:
+            future.result()
+
+
 def plot_config(config_dict):
     """
     Plot by config.
     :param config_dict: A dictionary to control the plotting procedure.
     :return None:
     """
-    launch_info_lists = launch_info.get_launch_info_from_files(constants.DATA_PATH,
-                                                               config_dict=config_dict)
-    # info_set = set()
-    # for data_dict in launch_info_lists.data_dicts:
-    #     info_set = info_set | set(data_dict.keys())
+    with memory_profile.measure(config_dict, 'parse'):
+        launch_info_lists = launch_info.get_launch_info_from_files(constants.DATA_PATH,
+                                                                   config_dict=config_dict)
+    config_dict['diagnostics'].report(config_dict.get('diagnostics_report'))
+    plot_launch_info_lists(launch_info_lists=launch_info_lists, config_dict=config_dict)
 
-    if config_dict['group_by'] == '火箭制造方':
-        group_text = '火箭制造方\n国家/地区'
-        group_list = launch_info_lists.launcher_man_country
-    elif config_dict['group_by'] == '发射提供方':
-        group_text = '发射提供方\n公司/组织'
-        group_list = launch_info_lists.launch_provider
-    else:
-        return
 
-    if 'image_seq' not in config_dict:
-        launch_statistics = launch_plotter.LaunchStatistics(
-            launch_info_lists=launch_info_lists,
-            group_list=group_list,
-            group_text=group_text)
-
-        if 'step_filename' in config_dict:
-            launch_plotter.plot_launch_times(launch_statistics=launch_statistics,
-                                             launch_info_lists=launch_info_lists,
-                                             config_dict=config_dict)
-        if 'energy_step_filename' in config_dict:
-            launch_plotter.plot_launch_energy(launch_statistics=launch_statistics,
-                                              config_dict=config_dict)
-        if 'r_energy_step_filename' in config_dict:
-            launch_plotter.plot_launch_r_energy(launch_statistics=launch_statistics,
-                                                config_dict=config_dict)
-        if 'delta_v_step_filename' in config_dict:
-            launch_plotter.plot_launch_delta_v(launch_statistics=launch_statistics,
-                                               config_dict=config_dict)
+def get_chart_jobs(launch_info_lists,
+                   group_list,
+                   group_text,
+                   config_dict):
+    """
+    Get the statistics of every chart of a config, except image_seq, as render_charts jobs.
+    :param launch_info_lists: A LaunchInfoLists object loaded for config_dict.
+    :param group_list: A group to segment launch data.
+    :param group_text: A text string to describe the group.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return job_list: A list of jobs for render_charts.
+    """
+    from plot_launch import launch_plotter  # pylint: disable=import-outside-toplevel
+    launch_statistics = launch_plotter.LaunchStatistics(
+        launch_info_lists=launch_info_lists,
+        group_list=group_list,
+        group_text=group_text)
+    data_digest = render_cache.get_prefix_digests(launch_info_lists)[-1]
+    last_time = launch_info_lists.time[-1] if launch_info_lists.time else None
 
-        if 'mass_step_filename' in config_dict:
-            launch_plotter.plot_launch_mass(launch_statistics=launch_statistics,
-                                            config_dict=config_dict)
+    job_list = []
+    if 'step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_times, 'step_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics,
+                          'launch_info_lists': launch_info_lists}))
+    if 'energy_step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_energy, 'energy_step_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics}))
+    if 'r_energy_step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_r_energy, 'r_energy_step_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics}))
+    if 'delta_v_step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_delta_v, 'delta_v_step_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics}))
 
-        if 'bar_filename' in config_dict:
-            launch_plotter.plot_launch_bar(launch_statistics=launch_statistics,
-                                           config_dict=config_dict)
+    if 'mass_step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_mass, 'mass_step_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics}))
 
-        if 'latest_month_bar' in config_dict:
-            new_lists = launch_info.LaunchInfoLists()
-            i, j = launch_info_lists.get_slice_from_datetime(
-                datetime_start=config_dict['latest_month_start'],
-                datetime_end=config_dict['latest_month_end'])
-            if j:
-                launch_info_lists.slice_info(new_lists, i, j)
-                new_statistics = launch_plotter.LaunchStatistics(
-                    launch_info_lists=new_lists,
-                    group_list=new_lists.launcher_man_country,
-                    group_text='火箭制造方\n国家/地区')
-                config_dict['bar_filename'] = config_dict['latest_month_bar']
-                config_dict['bar_title'] = config_dict['month_title']
-                launch_plotter.plot_launch_bar(launch_statistics=new_statistics,
-                                               config_dict=config_dict)
+    if 'cadence_step_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_cadence, 'cadence_step_filename',
+                         data_digest, last_time, config_dict,
+                         {'rolling_statistics': rolling_statistics.RollingStatistics(
+                             launch_info_lists=launch_info_lists,
+                             group_list=group_list,
+                             group_text=group_text)}))
+
+    if 'yoy_filename' in config_dict:
+        by_group = config_dict.get('yoy_by_group')
+        job_list.append((launch_plotter.plot_launch_yoy, 'yoy_filename',
+                         data_digest, last_time, config_dict,
+                         {'year_statistics': year_statistics.YearStatistics(
+                             launch_info_lists=launch_info_lists,
+                             metric=config_dict.get('yoy_metric', 'count'),
+                             group_list=group_list if by_group else None,
+                             group_text=group_text if by_group else '')}))
+
+    if 'bar_filename' in config_dict:
+        job_list.append((launch_plotter.plot_launch_bar, 'bar_filename',
+                         data_digest, last_time, config_dict,
+                         {'launch_statistics': launch_statistics}))
+
+    cube = None
+    if 'period_bars' in config_dict and launch_info_lists.time:
+        cube = period_cube.PeriodCube(launch_info_lists=launch_info_lists,
+                                      group_list=group_list,
+                                      group_text=group_text)
+        for period_dict in config_dict['period_bars']:
+            period_statistics = cube.get_period_statistics(*period_dict['time_filter'])
+            if not period_statistics.groups_length:
+                continue
+            period_config = dict(config_dict,
+                                 bar_filename=period_dict['bar_filename'],
+                                 bar_title=period_dict.get('bar_title'),
+                                 period_bar=period_dict['bar_filename'],
+                                 period_filter=period_dict['time_filter'])
+            job_list.append((launch_plotter.plot_launch_bar, 'period_bar',
+                             data_digest, last_time, period_config,
+                             {'launch_statistics': period_statistics}))
+
+    if 'latest_month_bar' in config_dict and launch_info_lists.time:
+        if cube is None or group_list is not launch_info_lists.launcher_man_country:
+            cube = period_cube.PeriodCube(
+                launch_info_lists=launch_info_lists,
+                group_list=launch_info_lists.launcher_man_country,
+                group_text='火箭制造方\n国家/地区')
+        month_statistics = cube.get_period_statistics(config_dict['latest_month_start'],
+                                                      config_dict['latest_month_end'])
+        if month_statistics.groups_length:
+            month_config = dict(config_dict,
+                                bar_filename=config_dict['latest_month_bar'],
+                                bar_title=config_dict['month_title'])
+            # a copy, as the bar chart of config_dict may be rendered at the same time
+            job_list.append((launch_plotter.plot_launch_bar, 'latest_month_bar',
+                             data_digest, last_time, month_config,
+                             {'launch_statistics': month_statistics}))
+    return job_list
+
+
+def get_frame_launch_counts(time_list,
+                            time_end,
+                            frames_per_day):
+    """
+    Get the number of launches shown by every frame of an image_seq sampled at a fixed rate,
+    from the first launch to time_end, so that the number of frames follows the time span
+    instead of the number of launches.
+    :param time_list: The sorted datetimes of the launches, which must not be empty.
+    :param time_end: The datetime of the last frame, if it is after the last launch.
+    :param frames_per_day: The number of frames per day, e.g. 2.
+    :return launch_counts: An int array of the number of launches up to every frame.
+    """
+    time_array = numpy.array(time_list, dtype='datetime64[us]')
+    step = numpy.timedelta64(max(round(86400E6 / frames_per_day), 1), 'us')
+    frame_end = max(time_array[-1], numpy.datetime64(time_end, 'us'))
+    frame_times = numpy.arange(time_array[0], frame_end + step, step)
+    return numpy.searchsorted(time_array, frame_times, side='right')
+
+
+def render_image_seq(launch_info_lists,
+                     config_dict):
+    """
+    Render the step charts of image_seq frame by frame. A frame shows the launches before the
+    next one, up to the time of the next one. By default there is a frame per launch. With
+    config_dict['image_seq_frames_per_day'] frames are sampled at that rate instead, and a
+    frame which shows the same launches as the previous frame is copied from it.
+    :param launch_info_lists: A LaunchInfoLists object loaded for config_dict.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    from plot_launch import launch_plotter  # pylint: disable=import-outside-toplevel
+    chart_list = [(filename_key, plot_function, os.path.splitext(config_dict[filename_key]))
+                  for filename_key, plot_function in (
+                      ('delta_v_step_filename', launch_plotter.plot_launch_delta_v),
+                      ('mass_step_filename', launch_plotter.plot_launch_mass),
+                      ('energy_step_filename', launch_plotter.plot_launch_energy))
+                  if filename_key in config_dict]
+    launch_count = len(launch_info_lists.time)
+    time_end = config_dict['time_filter'][1]
+    if not launch_count:
+        launch_counts = []
+    elif config_dict.get('image_seq_frames_per_day'):
+        launch_counts = get_frame_launch_counts(
+            time_list=launch_info_lists.time,
+            time_end=time_end,
+            frames_per_day=config_dict['image_seq_frames_per_day']).tolist()
     else:
-        launch_count = len(launch_info_lists.time) + 1
-        i = 0
-        new_lists = launch_info.LaunchInfoLists()
-        time_end = config_dict['time_filter'][1]
-        dv_filename_list = os.path.splitext(config_dict['delta_v_step_filename'])
-        m_filename_list = os.path.splitext(config_dict['mass_step_filename'])
-        e_filename_list = os.path.splitext(config_dict['energy_step_filename'])
-        for j in range(1, launch_count):
-            launch_info_lists.slice_info(new_lists, i, j)
+        launch_counts = range(1, launch_count + 1)
+    prefix_digests = render_cache.get_prefix_digests(launch_info_lists)
+    new_lists = launch_info.LaunchInfoLists()
+    last_j = None
+    for k, j in enumerate(launch_counts, start=1):
+        with memory_profile.measure_frame(config_dict, k, last=k == len(launch_counts)):
+            if j == last_j:
+                for filename_key, _, filename_list in chart_list:
+                    source_filename = config_dict[filename_key]
+                    config_dict[filename_key] = f'{filename_list[0]}{k:03d}{filename_list[1]}'
+                    image_writer = config_dict.get('image_writer')
+                    if image_writer is None:
+                        image_output.copy_outputs(source_filename, config_dict[filename_key],
+                                                  config_dict)
+                    else:
+                        # after the previous frame, as the writer runs its tasks in order
+                        image_writer.submit(image_output.copy_outputs, source_filename,
+                                            config_dict[filename_key], config_dict)
+                continue
+            last_j = j
+            launch_info_lists.slice_info(new_lists, 0, j)
             launch_statistics = launch_plotter.LaunchStatistics(
                 launch_info_lists=new_lists,
                 group_list=new_lists.launcher_man_country,
                 group_text='火箭制造方\n国家/地区')
-            if j < launch_count - 1:
+            if j < launch_count:
                 config_dict['time_filter'][1] = launch_info_lists.time[j]
             else:
                 config_dict['time_filter'][1] = time_end
-            if 'delta_v_step_filename' in config_dict:
-                config_dict['delta_v_step_filename'] = \
-                    f'{dv_filename_list[0]}{j:03d}{dv_filename_list[1]}'
-                launch_plotter.plot_launch_delta_v(launch_statistics=launch_statistics,
-                                                   config_dict=config_dict)
-            if 'mass_step_filename' in config_dict:
-                config_dict['mass_step_filename'] = \
-                    f'{m_filename_list[0]}{j:03d}{m_filename_list[1]}'
-                launch_plotter.plot_launch_mass(launch_statistics=launch_statistics,
-                                                config_dict=config_dict)
-            if 'energy_step_filename' in config_dict:
-                config_dict['energy_step_filename'] = \
-                    f'{e_filename_list[0]}{j:03d}{e_filename_list[1]}'
-                launch_plotter.plot_launch_energy(launch_statistics=launch_statistics,
-                                                  config_dict=config_dict)
+            last_time = launch_info_lists.time[j - 1]
+            for filename_key, plot_function, filename_list in chart_list:
+                config_dict[filename_key] = f'{filename_list[0]}{k:03d}{filename_list[1]}'
+                render_chart(plot_function, filename_key, prefix_digests[j], last_time,
+                             config_dict, launch_statistics=launch_statistics)
             del launch_statistics
             del new_lists
             new_lists = launch_info.LaunchInfoLists()
             gc.collect()
 
+
+def plot_launch_info_lists(launch_info_lists,
+                           config_dict):
+    """
+    Plot every chart of a config from parsed launch data.
+    :param launch_info_lists: A LaunchInfoLists object loaded for config_dict.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    # info_set = set()
+    # for data_dict in launch_info_lists.data_dicts:
+    #     info_set = info_set | set(data_dict.keys())
+
+    memory_profiler = config_dict.get('memory_profiler')
+    try:
+        group_list, group_text = launch_info.get_group(launch_info_lists=launch_info_lists,
+                                                       group_by=config_dict['group_by'])
+        if group_list is None:
+            return
+
+        if 'image_seq' not in config_dict:
+            with memory_profile.measure(config_dict, 'statistics'):
+                job_list = get_chart_jobs(launch_info_lists=launch_info_lists,
+                                          group_list=group_list,
+                                          group_text=group_text,
+                                          config_dict=config_dict)
+            render_charts(job_list, render_threads=config_dict.get('render_threads', 1))
+        else:
+            render_image_seq(launch_info_lists=launch_info_lists, config_dict=config_dict)
+
+        if memory_profiler is not None:
+            memory_profiler.report(config_dict['memory_profile'])
+    finally:
+        if memory_profiler is not None:
+            # tracing is stopped even if plotting fails
+            memory_profiler.close()
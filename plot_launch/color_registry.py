@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a persistent registry which assigns every group name a color once, so that a group
+keeps its color across frames, charts and runs.
+"""
+
+# Import built-in modules
+import collections
+import json
+import os
+import re
+import threading
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import constants
+
+BRACKET_COMPILER = re.compile(r'\(.*?\)')
+
+
+class ColorRegistry:
+    """
+    Class for the colors of group names. Names in constants.HEX_COLOR_DICT keep their colors,
+    a name which only adds brackets to one of them, e.g. '中国(商业)', shares its color, and
+    any other name takes a color of constants.HEX_COLOR_LIST which its chart does not use yet,
+    the least used one among the names in the registry and the first one on a tie. Only the
+    names met in this run are saved, so the colors of names which are no longer present are
+    free again in the next run.
+    There are only len(constants.HEX_COLOR_LIST) colors: once a chart has more groups, or meets
+    groups which were given colors in other charts, colors wrap around and two groups of one
+    chart can share a color. A group keeps its color rather than taking another one for that
+    chart, so that it does not change color between frames.
+    """
+
+    def __init__(self,
+                 registry_path=None):
+        """
+        :param registry_path: A path of the registry file, defaults to
+        constants.COLOR_REGISTRY_PATH.
+        """
+        if registry_path is None:
+            registry_path = constants.COLOR_REGISTRY_PATH
+        self.registry_path = registry_path
+        self.color_dict = dict(constants.HEX_COLOR_DICT)
+        self.met_set = set()
+        # the names met in this run, the other names loaded are pruned when saving
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """
+        Load the assigned colors from disk.
+        :return None:
+        """
+        try:
+            with open(self.registry_path, encoding='utf-8') as registry_file:
+                registry_dict = json.load(registry_file)
+        except (OSError, ValueError):
+            return
+        self.color_dict.update(registry_dict['colors'])
+
+    def save(self):
+        """
+        Save the colors of the names met in this run to disk. A registry which cannot be
+        written only loses the colors of this run.
+        :return None:
+        """
+        temp_path = self.registry_path + '.tmp'
+        registry_dict = {'colors': {name: self.color_dict[name] for name in sorted(self.met_set)
+                                    if name not in constants.HEX_COLOR_DICT}}
+        try:
+            os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as registry_file:
+                json.dump(registry_dict, registry_file, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.registry_path)
+        except OSError:
+            pass
+
+    def assign(self,
+               name,
+               chart_colors=()):
+        """
+        Assign a color to a new group name.
+        :param name: A group name which has no color yet.
+        :param chart_colors: A set of the colors of the other groups in the chart.
+        :return color: A hex color string.
+        """
+        origin_name = BRACKET_COMPILER.sub('', name)
+        if origin_name in constants.HEX_COLOR_DICT:
+            color = constants.HEX_COLOR_DICT[origin_name]
+        else:
+            color_counter = collections.Counter(self.color_dict.values())
+            color = min(constants.HEX_COLOR_LIST,
+                        key=lambda color: (color in chart_colors, color_counter[color]))
+        self.color_dict[name] = color
+        return color
+
+    def get_colors(self,
+                   groups):
+        """
+        Get the colors of the groups, assigning new names in sorted order so that the result
+        does not depend on the order they are met in, names with a color of
+        constants.HEX_COLOR_DICT first so that the others avoid it.
+        :param groups: An iterable of group names.
+        :return color_list: A list of hex color strings indexed like groups.
+        """
+        groups = [str(group) for group in groups]
+        with self.lock:
+            chart_colors = {self.color_dict[group] for group in groups
+                            if group in self.color_dict}
+            new_names = sorted(set(groups) - self.color_dict.keys(), key=lambda name: (
+                BRACKET_COMPILER.sub('', name) not in constants.HEX_COLOR_DICT, name))
+            for name in new_names:
+                chart_colors.add(self.assign(name, chart_colors))
+            if not self.met_set.issuperset(groups):
+                self.met_set.update(groups)
+                self.save()
+            return [self.color_dict[group] for group in groups]
+
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry():
+    """
+    Get the color registry of this process, loading it on first use.
+    :return registry: A ColorRegistry object.
+    """
+    global _REGISTRY  # pylint: disable=global-statement
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ColorRegistry()
+        return _REGISTRY
@@ -13,6 +13,8 @@ import os
 
 # Any changes to the path and your own modules
 
+VERSION = '0.1.0'
+
 HEX_COLOR_DICT = {
     # reference https://cran.r-project.org/web/packages/khroma/vignettes/tol.html#muted
     '中国': '#CC6677',  # rose
@@ -101,6 +103,10 @@ LICENSE_IMG_NAME = 'img/CC BY-NC-SA 4.0.png'
 LICENSE_IMG_PATH = os.path.join(HERE, LICENSE_IMG_NAME)
 DEFAULT_STYLES_NAME = 'font/default_styles.ass'
 DEFAULT_STYLES_PATH = os.path.join(HERE, DEFAULT_STYLES_NAME)
+CACHE_DIR = 'cache'
+CACHE_PATH = os.path.join(HERE, CACHE_DIR)
+MANIFEST_PATH = os.path.join(CACHE_PATH, 'manifest.json')
+COLOR_REGISTRY_PATH = os.path.join(CACHE_PATH, 'colors.json')
 
 ORBIT_KEY_CANDIDATE = ('轨道', '轨道(末级)', '初始轨道', '实际轨道', '预期轨道', '运营轨道')
 MISSION_NAME_CANDIDATE = ('任务名', '组名')
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a collector of the anomalies found while parsing launches.
+"""
+
+# Import built-in modules
+import collections
+import json
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+
+
+DEFAULT_VERBOSITY = 1
+# 0: nothing, 1: a summary, 2: a summary and every anomaly
+REASON_TEXT_DICT = {
+    'zero_orbital_energy': '轨道能量为0',
+    'missing_launch_provider': '缺少发射提供方',
+    'duplicate_identifier': '编号重复'
+}
+DETAIL_TEXT_LIST = [
+    ('time', '发射时间：{value}'),
+    ('launcher', '火箭：{value}'),
+    ('launch_provider', '发射提供方：{value}'),
+    ('payload_info', '载荷信息：{value}'),
+    ('payload_mass', '载荷质量：{value}'),
+    ('orbital_energy', '轨道能量：{value:.3g}GJ'),
+    ('s_orbital_energy', '轨道比能量：{value:.3g}MJ/kg'),
+    ('r_orbital_energy', '轨道相对比能量：{value:.3g}MJ/kg'),
+    ('delta_v', '轨道理想dv：{value:.3g}km/s')
+]
+
+
+class Diagnostics:
+    """
+    Class to collect anomalies in memory and report them once parsing is done.
+    """
+
+    def __init__(self,
+                 verbosity=DEFAULT_VERBOSITY):
+        """
+        :param verbosity: 0 reports nothing, 1 a summary, 2 a summary and every anomaly.
+        """
+        self.verbosity = verbosity
+        self.anomalies = []
+
+    def add(self,
+            identifier,
+            field,
+            reason,
+            details=None):
+        """
+        Record an anomaly of a launch.
+        :param identifier: The '编号' of the launch.
+        :param field: The field which is anomalous.
+        :param reason: A reason code, a key of REASON_TEXT_DICT.
+        :param details: A dictionary of values which help to locate the problem.
+        :return None:
+        """
+        self.anomalies.append({'identifier': identifier,
+                               'field': field,
+                               'reason': reason,
+                               'details': details or {}})
+
+    def get_summary(self):
+        """
+        Count the anomalies by reason.
+        :return summary_dict: A dictionary from reason codes to counts.
+        """
+        return dict(collections.Counter(anomaly['reason'] for anomaly in self.anomalies))
+
+    def report(self,
+               report_path=None):
+        """
+        Print the anomalies depending on verbosity and optionally write them as JSON.
+        :param report_path: A path of the JSON report, or None.
+        :return None:
+        """
+        if self.verbosity >= 2:
+            for anomaly in self.anomalies:
+                print('编号：{identifier}'.format(identifier=anomaly['identifier']))
+                for key, text in DETAIL_TEXT_LIST:
+                    if key in anomaly['details']:
+                        print(text.format(value=anomaly['details'][key]))
+                print()
+        if self.verbosity >= 1:
+            for reason, count in self.get_summary().items():
+                print('{reason}：{count}条'.format(reason=REASON_TEXT_DICT.get(reason, reason),
+                                                 count=count))
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as report_file:
+                json.dump({'summary': self.get_summary(), 'anomalies': self.anomalies},
+                          report_file, ensure_ascii=False, indent=1, default=str)
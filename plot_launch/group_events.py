@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a sparse storage of the cumulative values of every group over time.
+"""
+
+# Import built-in modules
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+
+
+def check_time_sorted(time_array):
+    """
+    Check that the times of launches are sorted, which every search of them relies on.
+    :param time_array: A datetime64 array.
+    :return None:
+    """
+    if numpy.any(time_array[1:] < time_array[:-1]):
+        raise ValueError('launch times are not sorted')
+
+
+class GroupEvents:
+    """
+    Class for the events of every group, stored like a CSR matrix: the events of the k-th group
+    are the rows offsets[k]:offsets[k + 1] of times and cumulative_array, in time order.
+    It takes O(events) memory, where a dense (events, groups) step matrix repeats every row.
+    """
+
+    def __init__(self,
+                 time_array,
+                 codes,
+                 value_array,
+                 groups_length):
+        """
+        Group and accumulate the events.
+        :param time_array: A sorted datetime64 array of the times of the events.
+        :param codes: An int array of the group code of every event.
+        :param value_array: An int array of the value of every event.
+        :param groups_length: The number of groups.
+        """
+        check_time_sorted(time_array)
+        order = numpy.argsort(codes, kind='stable')
+        counts = numpy.bincount(codes, minlength=groups_length)
+        self.offsets = numpy.zeros(groups_length + 1, dtype='int64')
+        numpy.cumsum(counts, out=self.offsets[1:])
+        self.times = time_array[order]
+        cumulative = numpy.zeros(len(order) + 1, dtype=value_array.dtype)
+        numpy.cumsum(value_array[order], out=cumulative[1:])
+        bases = cumulative[self.offsets[:-1]]
+        # the total of the groups before every group
+        self.totals = cumulative[self.offsets[1:]] - bases
+        self.cumulative_array = cumulative[1:] - numpy.repeat(bases, counts)
+
+    def get_series(self,
+                   k):
+        """
+        Get the events of a group.
+        :param k: The group code.
+        :return times, values: A datetime64 array of the times of the events of the group and
+        the cumulative values after every one of them.
+        """
+        i, j = self.offsets[k], self.offsets[k + 1]
+        return self.times[i:j], self.cumulative_array[i:j]
+
+    def get_steps(self,
+                  k,
+                  x_min,
+                  x_max):
+        """
+        Get a step line of a group from x_min to x_max, to draw with drawstyle='steps-post'.
+        :param k: The group code.
+        :param x_min: The datetime of the start of the line, where the value is 0.
+        :param x_max: The datetime of the end of the line, where the value stays the total.
+        :return x_array, y_value: A datetime64[us] array and an array of the values.
+        """
+        times, values = self.get_series(k)
+        x_array = numpy.concatenate((numpy.array([x_min], dtype='datetime64[us]'),
+                                     times.astype('datetime64[us]'),
+                                     numpy.array([x_max], dtype='datetime64[us]')))
+        y_value = numpy.concatenate(([0], values, [self.totals[k]]))
+        return x_array, y_value
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines codes needed to encode a drawn figure into one or more image files.
+"""
+
+# Import built-in modules
+import io
+import os
+import shutil
+
+# Import third-party modules
+import numpy
+from PIL import Image
+
+# Any changes to the path and your own modules
+
+
+VECTOR_FORMATS = ('svg', 'svgz', 'pdf', 'eps', 'ps')
+PIL_FORMATS = {
+    'png': 'PNG',
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+    'jpeg': 'JPEG',
+    'tif': 'TIFF',
+    'tiff': 'TIFF'
+}
+
+
+def is_known_format(output_format):
+    """
+    Check whether a format can be written by save_figure.
+    :param output_format: A lowercase format, e.g. 'png'.
+    :return result: True if it is one of VECTOR_FORMATS or PIL_FORMATS.
+    """
+    return output_format in VECTOR_FORMATS or output_format in PIL_FORMATS
+
+
+class MemoryOutput:
+    """
+    Class for an in-memory output of a chart. Put it in config_dict in place of a filename,
+    e.g. config_dict['bar_filename'], and read the result after plotting.
+    """
+
+    def __init__(self,
+                 output_format='png',
+                 options=None):
+        """
+        :param output_format: A format of VECTOR_FORMATS or PIL_FORMATS, or 'rgba' to keep
+        the raw pixel buffer.
+        :param options: A dictionary of encoder options, e.g. {'quality': 80} for webp/jpeg or
+        {'compress_level': 1} for png.
+        """
+        output_format = output_format.lower()
+        if output_format != 'rgba' and not is_known_format(output_format):
+            raise ValueError('unknown output format: {output_format}'.format(
+                output_format=output_format))
+        self.format = output_format
+        self.options = options or {}
+        self.buffer = None
+        self.rgba = None
+
+    def write_figure(self,
+                     fig):
+        """
+        Render the figure into memory.
+        :param fig: A matplot figure object.
+        :return None:
+        """
+        if self.format == 'rgba':
+            self.rgba = draw_to_rgba(fig)
+            # a view of the buffer of the figure's own canvas, no copy is needed
+            return
+        self.buffer = io.BytesIO()
+        if self.format in VECTOR_FORMATS or (self.format == 'png' and not self.options):
+            fig.savefig(self.buffer, format=self.format)
+        else:
+            encode_rgba(rgba=draw_to_rgba(fig),
+                        target={'format': self.format, 'scale': 1.0, 'options': self.options},
+                        output=self.buffer)
+
+    def getbuffer(self):
+        """
+        Get the encoded image without copying it.
+        :return view: A memoryview of the encoded bytes.
+        """
+        return self.buffer.getbuffer()
+
+    def getvalue(self):
+        """
+        Get the result.
+        :return value: The encoded bytes, or a (height, width, 4) uint8 array for 'rgba'.
+        """
+        if self.format == 'rgba':
+            return self.rgba
+        return self.buffer.getvalue()
+
+
+def get_output_targets(filename,
+                       config_dict):
+    """
+    Get the output targets of a chart from config_dict['outputs'].
+    Every item of config_dict['outputs'] is a dictionary which may contain:
+    'format'(defaults to the extension of filename), 'suffix'(appended to the file stem),
+    'dpi' or 'scale'(relative to config_dict['dpi']), 'quality'(webp/jpeg) and
+    'compress_level'(png, 0-9). An empty dictionary stands for filename itself.
+    Every format is checked here, so that an unknown one fails before the figure is drawn.
+    :param filename: The filename of the chart from config_dict.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return target_list: A list of dictionaries with 'filename', 'format', 'scale' and 'options'.
+    """
+    root, ext = os.path.splitext(filename)
+    default_format = ext[1:].lower() or 'png'
+    outputs = config_dict.get('outputs')
+    for output in outputs or [{}]:
+        output_format = output.get('format', default_format).lower()
+        if not is_known_format(output_format):
+            raise ValueError('unknown output format of {filename}: {output_format}'.format(
+                filename=filename, output_format=output_format))
+    if not outputs:
+        return [{'filename': filename, 'format': default_format, 'scale': 1.0, 'options': {}}]
+
+    target_list = []
+    for output in outputs:
+        output_format = output.get('format', default_format).lower()
+        if 'dpi' in output:
+            scale = output['dpi'] / config_dict['dpi']
+        else:
+            scale = output.get('scale', 1.0)
+        options = {}
+        if 'quality' in output:
+            options['quality'] = output['quality']
+        if 'compress_level' in output:
+            options['compress_level'] = output['compress_level']
+        if output_format == 'webp' and output.get('lossless'):
+            options['lossless'] = True
+        target_list.append({
+            'filename': '{root}{suffix}.{ext}'.format(root=root,
+                                                      suffix=output.get('suffix', ''),
+                                                      ext=output_format),
+            'format': output_format,
+            'scale': scale,
+            'options': options})
+    return target_list
+
+
+def copy_outputs(source_filename,
+                 filename,
+                 config_dict):
+    """
+    Copy every output of a chart to the outputs of another chart, e.g. an unchanged frame of
+    image_seq.
+    :param source_filename: The filename of the rendered chart.
+    :param filename: The filename of the chart to write.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    for source, target in zip(get_output_targets(source_filename, config_dict),
+                              get_output_targets(filename, config_dict)):
+        shutil.copyfile(source['filename'], target['filename'])
+
+
+def draw_to_rgba(fig):
+    """
+    Draw the figure to an Agg canvas once and return its pixel buffer.
+    :param fig: A matplot figure object.
+    :return rgba: A (height, width, 4) uint8 array of the drawn figure.
+    """
+    # imported here, as render_cache and watch import this module without drawing anything
+    from matplotlib.backends.backend_agg import \
+        FigureCanvasAgg  # pylint: disable=import-outside-toplevel
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    return numpy.asarray(canvas.buffer_rgba())
+
+
+def encode_rgba(rgba,
+                target,
+                output):
+    """
+    Encode a pixel buffer to a raster target.
+    :param rgba: A (height, width, 4) uint8 array of the drawn figure.
+    :param target: A dictionary from get_output_targets.
+    :param output: A filename or a binary file-like object to write to.
+    :return None:
+    """
+    image = Image.fromarray(rgba, mode='RGBA')
+    if target['scale'] != 1.0:
+        image = image.resize((max(1, round(image.width * target['scale'])),
+                              max(1, round(image.height * target['scale']))),
+                             resample=Image.LANCZOS)
+    pil_format = PIL_FORMATS[target['format']]
+    if pil_format == 'JPEG':
+        image = image.convert('RGB')
+    image.save(output, format=pil_format, **target['options'])
+
+
+def save_figure(fig,
+                filename,
+                config_dict):
+    """
+    Save the figure to every output target of a chart.
+    Raster targets are encoded from a single Agg draw of the figure, vector targets are
+    written by the matching vector backend. With config_dict['image_writer'], raster targets
+    are encoded by the writer thread of the pipeline instead.
+    :param fig: A matplot figure object.
+    :param filename: The filename of the chart from config_dict, or a MemoryOutput object.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    if isinstance(filename, MemoryOutput):
+        filename.write_figure(fig)
+        return
+
+    image_writer = config_dict.get('image_writer')
+    if not config_dict.get('outputs') and image_writer is None:
+        fig.savefig(filename)
+        return
+
+    target_list = get_output_targets(filename, config_dict)
+    rgba = None
+    for target in target_list:
+        if target['format'] in VECTOR_FORMATS:
+            fig.savefig(target['filename'], format=target['format'])
+            continue
+        if rgba is None:
+            rgba = draw_to_rgba(fig)
+            if image_writer is not None:
+                # the buffer belongs to the canvas, which is reused once the figure is closed
+                rgba = rgba.copy()
+        if image_writer is None:
+            encode_rgba(rgba=rgba, target=target, output=target['filename'])
+        else:
+            image_writer.submit(encode_rgba, rgba=rgba, target=target, output=target['filename'])
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines adapters which read launches from other formats than the raw text format, keyed by
+file extension. Every adapter yields data_dicts with the same keys as constants.DATA_KEY,
+which LaunchInfoLists.add_records appends without the text tokenizer.
+"""
+
+# Import built-in modules
+import csv
+import json
+import os
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+
+LIST_SEPARATOR = '；'
+# joins a list value of a JSON Lines record, e.g. several orbits
+
+
+def get_text(value):
+    """
+    Get the text of a value of a JSON Lines record, the same as it would be in a raw data file.
+    :param value: A string, a number or a list of them.
+    :return text: A string.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(get_text(item) for item in value)
+    return str(value)
+
+
+def iter_jsonl_records(abs_path):
+    """
+    Iterate the launches of a JSON Lines file, one object per line. Null values are dropped,
+    as a missing key in a raw data file.
+    :param abs_path: A path of a JSON Lines file.
+    :return: A generator of data_dicts.
+    """
+    with open(abs_path, encoding='utf-8') as data_file:
+        for line in data_file:
+            if not line.strip():
+                continue
+            data_dict = json.loads(line)
+            yield {key: value if isinstance(value, str) else get_text(value)
+                   for key, value in data_dict.items() if value is not None}
+
+
+def iter_csv_records(abs_path):
+    """
+    Iterate the launches of a CSV file with a header row of keys. Empty cells are dropped, as
+    a missing key in a raw data file.
+    :param abs_path: A path of a CSV file.
+    :return: A generator of data_dicts.
+    """
+    with open(abs_path, encoding='utf-8-sig', newline='') as data_file:
+        reader = csv.reader(data_file)
+        key_list = next(reader, None)
+        if key_list is None:
+            return
+        for row in reader:
+            yield {key: value for key, value in zip(key_list, row) if value}
+
+
+ADAPTER_DICT = {
+    # extension: function(abs_path) which yields data_dicts
+    '.jsonl': iter_jsonl_records,
+    '.csv': iter_csv_records
+}
+
+
+def register_adapter(extension,
+                     adapter):
+    """
+    Add an adapter for another file extension.
+    :param extension: A lowercase file extension with the dot, e.g. '.ndjson'.
+    :param adapter: A function(abs_path) which yields data_dicts.
+    :return None:
+    """
+    ADAPTER_DICT[extension] = adapter
+
+
+def get_adapter(filename):
+    """
+    Get the adapter of a data file.
+    :param filename: A filename or a path of a data file.
+    :return adapter: A function from ADAPTER_DICT, or None for the raw text format.
+    """
+    return ADAPTER_DICT.get(os.path.splitext(filename)[1].lower())
+
+
+def is_data_file(filename):
+    """
+    Check whether a filename is a data file of any supported format.
+    :param filename: A filename in the data directory.
+    :return result: True if it is a data file.
+    """
+    return filename.endswith('txt') or get_adapter(filename) is not None
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines hash indexes of launches by identifier ('编号'), launcher and location, and the
+de-duplication of launches which appear in more than one raw data file, after which the
+launches are sorted by time again.
+It does not import matplotlib, so that a launch can be looked up without loading it.
+"""
+
+# Import built-in modules
+import collections
+import functools
+import itertools
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+
+DUPLICATE_RULES = ('last', 'first', 'keep')
+# 'last': the last record of an identifier wins, i.e. the one in the last file by filename
+# 'first': the first record wins
+# 'keep': keep every record
+DEFAULT_DUPLICATE_RULE = 'last'
+SHOW_ATTRS = (('编号', 'identifier'), ('时间', 'time'), ('位置', 'location'),
+              ('载具', 'launcher'), ('发射提供方', 'launch_provider'), ('载荷信息', 'payload_info'),
+              ('轨道', 'orbit'), ('结果', 'launch_result'), ('备注', 'remarks'))
+# the fields to show when the raw records are not kept
+
+
+def get_secondary_dict(value_list):
+    """
+    Get a secondary index of a column.
+    :param value_list: A column of LaunchInfoLists, e.g. launcher.
+    :return secondary_dict: A dictionary of every non-empty value to the list of the sequences
+    of its launches, in order.
+    """
+    secondary_dict = collections.defaultdict(list)
+    for i, value in enumerate(value_list):
+        if value:
+            secondary_dict[value].append(i)
+    return dict(secondary_dict)
+
+
+class LaunchIndex:
+    """
+    Class for hash indexes of the launches of a LaunchInfoLists object. The identifier index
+    is built at once, the secondary indexes by launcher and location on first access.
+    """
+
+    def __init__(self,
+                 launch_info_lists):
+        """
+        :param launch_info_lists: A LaunchInfoLists object, usually de-duplicated.
+        """
+        self.launch_info_lists = launch_info_lists
+        self.identifier_dict = {identifier: i
+                                for i, identifier in enumerate(launch_info_lists.identifier)
+                                if identifier}
+        # the last launch of an identifier if it is not de-duplicated
+
+    @functools.cached_property
+    def launcher_dict(self):
+        """
+        :return launcher_dict: A dictionary of every launcher to the sequences of its launches.
+        """
+        return get_secondary_dict(self.launch_info_lists.launcher)
+
+    @functools.cached_property
+    def location_dict(self):
+        """
+        :return location_dict: A dictionary of every location to the sequences of its launches.
+        """
+        return get_secondary_dict(self.launch_info_lists.location)
+
+    def get(self,
+            identifier):
+        """
+        :param identifier: The '编号' of a launch.
+        :return i: The sequence of the launch, or None.
+        """
+        return self.identifier_dict.get(identifier)
+
+    def get_by_launcher(self,
+                        launcher):
+        """
+        :param launcher: A launcher, e.g. '长征二号丁'.
+        :return sequence_list: The sequences of its launches, in order.
+        """
+        return self.launcher_dict.get(launcher, [])
+
+    def get_by_location(self,
+                        location):
+        """
+        :param location: A launch location.
+        :return sequence_list: The sequences of its launches, in order.
+        """
+        return self.location_dict.get(location, [])
+
+    def get_text(self,
+                 i):
+        """
+        Get a launch as the text of a raw record.
+        :param i: The sequence of the launch.
+        :return text: 'key：value' lines, of every field if the raw records are kept.
+        """
+        launch_info_lists = self.launch_info_lists
+        if launch_info_lists.data_dicts is not None:
+            item_list = list(launch_info_lists.data_dicts[i].items())
+        else:
+            item_list = [(key, getattr(launch_info_lists, attr)[i]) for key, attr in SHOW_ATTRS]
+        return '\n'.join('{key}：{value}'.format(key=key, value=value)
+                         for key, value in item_list if value is not None)
+
+
+def get_dropped_indices(identifier_list,
+                        rule=DEFAULT_DUPLICATE_RULE,
+                        kept_list=None):
+    """
+    Get the launches which repeat the identifier of another launch. Launches without an
+    identifier are never duplicates.
+    Records which were not kept, e.g. outside the time filter, still take part: a later record
+    outside the time filter drops an earlier one inside it by the rule 'last', as the launch
+    was moved out of the time filter by a correction.
+    :param identifier_list: The identifiers of every record of the loaded files in order, by
+    default only the identifier column of LaunchInfoLists.
+    :param rule: A rule of DUPLICATE_RULES.
+    :param kept_list: Whether every record of identifier_list is a launch of LaunchInfoLists,
+    or None if every one is.
+    :return dropped_list: The sorted sequences of the launches to drop.
+    """
+    if rule not in DUPLICATE_RULES:
+        raise ValueError('unknown duplicate_rule: {rule}'.format(rule=rule))
+    if rule == 'keep':
+        return []
+    if kept_list is None:
+        kept_list = itertools.repeat(True)
+    dropped_list = []
+    seen_dict = {}
+    # identifier: the sequence of the launch which wins so far, or None for a record which is
+    # not kept
+    i = -1
+    for identifier, kept in zip(identifier_list, kept_list):
+        if kept:
+            i = i + 1
+        if not identifier:
+            continue
+        if identifier not in seen_dict:
+            seen_dict[identifier] = i if kept else None
+        elif rule == 'last':
+            j = seen_dict[identifier]
+            if j is not None:
+                dropped_list.append(j)
+            seen_dict[identifier] = i if kept else None
+        elif kept:
+            dropped_list.append(i)
+    dropped_list.sort()
+    return dropped_list
+
+
+def is_time_sorted(time_list):
+    """
+    Check the invariant of a LaunchInfoLists object which every statistics relies on.
+    :param time_list: The time column of LaunchInfoLists.
+    :return result: True if the times never decrease.
+    """
+    return all(time_a <= time_b for time_a, time_b in zip(time_list, time_list[1:]))
+
+
+def get_runs(order):
+    """
+    Split an order of launches into runs of consecutive sequences.
+    :param order: A list of the sequences of launches.
+    :return run_list: A list of (i, j) to copy the launches i:j.
+    """
+    run_list = []
+    for i in order:
+        if run_list and run_list[-1][1] == i:
+            run_list[-1][1] = i + 1
+        else:
+            run_list.append([i, i + 1])
+    return run_list
+
+
+def deduplicate(launch_info_lists,
+                rule=DEFAULT_DUPLICATE_RULE,
+                diagnostics=None,
+                identifier_list=None,
+                kept_list=None):
+    """
+    Drop the launches which repeat the identifier of another launch, e.g. a launch in both a
+    yearly file and a file of corrections, and sort the rest by time. The files are joined in
+    filename order, so a correction sits after later launches until it is sorted. The sort is
+    stable, so launches at the same time keep the order of their files.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param rule: A rule of DUPLICATE_RULES.
+    :param diagnostics: A Diagnostics object to collect the dropped launches, or None.
+    :param identifier_list: The identifiers of every record of the loaded files, including the
+    ones outside the time filter, see get_dropped_indices.
+    :param kept_list: Whether every record of identifier_list is a launch of launch_info_lists.
+    :return launch_info_lists: The same object if nothing is dropped and it is sorted, or a new
+    LaunchInfoLists object without the duplicates in time order.
+    """
+    if identifier_list is None:
+        identifier_list = launch_info_lists.identifier
+    dropped_list = get_dropped_indices(identifier_list, rule, kept_list)
+    time_list = launch_info_lists.time
+    if not dropped_list and is_time_sorted(time_list):
+        return launch_info_lists
+    if diagnostics is not None:
+        for i in dropped_list:
+            diagnostics.add(identifier=launch_info_lists.identifier[i], field='编号',
+                            reason='duplicate_identifier',
+                            details=launch_info_lists.get_details(i))
+    dropped_set = set(dropped_list)
+    order = [i for i in range(len(time_list)) if i not in dropped_set]
+    order.sort(key=time_list.__getitem__)
+    new_lists = type(launch_info_lists)(
+        keep_raw_records=launch_info_lists.data_dicts is not None)
+    for i, j in get_runs(order):
+        new_lists.extend(launch_info_lists, i, j)
+    return new_lists
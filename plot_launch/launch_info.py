@@ -6,18 +6,42 @@ Defines launch_info classes and methods used by plot_launch.
 
 # Import built-in modules
 import datetime
+import functools
+import gc
+import itertools
+import mmap
 import re
 import os
 from calendar import monthrange
 import math
 
 # Import third-party modules
-import matplotlib
-import matplotlib.font_manager as fm
 import pysubs2
 
 # Any changes to the path and your own modules
 from plot_launch import constants
+from plot_launch import diagnostics
+from plot_launch import input_adapters
+from plot_launch import launch_index
+from plot_launch import manifest
+from plot_launch import memory_profile
+from plot_launch import payload_table
+from plot_launch import raw_records
+
+
+USED_KEYS = ('编号', '火箭制造方', '时间', '位置', '任务名', '组名', '飞行编号', '发射提供方', '发射与载荷',
+             '载荷运营方', '载荷研制方', '载荷信息', '主载荷信息', '搭车载荷信息', '载荷质量', '载具',
+             '结果', '结果(发射与回收)', '备注', '回收船') + constants.ORBIT_KEY_CANDIDATE
+# keys read by LaunchInfoLists.append_dict
+USED_KEY_BYTES = frozenset(key.encode('utf-8') for key in USED_KEYS)
+COLON_BYTES = '：'.encode('utf-8')
+TIME_PREFIX_BYTES = '时间：'.encode('utf-8')
+IDENTIFIER_PREFIX_BYTES = '编号：'.encode('utf-8')
+RECORD_SEPARATOR = re.compile(rb'\r?\n\r?\n')
+CITATION_COMPILER = re.compile(r'\[.*?]')
+MASS_COMPILER = re.compile(r'(\d+\.?\d+|\d+)吨')
+ORBIT_CACHE_SIZE = 4096
+# distinct orbit strings whose energies are kept, as most launches share a few orbits
 
 
 # class PayloadInfoLists:  # pylint: disable=too-few-public-methods
@@ -54,7 +78,12 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
     Class for the data of orbital launches.
     """
 
-    def __init__(self):
+    def __init__(self,
+                 keep_raw_records=True):
+        """
+        :param keep_raw_records: Keep the raw data dictionaries in data_dicts. If it is False,
+        data_dicts is None.
+        """
         # Common data of launches
         self.identifier = []
         self.launcher_man_country = []
@@ -85,8 +114,14 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
         self.recovery_result = []
         self.recovery_ship = []
 
+        # data of payloads
+        self.payload_table = payload_table.PayloadTable()
+
         # data sources
-        self.data_dicts = []
+        if keep_raw_records:
+            self.data_dicts = raw_records.RawRecords()
+        else:
+            self.data_dicts = None
         # self.citation_seq_tuple_list = []
         # self.sources = []
 
@@ -148,7 +183,29 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
         new_info_lists.remarks = self.remarks[i:j]
         new_info_lists.recovery_result = self.recovery_result[i:j]
         new_info_lists.recovery_ship = self.recovery_ship[i:j]
-        new_info_lists.data_dicts = self.data_dicts[i:j]
+        new_info_lists.payload_table = self.payload_table[i:j]
+        if self.data_dicts is not None:
+            new_info_lists.data_dicts = self.data_dicts[i:j]
+        else:
+            new_info_lists.data_dicts = None
+
+    def extend(self,
+               other,
+               i=0,
+               j=None):
+        """
+        Append the launches other[i:j] to self.
+        :param other: Another LaunchInfoLists object.
+        :param i: A start sequence i.
+        :param j: An end sequence j.
+        :return None:
+        """
+        for name, value in vars(other).items():
+            if value is None or getattr(self, name) is None:
+                # raw records are dropped
+                setattr(self, name, None)
+            else:
+                getattr(self, name).extend(value[i:j])
 
     @classmethod
     def from_raw_data(cls,
@@ -161,9 +218,10 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
         :param config_dict: A dictionary to control the plotting procedure.
         :return launch_info_lists: An initialized LaunchInfoLists object.
         """
-        launch_info_lists = cls()
+        launch_info_lists = cls(keep_raw_records=config_dict.get('keep_raw_records', True))
+        if not raw_data:
+            return launch_info_lists
         raw_list = raw_data.split('\n\n')
-        compiler = re.compile(r'\[.*?]')
         for item in raw_list:
             i = item.find('\n')
             j = item[:i].find('：')
@@ -181,7 +239,7 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
                     not_last = False
                 j = the_rest[:i].find('：')
                 if '[' in the_rest[j + 1:i]:
-                    text = ''.join(compiler.split(the_rest[j + 1:i]))
+                    text = ''.join(CITATION_COMPILER.split(the_rest[j + 1:i]))
                 else:
                     text = the_rest[j + 1:i]
                 if j > 0:
@@ -192,147 +250,290 @@ class LaunchInfoLists:  # pylint: disable=too-few-public-methods
                 else:
                     data_dict[last_key] = data_dict[last_key] + text
                     value_list[-1] = data_dict[last_key]
-            time_str = data_dict.get('时间')
-            time_str_part = time_str[:time_str.find('(')]
-            time_obj = from_str_to_datetime(time_str_part)
-            if '+' in data_dict.get('时间'):
-                time_obj = time_obj - datetime.timedelta(hours=8)
+            time_obj = get_launch_time(data_dict.get('时间'))
             if time_obj < config_dict['time_filter'][0] or time_obj > config_dict['time_filter'][1]:
                 continue
-            launch_info_lists.time.append(time_obj)
-            launch_info_lists.append_dict(data_dict)
-
-            result = config_dict.get('split_by')
-            if result:
-                if 'attr' in result:
-                    i = len(result['attr']) - 1
-                    while i > -1:
-                        launch_info_list = getattr(launch_info_lists, result['attr'][i])
-                        if launch_info_list[-1] and result['value'][i] in launch_info_list[-1]:
-                            getattr(launch_info_lists, result['attr'][0])[-1] = result['label'][i]
-                            break
-                        i = i - 1
-            result = config_dict.get('to_subs')
-            if result:
-                launch_info_to_subs(key_list=key_list, value_list=value_list,
-                                    output_path=result)
+            launch_info_lists.add_record(time_obj=time_obj,
+                                         data_dict=data_dict,
+                                         key_list=key_list,
+                                         value_list=value_list,
+                                         config_dict=config_dict)
         return launch_info_lists
 
-    def append_dict(self,
-                    data_dict):
+    @classmethod
+    def from_file(cls,
+                  abs_path,
+                  config_dict):
         """
-        Append a LaunchInfoLists object from a data_dict.
+        Initialize a LaunchInfoLists object from a raw data file.
+        :param abs_path: A path of a raw data file.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :return launch_info_lists: An initialized LaunchInfoLists object.
+        """
+        launch_info_lists = cls(keep_raw_records=config_dict.get('keep_raw_records', True))
+        launch_info_lists.add_file(abs_path=abs_path, config_dict=config_dict)
+        return launch_info_lists
+
+    def add_file(self,
+                 abs_path,
+                 config_dict,
+                 identifier_list=None):
+        """
+        Append the launches of a raw data file. The file is memory-mapped, record and line
+        boundaries are located on the bytes, and only the '时间' line of a launch outside the
+        time filter is decoded. When neither raw records nor subtitles are needed, only the
+        fields read by append_dict are decoded. Files of other formats are read by their
+        adapters in input_adapters.
+        :param abs_path: A path of a raw data file.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :param identifier_list: A list to append the identifier of every launch in the file to,
+        including filtered ones, or None.
+        :return time_list: The datetimes of every launch in the file, including filtered ones.
+        """
+        adapter = input_adapters.get_adapter(abs_path)
+        if adapter is not None:
+            return self.add_records(records=adapter(abs_path), config_dict=config_dict,
+                                    identifier_list=identifier_list)
+        time_list = []
+        if self.data_dicts is None and not config_dict.get('to_subs'):
+            key_set = USED_KEY_BYTES
+        else:
+            key_set = None
+        with open(abs_path, 'rb') as data_file:
+            try:
+                buffer = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file can not be mapped
+                return time_list
+        with buffer:
+            for start, end in iter_record_spans(buffer):
+                time_obj = get_record_time(buffer, start, end)
+                if time_obj is None:
+                    continue
+                time_list.append(time_obj)
+                if time_obj < config_dict['time_filter'][0] or \
+                        time_obj > config_dict['time_filter'][1]:
+                    if identifier_list is not None:
+                        identifier_list.append(get_record_identifier(buffer, start, end))
+                    continue
+                data_dict, key_list, value_list = parse_record(buffer, start, end, key_set)
+                self.add_record(time_obj=time_obj,
+                                data_dict=data_dict,
+                                key_list=key_list,
+                                value_list=value_list,
+                                config_dict=config_dict)
+                if identifier_list is not None:
+                    identifier_list.append(self.identifier[-1])
+        return time_list
+
+    def add_records(self,
+                    records,
+                    config_dict,
+                    identifier_list=None):
+        """
+        Append launches which are already split into fields, e.g. by an input adapter.
+        :param records: An iterable of data_dicts.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :param identifier_list: A list to append the identifier of every launch to, including
+        filtered ones, or None.
+        :return time_list: The datetimes of every launch, including filtered ones.
+        """
+        time_list = []
+        data_dicts = []
+        time_start, time_end = config_dict['time_filter']
+        start = len(self.identifier)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        # the records hold no reference cycles, and collecting while millions of objects are
+        # created only costs time
+        try:
+            for data_dict in records:
+                time_str = data_dict.get('时间')
+                if not time_str:
+                    continue
+                time_obj = get_launch_time(time_str)
+                time_list.append(time_obj)
+                if identifier_list is not None:
+                    identifier_list.append(data_dict.get('编号'))
+                if time_obj < time_start or time_obj > time_end:
+                    continue
+                self.time.append(time_obj)
+                data_dicts.append(data_dict)
+            self.append_dicts(data_dicts, diagnostics=config_dict.get('diagnostics'))
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        result = config_dict.get('split_by')
+        if result:
+            for i in range(start, len(self.identifier)):
+                self.split_launch(i, result)
+        result = config_dict.get('to_subs')
+        if result:
+            for data_dict in data_dicts:
+                launch_info_to_subs(key_list=list(data_dict),
+                                    value_list=list(data_dict.values()),
+                                    output_path=result)
+        return time_list
+
+    def add_record(self,
+                   time_obj,
+                   data_dict,
+                   key_list,
+                   value_list,
+                   config_dict):
+        """
+        Append a parsed launch which passed the time filter.
+        :param time_obj: The datetime of the launch.
         :param data_dict: A dictionary of raw data from a single launch.
+        :param key_list: An ordered key list of the data_dict.
+        :param value_list: An ordered value list of the data_dict.
+        :param config_dict: A dictionary to control the plotting procedure.
         :return None:
         """
-        self.data_dicts.append(data_dict)
-        # common statistics of launches
-        self.identifier.append(data_dict.get('编号'))
-        self.launcher_man_country.append(data_dict.get('火箭制造方'))
+        self.time.append(time_obj)
+        self.append_dict(data_dict, diagnostics=config_dict.get('diagnostics'))
 
-        self.location.append(data_dict.get('位置'))
+        result = config_dict.get('split_by')
+        if result:
+            self.split_launch(-1, result)
+        result = config_dict.get('to_subs')
+        if result:
+            launch_info_to_subs(key_list=key_list, value_list=value_list,
+                                output_path=result)
 
-        result = None
-        for key in constants.MISSION_NAME_CANDIDATE:
-            result = data_dict.get(key)
-            if result:
-                break
-        self.mission_name.append(result)
+    def split_launch(self,
+                     i,
+                     split_by):
+        """
+        Relabel a launch by the 'split_by' option of a config, e.g. to split a country by the
+        values of another attribute.
+        :param i: The sequence of the launch.
+        :param split_by: The 'split_by' option of a config.
+        :return None:
+        """
+        if 'attr' in split_by:
+            k = len(split_by['attr']) - 1
+            while k > -1:
+                launch_info_list = getattr(self, split_by['attr'][k])
+                if launch_info_list[i] and split_by['value'][k] in launch_info_list[i]:
+                    getattr(self, split_by['attr'][0])[i] = split_by['label'][k]
+                    break
+                k = k - 1
 
-        self.flight_num.append(data_dict.get('飞行编号'))
+    def get_details(self,
+                    i=-1):
+        """
+        Get the values of a launch which help to locate an anomaly.
+        :param i: The sequence of the launch, the last one by default.
+        :return details: A dictionary for Diagnostics.add.
+        """
+        return {'time': self.time[i],
+                'launcher': self.launcher[i],
+                'launch_provider': self.launch_provider[i],
+                'payload_info': self.payload_info[i],
+                'payload_mass': self.payload_mass[i],
+                'orbital_energy': self.orbital_energy[i] / 100,
+                's_orbital_energy': self.s_orbital_energy[i] / 1000000,
+                'r_orbital_energy': self.r_orbital_energy[i] / 100,
+                'delta_v': self.delta_v[i] / 1000}
 
-        result = data_dict.get('发射提供方')
-        if not result:
-            self.launch_provider.append(data_dict.get('发射与载荷'))
-        else:
-            self.launch_provider.append(result)
+    def append_dict(self,
+                    data_dict,
+                    diagnostics=None):
+        """
+        Append a LaunchInfoLists object from a data_dict.
+        :param data_dict: A dictionary of raw data from a single launch.
+        :param diagnostics: A Diagnostics object to collect anomalies, or None to ignore them.
+        :return None:
+        """
+        self.append_dicts((data_dict,), diagnostics=diagnostics)
 
-        result = data_dict.get('载荷运营方')
-        if not result:
-            self.payload_operator.append(data_dict.get('发射与载荷'))
-        else:
-            self.payload_operator.append(result)
+    def append_dicts(self,
+                     data_dicts,
+                     diagnostics=None):
+        """
+        Append several launches column by column, the bulk path of append_dict.
+        :param data_dicts: A sequence of dictionaries of raw data from single launches.
+        :param diagnostics: A Diagnostics object to collect anomalies, or None to ignore them.
+        :return None:
+        """
+        if self.data_dicts is not None:
+            self.data_dicts.extend(data_dicts)
+        # common statistics of launches
+        self.identifier.extend([data_dict.get('编号') for data_dict in data_dicts])
+        self.launcher_man_country.extend([data_dict.get('火箭制造方') for data_dict in data_dicts])
+        self.location.extend([data_dict.get('位置') for data_dict in data_dicts])
+        self.mission_name.extend([get_first_value(data_dict, constants.MISSION_NAME_CANDIDATE)
+                                  for data_dict in data_dicts])
+        self.flight_num.extend([data_dict.get('飞行编号') for data_dict in data_dicts])
+        self.launch_provider.extend([data_dict.get('发射提供方') or data_dict.get('发射与载荷')
+                                     for data_dict in data_dicts])
+        operator_list = [data_dict.get('载荷运营方') or data_dict.get('发射与载荷')
+                         for data_dict in data_dicts]
+        self.payload_operator.extend(operator_list)
+        developer_list = [data_dict.get('载荷研制方') or operator
+                          for data_dict, operator in zip(data_dicts, operator_list)]
+        self.payload_developer.extend(developer_list)
+        info_list = [data_dict.get('载荷信息') or '{part1}；{part2}'.format(
+            part1=data_dict.get('主载荷信息'),
+            part2=data_dict.get('搭车载荷信息')) for data_dict in data_dicts]
+        self.payload_info.extend(info_list)
+        mass_lists = [get_payload_mass(data_dict.get('载荷质量'), payload_info)
+                      for data_dict, payload_info in zip(data_dicts, info_list)]
+        self.payload_mass.extend(mass_lists)
+        self.launcher.extend([data_dict.get('载具') for data_dict in data_dicts])
+        orbit_list = [get_first_value(data_dict, constants.ORBIT_KEY_CANDIDATE)
+                      for data_dict in data_dicts]
+        self.orbit.extend(orbit_list)
 
-        result = data_dict.get('载荷研制方')
-        if not result:
-            self.payload_developer.append(self.payload_operator[-1])
-        else:
-            self.payload_developer.append(result)
-
-        result = data_dict.get('载荷信息')
-        if not result:
-            result = '{part1}；{part2}'.format(
-                part1=data_dict.get('主载荷信息'),
-                part2=data_dict.get('搭车载荷信息'))
-        self.payload_info.append(result)
-
-        result = data_dict.get('载荷质量')
-        if not result:
-            result = list(map(float, re.findall(r'(\d+\.?\d+|\d+)吨', self.payload_info[-1])))
-            if not result:
-                result = [0.0]
+        start = len(self.launch_result)
+        specific_energy_list = []
+        for data_dict, orbit, mass_list in zip(data_dicts, orbit_list, mass_lists):
+            result = data_dict.get('结果') or data_dict.get('结果(发射与回收)')
+            if result == '成功':
+                self.launch_result.append(True)
+                s_orbital_energy_list = get_specific_orbital_energy(orbit)
+                r_orbital_energy_list = [s_orbital_e - constants.EARTH_SURFACE_POTENTIAL_ENERGY
+                                         for s_orbital_e in s_orbital_energy_list]
+                k = max(range(len(s_orbital_energy_list)),
+                        key=s_orbital_energy_list.__getitem__)
+                # the first of the highest orbits
+                self.s_orbital_energy.append(s_orbital_energy_list[k])
+                self.r_orbital_energy.append(round(r_orbital_energy_list[k] / 10000))
+                # unit 10J/kg
+                self.orbital_energy.append(get_orbital_energy(r_orbital_energy_list, mass_list))
+                self.delta_v.append(round(max(get_delta_v(s_orbital_energy_list))))
+                specific_energy_list.append(r_orbital_energy_list[0])
             else:
-                result = [result[0]]
-        else:
-            result = list(map(float, re.findall(r'(\d+\.?\d+|\d+)吨', result)))
-        self.payload_mass.append(result)
-
-        self.launcher.append(data_dict.get('载具'))
-
-        result = None
-        for key in constants.ORBIT_KEY_CANDIDATE:
-            result = data_dict.get(key)
-            if result:
-                break
-        self.orbit.append(result)
-
-        result = data_dict.get('结果')
-        if not result:
-            result = data_dict.get('结果(发射与回收)')
-        if result == '成功':
-            self.launch_result.append(True)
-            s_orbital_energy_list = get_specific_orbital_energy(self.orbit[-1])
-            r_orbital_energy_list = [s_orbital_energy_list[0]
-                                     - constants.EARTH_SURFACE_POTENTIAL_ENERGY]
-            self.s_orbital_energy.append(s_orbital_energy_list[0])
-            self.r_orbital_energy.append(
-                round((r_orbital_energy_list[-1]) / 10000))
-            for s_orbital_e in s_orbital_energy_list[1:]:
-                r_orbital_energy_list.append(
-                    s_orbital_e - constants.EARTH_SURFACE_POTENTIAL_ENERGY)
-                if self.s_orbital_energy[-1] < s_orbital_e:
-                    self.s_orbital_energy[-1] = s_orbital_e
-                    self.r_orbital_energy[-1] = round(r_orbital_energy_list[-1] / 10000)
-            # unit 10J/kg
-            self.orbital_energy.append(get_orbital_energy(r_orbital_energy_list,
-                                                          self.payload_mass[-1]))
-            self.delta_v.append(round(max(get_delta_v(s_orbital_energy_list))))
-            if self.orbital_energy[-1] == 0 or not self.launch_provider[-1]:
-                print('发射时间：{time}'.format(time=self.time[-1]))
-                print('火箭：{rocket}'.format(rocket=self.launcher[-1]))
-                print('发射提供方：{lp}'.format(lp=self.launch_provider[-1]))
-                print('载荷信息：{info}'.format(info=self.payload_info[-1]))
-                print('载荷质量：{mass}'.format(mass=self.payload_mass[-1]))
-                print('轨道能量：{content:.3g}GJ'.format(
-                    content=self.orbital_energy[-1] / 100))
-                print('轨道比能量：{content:.3g}MJ/kg'.format(
-                    content=self.s_orbital_energy[-1] / 1000000))
-                print('轨道相对比能量：{content:.3g}MJ/kg'.format(
-                    content=self.r_orbital_energy[-1] / 100))
-                print('轨道理想dv：{content:.3g}km/s\n'.format(
-                    content=self.delta_v[-1] / 1000))
-        else:
-            self.launch_result.append(False)
-            self.orbital_energy.append(0)
-            self.s_orbital_energy.append(0.0)
-            self.r_orbital_energy.append(0)
-            self.delta_v.append(0)
+                self.launch_result.append(False)
+                self.orbital_energy.append(0)
+                self.s_orbital_energy.append(0.0)
+                self.r_orbital_energy.append(0)
+                self.delta_v.append(0)
+                specific_energy_list.append(0.0)
+        self.payload_table.append_launches(mass_lists=mass_lists,
+                                           specific_energy_list=specific_energy_list,
+                                           operator_list=operator_list,
+                                           developer_list=developer_list)
 
-        self.remarks.append(data_dict.get('备注'))
+        self.remarks.extend([data_dict.get('备注') for data_dict in data_dicts])
 
         # special statistics of launches
-        self.recovery_result.append(data_dict.get('结果(发射与回收)'))
-        self.recovery_ship.append(data_dict.get('回收船'))
+        self.recovery_result.extend([data_dict.get('结果(发射与回收)') for data_dict in data_dicts])
+        self.recovery_ship.extend([data_dict.get('回收船') for data_dict in data_dicts])
+
+        if diagnostics is not None:
+            for i in range(start, len(self.launch_result)):
+                if not self.launch_result[i]:
+                    continue
+                if self.orbital_energy[i] == 0:
+                    diagnostics.add(identifier=self.identifier[i], field='轨道能量',
+                                    reason='zero_orbital_energy', details=self.get_details(i))
+                if not self.launch_provider[i]:
+                    diagnostics.add(identifier=self.identifier[i], field='发射提供方',
+                                    reason='missing_launch_provider',
+                                    details=self.get_details(i))
 
 
 def launch_info_to_subs(key_list,
@@ -360,12 +561,45 @@ def launch_info_to_subs(key_list,
     ssafile.save(path=sub_filename)
 
 
+def get_first_value(data_dict,
+                    key_tuple):
+    """
+    Get the value of the first key with a non-empty value.
+    :param data_dict: A dictionary of raw data from a single launch.
+    :param key_tuple: Candidate keys in order, e.g. constants.ORBIT_KEY_CANDIDATE.
+    :return result: The value, or the value of the last key if none is non-empty.
+    """
+    result = None
+    for key in key_tuple:
+        result = data_dict.get(key)
+        if result:
+            break
+    return result
+
+
+def get_payload_mass(mass_str,
+                     payload_info):
+    """
+    Get the masses of the payloads of a launch.
+    :param mass_str: The value of '载荷质量', or None.
+    :param payload_info: The payload information of the launch, searched without mass_str.
+    :return mass_list: A list of masses in tons.
+    """
+    if mass_str:
+        return list(map(float, MASS_COMPILER.findall(mass_str)))
+    result = MASS_COMPILER.findall(payload_info)
+    if not result:
+        return [0.0]
+    return [float(result[0])]
+
+
+@functools.lru_cache(maxsize=ORBIT_CACHE_SIZE)
 def get_specific_orbital_energy(orbit_str):
     """
-    Get the specific orbital energy from the orbit_str.
+    Get the specific orbital energy from the orbit_str. The results are cached by orbit_str.
     Reference: https://en.wikipedia.org/wiki/Specific_orbital_energy
     :param orbit_str: A string contains basic orbit data.
-    :return result_list: The specific potential extra orbital energy list from payload(s).
+    :return result_tuple: The specific potential extra orbital energy tuple from payload(s).
     """
     orbit_str_list = orbit_str.split('；')
 
@@ -389,23 +623,25 @@ def get_specific_orbital_energy(orbit_str):
             specific_orbital_energy = 0.0 - constants.GEO_CONSTANT / (2.0 * semi_major_axis)
         result_list.append(specific_orbital_energy)
         i = i + 1
-    return result_list
+    return tuple(result_list)
 
 
+@functools.lru_cache(maxsize=ORBIT_CACHE_SIZE)
 def get_delta_v(s_orbital_energy_list):
     """
-    Get the ideal delta velocity from the specific orbital energy.
+    Get the ideal delta velocity from the specific orbital energy. The results are cached, so
+    s_orbital_energy_list must be a tuple, like the result of get_specific_orbital_energy.
     Reference: https://en.wikipedia.org/wiki/Vis-viva_equation
     https://en.wikipedia.org/wiki/Characteristic_energy
-    :param s_orbital_energy_list: A list contains s_orbital_energy.
-    :return result_list: The specific potential extra orbital energy list from payload(s).
+    :param s_orbital_energy_list: A tuple contains s_orbital_energy.
+    :return result_tuple: The ideal delta velocity tuple from payload(s).
     """
     result_list = []
     for s_orbital_energy in s_orbital_energy_list:
         c3_energy = s_orbital_energy * 2
         delta_v = math.sqrt(c3_energy - constants.EARTH_SURFACE_POTENTIAL_ENERGY * 2)
         result_list.append(delta_v)
-    return result_list
+    return tuple(result_list)
 
 
 def get_orbital_energy(specific_energy_list,
@@ -427,29 +663,226 @@ def get_orbital_energy(specific_energy_list,
 def get_launch_info_from_files(data_dir,
                                config_dict=None):
     """
-    Get launchinfo from multiple raw data files.
+    Get launchinfo from multiple raw data files. A launch in more than one file is kept once,
+    by config_dict['duplicate_rule'], see launch_index.DUPLICATE_RULES, and the launches of
+    all files are sorted by time. Duplicates are found among every launch of the files, before
+    the time filter, so that a correction which moves a launch out of the time filter drops
+    the earlier record inside it. A file skipped by the manifest takes part by the
+    identifiers in its entry.
     :param config_dict: A dictionary to control the plotting procedure.
     :param data_dir: A directory path contains several raw data files to read.
     :return LaunchInfoLists: An initialized LaunchInfoLists object.
     """
-    dir_data = []
-    for filename in os.listdir(data_dir):
-        if config_dict['filename_filter'] not in filename or not filename.endswith('txt'):
+    launch_info_lists = LaunchInfoLists(
+        keep_raw_records=config_dict.get('keep_raw_records', True))
+    time_start, time_end = config_dict['time_filter']
+    identifier_list = []
+    kept_list = []
+    # the identifier of every launch of the files and whether it passed the time filter
+    manifest_dict = manifest.load_manifest()
+    manifest_changed = False
+    for filename in sorted(os.listdir(data_dir)):
+        if config_dict.get('filename_filter', '') not in filename or \
+                not input_adapters.is_data_file(filename):
             continue
         abs_path = os.path.join(data_dir, filename)
-        with open(abs_path, encoding='utf-8') as data_file:
-            raw_data = data_file.read()
-            index = 0
-            raw_list = raw_data.split('\n\n')
-            for item in raw_list:
-                i = item.find('\n')
-                j = item[:i].find('：')
-                if j < 0:
-                    break
-                index = index + 1
-            dir_data.extend(raw_list[:index])
-    raw_data = '\n\n'.join(dir_data)
-    return LaunchInfoLists.from_raw_data(raw_data=raw_data, config_dict=config_dict)
+        entry = manifest.get_entry(manifest_dict, abs_path)
+        if entry and manifest.is_outside(entry, config_dict['time_filter']):
+            identifier_list.extend(entry['identifiers'])
+            kept_list.extend(itertools.repeat(False, len(entry['identifiers'])))
+            continue
+        file_identifiers = []
+        time_list = launch_info_lists.add_file(abs_path=abs_path, config_dict=config_dict,
+                                               identifier_list=file_identifiers)
+        identifier_list.extend(file_identifiers)
+        kept_list.extend(time_start <= time_obj <= time_end for time_obj in time_list)
+        if not entry:
+            manifest_dict[abs_path] = manifest.make_entry(abs_path, time_list, file_identifiers)
+            manifest_changed = True
+    if manifest_changed:
+        manifest.save_manifest(manifest_dict)
+    return launch_index.deduplicate(
+        launch_info_lists=launch_info_lists,
+        rule=config_dict.get('duplicate_rule', launch_index.DEFAULT_DUPLICATE_RULE),
+        diagnostics=config_dict.get('diagnostics'),
+        identifier_list=identifier_list,
+        kept_list=kept_list)
+
+
+def get_launch_time(time_str):
+    """
+    Get the UTC datetime of a launch from the value of '时间'.
+    :param time_str: A string like '2021-01-01 12:00:00(UTC)', a '+' marks UTC+8.
+    :return time_obj: A datetime object.
+    """
+    time_str_part = time_str[:time_str.find('(')]
+    time_obj = from_str_to_datetime(time_str_part)
+    if '+' in time_str:
+        time_obj = time_obj - datetime.timedelta(hours=8)
+    return time_obj
+
+
+def iter_record_spans(buffer):
+    """
+    Iterate the records of launches in a raw data buffer, stopping at the first block whose
+    first line has no key, e.g. the references at the end of a file.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :return: A generator of (start, end) offsets of every record.
+    """
+    start = 0
+    length = len(buffer)
+    while start < length:
+        match = RECORD_SEPARATOR.search(buffer, start)
+        end = match.start() if match else length
+        line_end = buffer.find(b'\n', start, end)
+        if line_end < 0:
+            line_end = end
+        if buffer.find(COLON_BYTES, start, line_end) < 0:
+            return
+        yield start, end
+        if not match:
+            return
+        start = match.end()
+
+
+def get_line_end(buffer,
+                 start,
+                 end):
+    """
+    Get the end of a line in a record.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :param start: The offset of the line.
+    :param end: The end offset of the record.
+    :return line_end, text_end: The offset of the line break and the end of the text
+    without '\r'.
+    """
+    line_end = buffer.find(b'\n', start, end)
+    if line_end < 0:
+        line_end = end
+    text_end = line_end
+    if text_end > start and buffer[text_end - 1] == 13:
+        text_end = text_end - 1
+    return line_end, text_end
+
+
+def get_record_line(buffer,
+                    start,
+                    end,
+                    prefix_bytes):
+    """
+    Get the value of a single line of a raw record without parsing the others.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :param start: The start offset of the record.
+    :param end: The end offset of the record.
+    :param prefix_bytes: The UTF-8 encoded key and colon of the line, e.g. TIME_PREFIX_BYTES.
+    :return text, first_line: The text of the line, or None if the record has no such line,
+    and whether it is the first line of the record.
+    """
+    if buffer[start:start + len(prefix_bytes)] == prefix_bytes:
+        i = start
+    else:
+        i = buffer.find(b'\n' + prefix_bytes, start, end) + 1
+        if not i:
+            return None, False
+    _, text_end = get_line_end(buffer, i, end)
+    return buffer[i + len(prefix_bytes):text_end].decode('utf-8'), i == start
+
+
+def get_record_time(buffer,
+                    start,
+                    end):
+    """
+    Get the UTC datetime of a launch from its raw record, decoding only the '时间' line.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :param start: The start offset of the record.
+    :param end: The end offset of the record.
+    :return time_obj: A datetime object, or None if the record has no time.
+    """
+    text, _ = get_record_line(buffer, start, end, TIME_PREFIX_BYTES)
+    if text is None:
+        return None
+    return get_launch_time(text)
+
+
+def get_record_identifier(buffer,
+                          start,
+                          end):
+    """
+    Get the identifier of a launch from its raw record, decoding only the '编号' line, the same
+    as parse_record would.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :param start: The start offset of the record.
+    :param end: The end offset of the record.
+    :return identifier: A string, or None if the record has no identifier.
+    """
+    text, first_line = get_record_line(buffer, start, end, IDENTIFIER_PREFIX_BYTES)
+    if text and not first_line and '[' in text:
+        text = ''.join(CITATION_COMPILER.split(text))
+    return text
+
+
+def parse_record(buffer,
+                 start,
+                 end,
+                 key_set=None):
+    """
+    Parse a raw record into a data_dict. Lines without a key continue the previous value and
+    citations like '[1]' are removed from every line but the first one.
+    :param buffer: A bytes-like object such as a mmap of a raw data file.
+    :param start: The start offset of the record.
+    :param end: The end offset of the record.
+    :param key_set: A set of UTF-8 encoded keys to decode, or None to decode every field.
+    :return data_dict, key_list, value_list: A dictionary of raw data from a single launch,
+    its ordered key list and its ordered value list.
+    """
+    data_dict = {}
+    key_list = []
+    value_list = []
+    last_key = None
+    first_line = True
+    pos = start
+    while pos < end:
+        line_end, text_end = get_line_end(buffer, pos, end)
+        j = buffer.find(COLON_BYTES, pos, text_end)
+        if j > pos or (first_line and j == pos):
+            key_bytes = buffer[pos:j]
+            if key_set is None or key_bytes in key_set:
+                last_key = key_bytes.decode('utf-8')
+                text = buffer[j + len(COLON_BYTES):text_end].decode('utf-8')
+                if not first_line and '[' in text:
+                    text = ''.join(CITATION_COMPILER.split(text))
+                data_dict[last_key] = text
+                key_list.append(last_key)
+                value_list.append(text)
+            else:
+                last_key = None
+        elif last_key is not None:
+            if j == pos:
+                pos = pos + len(COLON_BYTES)
+            text = buffer[pos:text_end].decode('utf-8')
+            if '[' in text:
+                text = ''.join(CITATION_COMPILER.split(text))
+            data_dict[last_key] = data_dict[last_key] + text
+            value_list[-1] = data_dict[last_key]
+        first_line = False
+        pos = line_end + 1
+    return data_dict, key_list, value_list
+
+
+def get_group(launch_info_lists,
+              group_by):
+    """
+    Get the group list to segment launch data by and its description.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param group_by: The 'group_by' option of a config.
+    :return group_list, group_text: A group list of launch_info_lists and a text string to
+    describe the group, or (None, None) if group_by is not supported.
+    """
+    if group_by == '火箭制造方':
+        return launch_info_lists.launcher_man_country, '火箭制造方\n国家/地区'
+    if group_by == '发射提供方':
+        return launch_info_lists.launch_provider, '发射提供方\n公司/组织'
+    return None, None
 
 
 def from_str_to_datetime(datetime_str,
@@ -461,6 +894,13 @@ def from_str_to_datetime(datetime_str,
     :return:
     """
     if not custom_format:
+        try:
+            time_obj = datetime.datetime.fromisoformat(datetime_str)
+        except ValueError:
+            time_obj = None
+        if time_obj is not None and time_obj.tzinfo is None:
+            # the fast path of the ISO formats below
+            return time_obj
         colon_count = datetime_str.count(':')
         if colon_count == 0:
             if ' ' not in datetime_str.rstrip():
@@ -485,6 +925,10 @@ def prcs_config_dict(config_dict):
     :param config_dict: A dictionary to control the plotting procedure.
     :return config_dict: Same dictionary as the input but processed.
     """
+    # imported here, so that reading launches does not load matplotlib
+    import matplotlib  # pylint: disable=import-outside-toplevel
+    from matplotlib import font_manager as fm  # pylint: disable=import-outside-toplevel
+
     matplotlib.rcParams.update({'font.size': constants.DEFAULT_FONTSIZE})
 
     if not config_dict:
@@ -494,7 +938,6 @@ def prcs_config_dict(config_dict):
                                   month=1,
                                   day=1),
                 constants.CURRENT_TIME],
-            'filename_filter': str(constants.CURRENT_TIME.year),
             'step_title': '{year}年世界航天发射次数统计(阶跃图)'.format(
                 year=constants.CURRENT_TIME.year),
             'step_filename':
@@ -569,6 +1012,19 @@ def prcs_config_dict(config_dict):
         else:
             config_dict['latest_month_start'] = start
 
+    for period_dict in config_dict.get('period_bars', ()):
+        period_dict['time_filter'] = [
+            from_str_to_datetime(time_str, config_dict.get('time_filter_format'))
+            for time_str in period_dict['time_filter']]
+
+    config_dict['diagnostics'] = diagnostics.Diagnostics(
+        verbosity=config_dict.get('verbosity', diagnostics.DEFAULT_VERBOSITY))
+    if config_dict.get('memory_profile'):
+        config_dict['memory_profiler'] = memory_profile.MemoryProfiler(
+            frame_interval=config_dict.get('memory_frame_interval',
+                                           memory_profile.DEFAULT_FRAME_INTERVAL),
+            top_sites=config_dict.get('memory_top_sites', memory_profile.DEFAULT_TOP_SITES))
+
     config_dict['fprop_title'] = fm.FontProperties(fname=constants.FONT_PATH)
     config_dict['fprop'] = fm.FontProperties(fname=constants.FONT_PATH)
 
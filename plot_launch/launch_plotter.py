@@ -6,23 +6,36 @@ Defines codes needed to plot using matplotlib and numpy.
 
 # Import built-in modules
 import datetime
+import functools
 import gc
-import re
+import itertools
 
 # Import third-party modules
 import matplotlib
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import matplotlib.image as mpimg
 from matplotlib.ticker import FuncFormatter
 import numpy
 
 # Any changes to the path and your own modules
+from plot_launch import color_registry
 from plot_launch import constants
+from plot_launch import group_events
+from plot_launch import image_output
+
+
+LAZY_COLUMNS = ('time', 'orbital_energy', 'r_orbital_energy', 'delta_v', 'payload_table')
+# columns of LaunchInfoLists read by the events of LaunchStatistics on first access
 
 
 class LaunchStatistics:  # pylint: disable=too-few-public-methods
     """
     Class for the statistics of orbital launches.
+    The counts of every group are computed at once, while the events of every step chart are
+    only computed on first access and then cached, so a chart only pays for the statistics it
+    draws.
     """
 
     def __init__(self,
@@ -30,134 +43,135 @@ class LaunchStatistics:  # pylint: disable=too-few-public-methods
                  group_list,
                  group_text):
         """
-        Get all the statistics needed for the plot.
+        Get the statistics needed by every plot.
         :param launch_info_lists: A LaunchInfoLists object.
         :param group_list: A group to segment launch data.
         :param group_text: A text string to describe the group.
         """
-        self.groups = numpy.unique(group_list)
+        self.column_dict = {key: getattr(launch_info_lists, key) for key in LAZY_COLUMNS}
+        # the lists themselves, as slice_info may later refill launch_info_lists with others
+        self.groups, self.group_codes = numpy.unique(group_list, return_inverse=True)
+        # group_codes[i] is the index of the group of the i-th launch in self.groups
         self.group_text = group_text
-        groups_dict = {value: key for key, value in enumerate(self.groups)}
         self.groups_length = len(self.groups)
 
-        group_set = set(self.groups)
-        constant_set = set(constants.HEX_COLOR_DICT.keys())
-        group_complement = group_set - constant_set
-        if not group_complement:
-            self.color = []
-            for group_name in self.groups:
-                self.color.append(constants.HEX_COLOR_DICT.get(group_name))
-        elif len(group_complement) < len(self.groups):
-            self.color = []
-            new_color_dict = constants.HEX_COLOR_DICT.copy()
-            i = 7
-            color_length = len(constants.HEX_COLOR_LIST)
-            compiler = re.compile(r'\(.*?\)')
-            last_item = ''
-            for group_item in group_complement:
-                origin_item = ''.join(compiler.split(group_item))
-                if origin_item in constants.HEX_COLOR_DICT and origin_item != last_item:
-                    new_color_dict[group_item] = constants.HEX_COLOR_DICT[origin_item]
-                else:
-                    new_color_dict[group_item] = constants.HEX_COLOR_LIST[i]
-                    i = (i + 1) % color_length
-                last_item = origin_item
-            for group_name in self.groups:
-                self.color.append(new_color_dict.get(group_name))
-        else:
-            color_length = len(constants.HEX_COLOR_LIST)
-            if self.groups_length < color_length:
-                self.color = constants.HEX_COLOR_LIST[:self.groups_length]
-            else:
-                self.color = constants.HEX_COLOR_LIST * int(self.groups_length / color_length) + \
-                             constants.HEX_COLOR_LIST[:self.groups_length % color_length]
-        launch_count = len(launch_info_lists.time)
-        self.total_launch_steps = numpy.zeros(
-            (len(launch_info_lists.time), self.groups_length), dtype=int)
-        self.successful_launch_time = []
-        self.scs_array = numpy.zeros(self.groups_length, dtype=int)
-        self.scs_count = 0
-        self.failure_array = numpy.zeros(self.groups_length, dtype=int)
-        self.failure_count = 0
-        self.launch_array = numpy.zeros(self.groups_length, dtype=int)
-        for i in numpy.arange(0, launch_count):
-            idx = groups_dict[group_list[i]]
-            if launch_info_lists.launch_result[i]:
-                self.successful_launch_time.append(launch_info_lists.time[i])
-                self.scs_array[idx] += 1
-                self.scs_count += 1
-            else:
-                self.failure_array[idx] += 1
-                self.failure_count += 1
-            self.launch_array[idx] += 1
-            if i > 0:
-                self.total_launch_steps[i] = self.total_launch_steps[i - 1]
-                self.total_launch_steps[i][idx] = self.total_launch_steps[i - 1][idx] + 1
-            else:
-                self.total_launch_steps[i][idx] = 1
+        self.color = color_registry.get_registry().get_colors(self.groups)
+        # indexed by the group code, i.e. the index in self.groups
+        self.result_array = numpy.array(launch_info_lists.launch_result, dtype=bool)
+        self.launch_array = numpy.bincount(self.group_codes, minlength=self.groups_length)
+        self.scs_array = numpy.bincount(self.group_codes[self.result_array],
+                                        minlength=self.groups_length)
+        self.failure_array = self.launch_array - self.scs_array
+        self.scs_count = int(numpy.sum(self.scs_array))
+        self.failure_count = int(numpy.sum(self.failure_array))
 
         self.indices = numpy.argsort(self.launch_array)
         self.r_indices = numpy.flip(self.indices)
 
-        self.total_launch_energy_steps = numpy.zeros(
-            (self.scs_count, self.groups_length), dtype=int)
-        self.total_launch_r_energy_steps = numpy.zeros(
-            (self.scs_count, self.groups_length), dtype=int)
-        self.total_launch_delta_v_steps = numpy.zeros(
-            (self.scs_count, self.groups_length), dtype=int)
-        self.total_launch_mass_steps = numpy.zeros(
-            (self.scs_count, self.groups_length), dtype=int)
-
-        i = 0
-        j = 0
-        while i < launch_count:
-            idx = groups_dict[group_list[i]]
-            if launch_info_lists.launch_result[i]:
-                k = i - j
-                if k > 0:
-                    self.total_launch_energy_steps[k] = \
-                        self.total_launch_energy_steps[k - 1]
-                    self.total_launch_energy_steps[k][idx] = \
-                        self.total_launch_energy_steps[k - 1][idx] + \
-                        launch_info_lists.orbital_energy[i]
-
-                    self.total_launch_r_energy_steps[k] = \
-                        self.total_launch_r_energy_steps[k - 1]
-                    self.total_launch_r_energy_steps[k][idx] = \
-                        self.total_launch_r_energy_steps[k - 1][idx] + \
-                        launch_info_lists.r_orbital_energy[i]
-
-                    self.total_launch_delta_v_steps[k] = \
-                        self.total_launch_delta_v_steps[k - 1]
-                    self.total_launch_delta_v_steps[k][idx] = \
-                        self.total_launch_delta_v_steps[k - 1][idx] + \
-                        launch_info_lists.delta_v[i]
-
-                    if len(launch_info_lists.payload_mass[i]) > 1:
-                        self.total_launch_mass_steps[k] = \
-                            self.total_launch_mass_steps[k - 1]
-                        self.total_launch_mass_steps[k][idx] = \
-                            self.total_launch_mass_steps[k - 1][idx] + \
-                            round(sum(launch_info_lists.payload_mass[i]) * 1000)
-                    else:
-                        self.total_launch_mass_steps[k] = self.total_launch_mass_steps[k - 1]
-                        self.total_launch_mass_steps[k][idx] = \
-                            self.total_launch_mass_steps[k - 1][idx] + \
-                            round(launch_info_lists.payload_mass[i][0] * 1000)
-                else:
-                    self.total_launch_energy_steps[k][idx] = launch_info_lists.orbital_energy[i]
-                    self.total_launch_r_energy_steps[k][idx] = \
-                        launch_info_lists.r_orbital_energy[i]
-                    self.total_launch_delta_v_steps[k][idx] = launch_info_lists.delta_v[i]
-                    if len(launch_info_lists.payload_mass[i]) > 1:
-                        self.total_launch_mass_steps[k][idx] = \
-                            round(sum(launch_info_lists.payload_mass[i]) * 1000)
-                    else:
-                        self.total_launch_mass_steps[k][idx] = \
-                            round(launch_info_lists.payload_mass[i][0] * 1000)
-            else:
-                j = j + 1
-            i = i + 1
+    def get_events(self,
+                   value_array,
+                   successful_only):
+        """
+        Accumulate a value of every launch of every group.
+        :param value_array: An int array with an item of every launch.
+        :param successful_only: Only accumulate the successful launches.
+        :return events: A GroupEvents object.
+        """
+        time_array = numpy.array(self.column_dict['time'], dtype='datetime64[us]')
+        codes = self.group_codes
+        if successful_only:
+            time_array = time_array[self.result_array]
+            codes = codes[self.result_array]
+            value_array = value_array[self.result_array]
+        return group_events.GroupEvents(time_array=time_array, codes=codes,
+                                        value_array=value_array,
+                                        groups_length=self.groups_length)
+
+    @functools.cached_property
+    def successful_launch_time(self):
+        """
+        :return successful_launch_time: A list of the times of the successful launches.
+        """
+        return list(itertools.compress(self.column_dict['time'], self.result_array))
+
+    @functools.cached_property
+    def launch_events(self):
+        """
+        :return launch_events: The launch counts of every group after every launch.
+        """
+        return self.get_events(numpy.ones(len(self.group_codes), dtype=int), False)
+
+    @functools.cached_property
+    def energy_events(self):
+        """
+        :return energy_events: The orbital energy of every group after every successful launch.
+        """
+        return self.get_events(numpy.array(self.column_dict['orbital_energy'], dtype=int),
+                               True)
+
+    @functools.cached_property
+    def r_energy_events(self):
+        """
+        :return r_energy_events: The relative orbital energy of every group after every
+        successful launch.
+        """
+        return self.get_events(numpy.array(self.column_dict['r_orbital_energy'], dtype=int),
+                               True)
+
+    @functools.cached_property
+    def delta_v_events(self):
+        """
+        :return delta_v_events: The delta-v of every group after every successful launch.
+        """
+        return self.get_events(numpy.array(self.column_dict['delta_v'], dtype=int), True)
+
+    @functools.cached_property
+    def mass_events(self):
+        """
+        :return mass_events: The payload mass in kg of every group after every successful
+        launch.
+        """
+        mass_array = numpy.round(
+            self.column_dict['payload_table'].get_launch_totals('mass') * 1000).astype(int)
+        return self.get_events(mass_array, True)
+
+
+def reduce_steps(x_array,
+                 y_value,
+                 config_dict):
+    """
+    Reduce the vertices of a line drawn with drawstyle='steps-post' without changing its shape.
+    Only the change points of y_value are kept. If there are still more vertices than pixel
+    columns of the figure, only the first, lowest, highest and last vertices of every column
+    are kept.
+    :param x_array: A sorted datetime64 array of x values.
+    :param y_value: An array of y values with the same length as x_array.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return x_array, y_value: The reduced arrays.
+    """
+    if not config_dict.get('reduce_steps', True) or len(y_value) < 3:
+        return x_array, y_value
+
+    keep = numpy.empty(len(y_value), dtype=bool)
+    keep[0] = True
+    keep[1:] = y_value[1:] != y_value[:-1]
+    keep[-1] = True
+    x_array = x_array[keep]
+    y_value = y_value[keep]
+
+    width = int(config_dict['fig_size'][0] * config_dict['dpi'])
+    x_int = x_array.astype('int64')
+    span = x_int[-1] - x_int[0]
+    if len(y_value) <= 4 * width or span <= 0:
+        return x_array, y_value
+
+    column = ((x_int - x_int[0]) / span * width).astype('int64')
+    starts = numpy.flatnonzero(numpy.diff(column, prepend=-1))
+    ends = numpy.append(starts[1:], len(column)) - 1
+    order = numpy.lexsort((y_value, column))
+    # column is sorted, so the segments of order match starts and ends
+    indices = numpy.unique(numpy.concatenate((starts, ends, order[starts], order[ends])))
+    return x_array[indices], y_value[indices]
 
 
 def draw_cc_license(
@@ -188,11 +202,33 @@ def draw_cc_license(
     axes.text(text_x, text_y, text,
               fontproperties=config_dict['fprop'], color='grey',
               transform=axes.transAxes, va='top')
-    cc_img = mpimg.imread(constants.LICENSE_IMG_PATH)
+    cc_img = get_license_image(constants.LICENSE_IMG_PATH)
     cc_img_ax = fig.add_axes([img_x, img_y, 0.1, 0.1], anchor='NE', transform=axes.transAxes)
     cc_img_ax.imshow(cc_img)
     cc_img_ax.axis('off')
-    plt.imshow(cc_img)
+
+
+@functools.lru_cache(maxsize=None)
+def get_license_image(img_path):
+    """
+    Read the license image once per process.
+    :param img_path: A path of the license image.
+    :return cc_img: An image array, which must not be modified.
+    """
+    return mpimg.imread(img_path)
+
+
+def new_figure(config_dict):
+    """
+    Create a figure with a single axes on its own Agg canvas. Nothing is registered with
+    pyplot, so figures can be drawn from several threads and are freed with their references.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return fig, axes: A matplot figure object and its axes object.
+    """
+    fig = Figure(figsize=config_dict['fig_size'], dpi=config_dict['dpi'])
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(1)
+    return fig, axes
 
 
 def plot_launch_times(launch_statistics,
@@ -205,26 +241,21 @@ def plot_launch_times(launch_statistics,
     :return None:
     """
     x_min = config_dict['time_filter'][0]
-    x_value = [x_min] + launch_info_lists.time
     x_max = config_dict['time_filter'][1]
-    x_value.append(x_max)
 
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
+    fig, axes = new_figure(config_dict)
 
     for j in launch_statistics.r_indices:
-        y_value = launch_statistics.total_launch_steps[:, j]
-        y_value = numpy.append(0, y_value)
-        y_value = numpy.append(y_value, y_value[-1])
-        plt.plot(x_value, y_value,
-                 drawstyle='steps-post',
-                 color=launch_statistics.color[j],
-                 label='{country}({number})'.format(
+        x_array, y_value = launch_statistics.launch_events.get_steps(j, x_min, x_max)
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=launch_statistics.color[j],
+                  label='{country}({number})'.format(
                      country=launch_statistics.groups[j],
                      number=str(y_value[-1])),
-                 linewidth=3)
-    plt.legend(prop=config_dict['fprop'], loc=2)
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
     axes.text(-0.008, 0.98, launch_statistics.group_text + '(次数)',
               fontproperties=config_dict['fprop'],
               transform=axes.transAxes, va='top', ha='right')
@@ -233,17 +264,17 @@ def plot_launch_times(launch_statistics,
 
     title_text = config_dict.get('step_title')
     if title_text:
-        plt.title(label=title_text, y=1.01,
-                  fontproperties=config_dict['fprop_title'], fontsize=35)
-    plt.xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
-    plt.ylabel('发射次数\n总数：{count}'.format(
+        axes.set_title(label=title_text, y=1.01,
+                       fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel('发射次数\n总数：{count}'.format(
         count=launch_statistics.scs_count + launch_statistics.failure_count),
         fontproperties=config_dict['fprop'], rotation=0, fontsize=14)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(1.075, 0.5)
-    plt.ylim(ymin=0)
-    plt.xlim(x_min,
-             xmax=x_max)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
     axes.yaxis.tick_right()
     axes.yaxis.set_label_position('right')
     for label in axes.get_xticklabels():
@@ -254,7 +285,7 @@ def plot_launch_times(launch_statistics,
     y_max = axes.get_ylim()[1] - 3
     i = 5
     while i < y_max:
-        plt.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
         i = i + 5
 
     i = 1
@@ -268,20 +299,18 @@ def plot_launch_times(launch_statistics,
         datetime_i = datetime.datetime(year=launch_info_lists.time[0].year,
                                        month=i,
                                        day=day_tuple[j])
-        plt.axvline(x=datetime_i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=datetime_i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
         i = i + j % 2
         j = j + 1
         j = j % 2
 
     draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
                     img_x=0.28, img_y=0.60, config_dict=config_dict)
-    plt.savefig(config_dict['step_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['step_filename'],
+                             config_dict=config_dict)
     gc.collect()
 
 
@@ -333,48 +362,44 @@ def plot_launch_energy(launch_statistics,
     """
 
     x_min = config_dict['time_filter'][0]
-    x_value = [x_min] + launch_statistics.successful_launch_time
     x_max = config_dict['time_filter'][1]
-    x_value.append(x_max)
 
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
+    fig, axes = new_figure(config_dict)
 
-    last_values = launch_statistics.total_launch_energy_steps[-1:].flatten()
-    r_indices = numpy.flip(numpy.argsort(last_values))
+    events = launch_statistics.energy_events
+    r_indices = numpy.flip(numpy.argsort(events.totals))
 
     for j in r_indices:
-        y_value = launch_statistics.total_launch_energy_steps[:, j]
-        y_value = numpy.append(0, y_value)
-        y_value = numpy.append(y_value, y_value[-1])
+        x_array, y_value = events.get_steps(j, x_min, x_max)
         label_value = '{value:.3g}'.format(value=round(y_value[-1] / 100000, 2))
-        plt.plot(x_value, y_value,
-                 drawstyle='steps-post',
-                 color=launch_statistics.color[j],
-                 label='{country}({number})'.format(
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=launch_statistics.color[j],
+                  label='{country}({number})'.format(
                      country=launch_statistics.groups[j],
                      number=label_value),
-                 linewidth=3)
-    plt.legend(prop=config_dict['fprop'], loc=2)
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
     axes.text(-0.008, 0.98, launch_statistics.group_text + '(能量)',
               fontproperties=config_dict['fprop'],
               transform=axes.transAxes, va='top', ha='right')
-    plt.gca().yaxis.set_major_formatter(FuncFormatter(energy_update_scale_value))
+    axes.yaxis.set_major_formatter(FuncFormatter(energy_update_scale_value))
     axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
 
     title_text = config_dict.get('energy_step_title')
     if title_text:
-        plt.title(label=title_text,
-                  y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
+        axes.set_title(label=title_text,
+                       y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
 
-    plt.xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
-    plt.ylabel('能量\n(太焦耳)\n(TJ)', fontproperties=config_dict['fprop'], rotation=0, fontsize=14)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel('能量\n(太焦耳)\n(TJ)', fontproperties=config_dict['fprop'],
+                    rotation=0, fontsize=14)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(1.075, 0.5)
-    plt.ylim(ymin=0)
-    plt.xlim(x_min,
-             xmax=x_max)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
     axes.yaxis.tick_right()
     axes.yaxis.set_label_position('right')
     for label in axes.get_xticklabels():
@@ -383,7 +408,7 @@ def plot_launch_energy(launch_statistics,
         label.set_fontproperties(config_dict['fprop'])
 
     for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
-        plt.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
 
     i = 1
     day_tuple = (1, 16)
@@ -396,20 +421,18 @@ def plot_launch_energy(launch_statistics,
         datetime_i = datetime.datetime(year=launch_statistics.successful_launch_time[0].year,
                                        month=i,
                                        day=day_tuple[j])
-        plt.axvline(x=datetime_i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=datetime_i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
         i = i + j % 2
         j = j + 1
         j = j % 2
 
     draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
                     img_x=0.28, img_y=0.60, config_dict=config_dict)
-    plt.savefig(config_dict['energy_step_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['energy_step_filename'],
+                             config_dict=config_dict)
     gc.collect()
 
 
@@ -421,49 +444,43 @@ def plot_launch_r_energy(launch_statistics,
     :return None:
     """
     x_min = config_dict['time_filter'][0]
-
-    x_value = [x_min] + launch_statistics.successful_launch_time
     x_max = config_dict['time_filter'][1]
-    x_value.append(x_max)
 
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
+    fig, axes = new_figure(config_dict)
 
-    last_values = launch_statistics.total_launch_r_energy_steps[-1:].flatten()
-    r_indices = numpy.flip(numpy.argsort(last_values))
+    events = launch_statistics.r_energy_events
+    r_indices = numpy.flip(numpy.argsort(events.totals))
 
     for j in r_indices:
-        y_value = launch_statistics.total_launch_r_energy_steps[:, j]
-        y_value = numpy.append(0, y_value)
-        y_value = numpy.append(y_value, y_value[-1])
+        x_array, y_value = events.get_steps(j, x_min, x_max)
         label_value = '{value:.3g}'.format(value=round(y_value[-1] / 100000, 2))
-        plt.plot(x_value, y_value,
-                 drawstyle='steps-post',
-                 color=launch_statistics.color[j],
-                 label='{country}({number})'.format(
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=launch_statistics.color[j],
+                  label='{country}({number})'.format(
                      country=launch_statistics.groups[j],
                      number=label_value),
-                 linewidth=3)
-    plt.legend(prop=config_dict['fprop'], loc=2)
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
     axes.text(-0.008, 0.98, launch_statistics.group_text + '(比能量)',
               fontproperties=config_dict['fprop'],
               transform=axes.transAxes, va='top', ha='right')
-    plt.gca().yaxis.set_major_formatter(FuncFormatter(energy_update_scale_value))
+    axes.yaxis.set_major_formatter(FuncFormatter(energy_update_scale_value))
     axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
 
     title_text = config_dict.get('r_energy_step_title')
     if title_text:
-        plt.title(label=title_text,
-                  y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
-    plt.xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
-    plt.ylabel('比能量\n(吉焦耳/千克)\n(GJ/kg)', fontproperties=config_dict['fprop'],
-               rotation=0, fontsize=12)
+        axes.set_title(label=title_text,
+                       y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel('比能量\n(吉焦耳/千克)\n(GJ/kg)', fontproperties=config_dict['fprop'],
+                    rotation=0, fontsize=12)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(1.075, 0.5)
-    plt.ylim(ymin=0)
-    plt.xlim(x_min,
-             xmax=x_max)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
     axes.yaxis.tick_right()
     axes.yaxis.set_label_position('right')
     for label in axes.get_xticklabels():
@@ -472,7 +489,7 @@ def plot_launch_r_energy(launch_statistics,
         label.set_fontproperties(config_dict['fprop'])
 
     for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
-        plt.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
 
     i = 1
     day_tuple = (1, 16)
@@ -485,20 +502,18 @@ def plot_launch_r_energy(launch_statistics,
         datetime_i = datetime.datetime(year=launch_statistics.successful_launch_time[0].year,
                                        month=i,
                                        day=day_tuple[j])
-        plt.axvline(x=datetime_i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=datetime_i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
         i = i + j % 2
         j = j + 1
         j = j % 2
 
     draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
                     img_x=0.28, img_y=0.60, config_dict=config_dict)
-    plt.savefig(config_dict['r_energy_step_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['r_energy_step_filename'],
+                             config_dict=config_dict)
     gc.collect()
 
 
@@ -510,49 +525,43 @@ def plot_launch_delta_v(launch_statistics,
     :return None:
     """
     x_min = config_dict['time_filter'][0]
-
-    x_value = [x_min] + launch_statistics.successful_launch_time
     x_max = config_dict['time_filter'][1]
-    x_value.append(x_max)
 
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
+    fig, axes = new_figure(config_dict)
 
-    last_values = launch_statistics.total_launch_delta_v_steps[-1:].flatten()
-    r_indices = numpy.flip(numpy.argsort(last_values))
+    events = launch_statistics.delta_v_events
+    r_indices = numpy.flip(numpy.argsort(events.totals))
 
     for j in r_indices:
-        y_value = launch_statistics.total_launch_delta_v_steps[:, j]
-        y_value = numpy.append(0, y_value)
-        y_value = numpy.append(y_value, y_value[-1])
+        x_array, y_value = events.get_steps(j, x_min, x_max)
         label_value = '{value:.3g}'.format(value=round(y_value[-1] / 1000, 2))
-        plt.plot(x_value, y_value,
-                 drawstyle='steps-post',
-                 color=launch_statistics.color[j],
-                 label='{country}({number})'.format(
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=launch_statistics.color[j],
+                  label='{country}({number})'.format(
                      country=launch_statistics.groups[j],
                      number=label_value),
-                 linewidth=3)
-    plt.legend(prop=config_dict['fprop'], loc=2)
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
     axes.text(-0.008, 0.98, launch_statistics.group_text + '(dv)',
               fontproperties=config_dict['fprop'],
               transform=axes.transAxes, va='top', ha='right')
-    plt.gca().yaxis.set_major_formatter(FuncFormatter(dv_update_scale_value))
+    axes.yaxis.set_major_formatter(FuncFormatter(dv_update_scale_value))
     axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
 
     title_text = config_dict.get('delta_v_step_title')
     if title_text:
-        plt.title(label=title_text,
-                  y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
-    plt.xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
-    plt.ylabel('dv\n(千米/秒)\n(km/s)', fontproperties=config_dict['fprop'],
-               rotation=0, fontsize=12)
+        axes.set_title(label=title_text,
+                       y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel('dv\n(千米/秒)\n(km/s)', fontproperties=config_dict['fprop'],
+                    rotation=0, fontsize=12)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(1.075, 0.5)
-    plt.ylim(ymin=0)
-    plt.xlim(x_min,
-             xmax=x_max)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
     axes.yaxis.tick_right()
     axes.yaxis.set_label_position('right')
     for label in axes.get_xticklabels():
@@ -561,7 +570,7 @@ def plot_launch_delta_v(launch_statistics,
         label.set_fontproperties(config_dict['fprop'])
 
     for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
-        plt.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
 
     i = 1
     day_tuple = (1, 16)
@@ -574,20 +583,18 @@ def plot_launch_delta_v(launch_statistics,
         datetime_i = datetime.datetime(year=launch_statistics.successful_launch_time[0].year,
                                        month=i,
                                        day=day_tuple[j])
-        plt.axvline(x=datetime_i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=datetime_i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
         i = i + j % 2
         j = j + 1
         j = j % 2
 
     draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
                     img_x=0.28, img_y=0.60, config_dict=config_dict)
-    plt.savefig(config_dict['delta_v_step_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['delta_v_step_filename'],
+                             config_dict=config_dict)
     gc.collect()
 
 
@@ -600,48 +607,43 @@ def plot_launch_mass(launch_statistics,
     """
 
     x_min = config_dict['time_filter'][0]
-
-    x_value = [x_min] + launch_statistics.successful_launch_time
     x_max = config_dict['time_filter'][1]
-    x_value.append(x_max)
 
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
+    fig, axes = new_figure(config_dict)
 
-    last_values = launch_statistics.total_launch_mass_steps[-1:].flatten()
-    r_indices = numpy.flip(numpy.argsort(last_values))
+    events = launch_statistics.mass_events
+    r_indices = numpy.flip(numpy.argsort(events.totals))
 
     for j in r_indices:
-        y_value = launch_statistics.total_launch_mass_steps[:, j]
-        y_value = numpy.append(0, y_value)
-        y_value = numpy.append(y_value, y_value[-1])
+        x_array, y_value = events.get_steps(j, x_min, x_max)
         label_value = '{value:.3g}'.format(value=round(y_value[-1] / 1000, 2))
-        plt.plot(x_value, y_value,
-                 drawstyle='steps-post',
-                 color=launch_statistics.color[j],
-                 label='{country}({number})'.format(
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=launch_statistics.color[j],
+                  label='{country}({number})'.format(
                      country=launch_statistics.groups[j],
                      number=label_value),
-                 linewidth=3)
-    plt.legend(prop=config_dict['fprop'], loc=2)
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
     axes.text(-0.008, 0.98, launch_statistics.group_text + '(质量)',
               fontproperties=config_dict['fprop'],
               transform=axes.transAxes, va='top', ha='right')
-    plt.gca().yaxis.set_major_formatter(FuncFormatter(mass_update_scale_value))
+    axes.yaxis.set_major_formatter(FuncFormatter(mass_update_scale_value))
     axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
 
     title_text = config_dict.get('mass_step_title')
     if title_text:
-        plt.title(label=title_text,
-                  y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
-    plt.xlabel('时间', fontproperties=config_dict['fprop'], fontsize=16)
-    plt.ylabel('质量\n(吨，t)', fontproperties=config_dict['fprop'], rotation=0, fontsize=16)
+        axes.set_title(label=title_text,
+                       y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=16)
+    axes.set_ylabel('质量\n(吨，t)', fontproperties=config_dict['fprop'],
+                    rotation=0, fontsize=16)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(1.075, 0.5)
-    plt.ylim(ymin=0)
-    plt.xlim(x_min,
-             xmax=x_max)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
     axes.yaxis.tick_right()
     axes.yaxis.set_label_position('right')
     for label in axes.get_xticklabels():
@@ -650,7 +652,7 @@ def plot_launch_mass(launch_statistics,
         label.set_fontproperties(config_dict['fprop'])
 
     for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
-        plt.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
 
     i = 1
     day_tuple = (1, 16)
@@ -663,95 +665,259 @@ def plot_launch_mass(launch_statistics,
         datetime_i = datetime.datetime(year=launch_statistics.successful_launch_time[0].year,
                                        month=i,
                                        day=day_tuple[j])
-        plt.axvline(x=datetime_i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=datetime_i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
         i = i + j % 2
         j = j + 1
         j = j % 2
     draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
                     img_x=0.28, img_y=0.60, config_dict=config_dict)
-    plt.savefig(config_dict['mass_step_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['mass_step_filename'],
+                             config_dict=config_dict)
+    gc.collect()
+
+
+CADENCE_METRIC_DICT = {
+    # metric: (text of the group, label of the y axis, scale of the values)
+    'count': ('(次数)', '近{window}天\n发射次数', 1),
+    'energy': ('(平均能量)', '近{window}天\n平均轨道能量\n(GJ)', 100),
+    'mass': ('(平均质量)', '近{window}天\n平均载荷质量\n(吨)', 1000)
+}
+
+
+def plot_launch_cadence(rolling_statistics,
+                        config_dict):
+    """
+    Plot the launches of every group in a sliding window, or the moving average of their
+    orbital energy or payload mass, as steps which change when a launch enters or leaves the
+    window.
+    :param rolling_statistics: A RollingStatistics object.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    window = config_dict.get('cadence_window', 30)
+    metric = config_dict.get('cadence_metric', 'count')
+    group_suffix, y_label, scale = CADENCE_METRIC_DICT[metric]
+    x_min = numpy.datetime64(config_dict['time_filter'][0], 'us')
+    x_max = numpy.datetime64(config_dict['time_filter'][1], 'us')
+
+    fig, axes = new_figure(config_dict)
+
+    for j in rolling_statistics.r_indices:
+        event_times = rolling_statistics.get_event_times(window, j)
+        # a line only changes when a launch of its own group enters or leaves the window
+        event_times = event_times[(event_times > x_min) & (event_times < x_max)]
+        x_array = numpy.concatenate(([x_min], event_times, [x_max]))
+        y_value = rolling_statistics.get_metric(metric, window, x_array[:-1], j)
+        y_value = numpy.append(y_value, y_value[-1])
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y / scale,
+                  drawstyle='steps-post',
+                  color=rolling_statistics.color[j],
+                  label='{country}({number:.3g})'.format(
+                     country=rolling_statistics.groups[j],
+                     number=y_value[-1] / scale),
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
+    axes.text(-0.008, 0.98, rolling_statistics.group_text + group_suffix,
+              fontproperties=config_dict['fprop'],
+              transform=axes.transAxes, va='top', ha='right')
+    axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
+
+    title_text = config_dict.get('cadence_step_title')
+    if title_text:
+        axes.set_title(label=title_text, y=1.01,
+                       fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('时间', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel(y_label.format(window=window),
+                    fontproperties=config_dict['fprop'], rotation=0, fontsize=14)
+    axes.xaxis.set_label_coords(0.5, -0.06)
+    axes.yaxis.set_label_coords(1.075, 0.5)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(x_min,
+                  right=x_max)
+    axes.yaxis.tick_right()
+    axes.yaxis.set_label_position('right')
+    for label in axes.get_xticklabels():
+        label.set_fontproperties(config_dict['fprop'])
+    for label in axes.get_yticklabels():
+        label.set_fontproperties(config_dict['fprop'])
+
+    for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+    for i in axes.xaxis.get_major_locator()():
+        axes.axvline(x=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=1)
+
+    draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
+                    img_x=0.28, img_y=0.60, config_dict=config_dict)
+    image_output.save_figure(fig=fig, filename=config_dict['cadence_step_filename'],
+                             config_dict=config_dict)
+    gc.collect()
+
+
+YOY_METRIC_DICT = {
+    # metric: (text of the group, label of the y axis, scale of the legend, formatter)
+    'count': ('(次数)', '发射次数', 1, count_update_scale_value),
+    'energy': ('(能量)', '能量\n(太焦耳)\n(TJ)', 100000, energy_update_scale_value),
+    'mass': ('(质量)', '质量\n(吨，t)', 1000, mass_update_scale_value)
+}
+YOY_LINE_STYLES = ('solid', 'dashed', 'dotted', 'dashdot')
+YOY_REFERENCE_START = numpy.datetime64('2000-01-01', 'us')
+# a leap year, so that every day of year has a place on the axis
+
+
+def plot_launch_yoy(year_statistics,
+                    config_dict):
+    """
+    Plot the cumulative values of every year, or of every group in every year, aligned by
+    day of year as overlaid steps.
+    :param year_statistics: A YearStatistics object.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return None:
+    """
+    group_suffix, y_label, scale, formatter = YOY_METRIC_DICT[year_statistics.metric]
+    time_start = numpy.datetime64(config_dict['time_filter'][0], 'us')
+    time_end = numpy.datetime64(config_dict['time_filter'][1], 'us')
+
+    fig, axes = new_figure(config_dict)
+
+    last_values = year_statistics.cumulative_array[year_statistics.ends - 1]
+    for k in numpy.lexsort((-last_values, year_statistics.series_years)):
+        year = year_statistics.series_years[k]
+        j = year_statistics.series_groups[k]
+        year_start = numpy.datetime64(str(year), 'us')
+        year_end = numpy.datetime64(str(year + 1), 'us')
+        offsets, values = year_statistics.get_series(k)
+        x_array = YOY_REFERENCE_START + numpy.concatenate((
+            [max(time_start, year_start) - year_start],
+            offsets,
+            [min(time_end, year_end) - year_start]))
+        y_value = numpy.concatenate(([0], values, values[-1:]))
+        year_index = int(numpy.searchsorted(year_statistics.years, year))
+        if len(year_statistics.groups) > 1:
+            color = year_statistics.color[j]
+            linestyle = YOY_LINE_STYLES[year_index % len(YOY_LINE_STYLES)]
+        else:
+            color = constants.HEX_COLOR_LIST[year_index % len(constants.HEX_COLOR_LIST)]
+            linestyle = 'solid'
+        step_x, step_y = reduce_steps(x_array=x_array, y_value=y_value, config_dict=config_dict)
+        axes.plot(step_x, step_y,
+                  drawstyle='steps-post',
+                  color=color,
+                  linestyle=linestyle,
+                  label='{year}{group}({number:.3g})'.format(
+                     year=year,
+                     group=year_statistics.groups[j],
+                     number=y_value[-1] / scale),
+                  linewidth=3)
+    axes.legend(prop=config_dict['fprop'], loc=2)
+    axes.text(-0.008, 0.98, year_statistics.group_text + group_suffix,
+              fontproperties=config_dict['fprop'],
+              transform=axes.transAxes, va='top', ha='right')
+    axes.yaxis.set_major_formatter(FuncFormatter(formatter))
+    axes.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
+    axes.xaxis.set_major_locator(mdates.MonthLocator())
+    axes.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
+
+    title_text = config_dict.get('yoy_title')
+    if title_text:
+        axes.set_title(label=title_text, y=1.01,
+                       fontproperties=config_dict['fprop_title'], fontsize=35)
+    axes.set_xlabel('日期', fontproperties=config_dict['fprop'], fontsize=18)
+    axes.set_ylabel(y_label, fontproperties=config_dict['fprop'], rotation=0, fontsize=14)
+    axes.xaxis.set_label_coords(0.5, -0.06)
+    axes.yaxis.set_label_coords(1.075, 0.5)
+    axes.set_ylim(bottom=0)
+    axes.set_xlim(YOY_REFERENCE_START,
+                  right=numpy.datetime64('2001-01-01', 'us'))
+    axes.yaxis.tick_right()
+    axes.yaxis.set_label_position('right')
+    for label in axes.get_xticklabels():
+        label.set_fontproperties(config_dict['fprop'])
+    for label in axes.get_yticklabels():
+        label.set_fontproperties(config_dict['fprop'])
+
+    for i in axes.yaxis.get_major_locator().tick_values(0, axes.get_ylim()[1]):
+        axes.axhline(y=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=0.5)
+    for i in axes.xaxis.get_major_locator()():
+        axes.axvline(x=i, color=constants.DEFAULT_AXLINE_COLOR, linestyle='solid', linewidth=1)
+
+    draw_cc_license(axes=axes, fig=fig, text_x=0.2, text_y=0.95,
+                    img_x=0.28, img_y=0.60, config_dict=config_dict)
+    image_output.save_figure(fig=fig, filename=config_dict['yoy_filename'],
+                             config_dict=config_dict)
     gc.collect()
 
 
 def font_resize(axes,
-                text_length,
+                text_lengths,
                 font_size,
                 rect_wh):
     """
-    Resize the font from font_size.
+    Resize the font from font_size for every label at once.
     Ref: https://stackoverflow.com/questions/59794014/convert-pixel-coordinates-to-data-coordinates-in-matplotlib
     https://matplotlib.org/stable/tutorials/advanced/transforms_tutorial.html
     :param axes: A matplot axes object.
-    :param text_length: The length of the text.
+    :param text_lengths: An array of the lengths of the texts.
     :param font_size: The font_size(in pixel-coordinates) before being resized.
-    :param rect_wh: The rectangle limitation(in data-coordinates) to check
+    :param rect_wh: A (n, 2) array of the rectangle limitations(in data-coordinates) to check
     if it is necessary to resize.
-    :return font_size: The font_size after being resized.
-    """
-    origin_xy = axes.transData.transform((0.0, 0.0))
-    rect_xy = axes.transData.transform(rect_wh)
-    rect_pix = (rect_xy[0] - origin_xy[0], rect_xy[1] - origin_xy[1])
-    if text_length > 1:
-        rect_font_w = int(rect_pix[0] / (text_length * 2 - 0.2))
-        # rect_pix[0] = ((text_length - 1) * 0.2 + text_length * 1.8) * rect_font_w
-        # rect_pix[0] = (text_length * 2 - 0.2) * rect_font_w
-    else:
-        rect_font_w = int(rect_pix[0])
-    if font_size > rect_font_w:
-        font_size = int(rect_font_w)
-    if font_size > rect_pix[1]:
-        font_size = int(rect_pix[1])
-    return font_size
+    :return font_sizes: An int array of the font_sizes after being resized.
+    """
+    rect_xy = axes.transData.transform(numpy.vstack(((0.0, 0.0), rect_wh)))
+    rect_pix = rect_xy[1:] - rect_xy[0]
+    # rect_pix[:, 0] = ((text_length - 1) * 0.2 + text_length * 1.8) * rect_font_w
+    # rect_pix[:, 0] = (text_length * 2 - 0.2) * rect_font_w
+    rect_font_w = numpy.trunc(numpy.where(text_lengths > 1,
+                                          rect_pix[:, 0] / (text_lengths * 2 - 0.2),
+                                          rect_pix[:, 0]))
+    font_sizes = numpy.minimum(font_size, rect_font_w)
+    font_sizes = numpy.where(font_sizes > rect_pix[:, 1], numpy.trunc(rect_pix[:, 1]), font_sizes)
+    return font_sizes.astype(int)
 
 
 def draw_labels_on_bars(axes,
                         config_dict):
     """
-    Draw the labels on the bars.
+    Draw the labels on the bars. The extents of every bar are transformed at once, and labels
+    which do not fit in their bars are skipped.
     :param axes: A matplot axes object.
     :param config_dict: A dictionary to control the plotting procedure.
     :return axes: A matplot axes object.
     """
-    y_x_dict = dict()
     default_font_size = 24
-
-    for rect in axes.patches:
-        x_value = rect.get_width()
-        if x_value <= 0:
-            continue
-        text_length = len(str(x_value))
-        font_size = font_resize(axes=axes,
-                                text_length=text_length,
-                                font_size=default_font_size,
-                                rect_wh=(x_value, rect.get_height()))
-        if text_length > 1:
-            x_offset = font_size * (0.1 - text_length)
-        elif font_size < default_font_size:
-            x_offset = font_size * (-0.9)
-        else:
-            x_offset = - font_size
-        y_value = rect.get_y() + rect.get_height() * 0.5
-        label_value = x_value
-        if y_value not in y_x_dict:
-            y_x_dict[y_value] = x_value
-        else:
-            x_value = y_x_dict[y_value] + x_value
-        label = '{:.0f}'.format(label_value)
+    rect_array = numpy.array([(rect.get_x(), rect.get_y(), rect.get_width(), rect.get_height())
+                              for rect in axes.patches], dtype=float).reshape(-1, 4)
+    rect_array = rect_array[rect_array[:, 2] > 0]
+    if not len(rect_array):
+        return axes
+
+    label_list = ['{:.0f}'.format(x_value) for x_value in rect_array[:, 2]]
+    text_lengths = numpy.array([len(label) for label in label_list])
+    font_sizes = font_resize(axes=axes,
+                             text_lengths=text_lengths,
+                             font_size=default_font_size,
+                             rect_wh=rect_array[:, 2:])
+    x_offsets = numpy.where(text_lengths > 1,
+                            font_sizes * (0.1 - text_lengths),
+                            numpy.where(font_sizes < default_font_size,
+                                        font_sizes * (-0.9),
+                                        - font_sizes))
+    x_values = rect_array[:, 0] + rect_array[:, 2]
+    y_values = rect_array[:, 1] + rect_array[:, 3] * 0.5
+    for k in numpy.flatnonzero(font_sizes > 0):
         axes.annotate(
-            label,
-            (x_value, y_value),
-            xytext=(x_offset, font_size * (-0.5)),
+            label_list[k],
+            (x_values[k], y_values[k]),
+            xytext=(x_offsets[k], font_sizes[k] * (-0.5)),
             textcoords='offset pixels',
             color='#FFFFFF',
             rotation=0,
-            fontsize=font_size,
+            fontsize=font_sizes[k],
             fontproperties=config_dict['fprop'])
+    return axes
 
 
 def plot_launch_bar(launch_statistics,
@@ -765,20 +931,18 @@ def plot_launch_bar(launch_statistics,
     y_axis_labels = []
     for country in launch_statistics.groups[indices]:
         y_axis_labels.append(country)
-    fig, axes = plt.subplots(1,
-                             figsize=config_dict['fig_size'],
-                             dpi=config_dict['dpi'])
-    axes.yaxis.set_ticks(numpy.arange(0, launch_statistics.groups_length), rotation=0)
+    fig, axes = new_figure(config_dict)
+    axes.yaxis.set_ticks(numpy.arange(0, launch_statistics.groups_length))
     axes.yaxis.set_ticklabels(y_axis_labels, fontproperties=config_dict['fprop'],
                               rotation=0, fontsize=20)
     for label in axes.get_xticklabels():
         label.set_fontproperties(config_dict['fprop'])
 
-    plt.barh(launch_statistics.groups, launch_statistics.scs_array[indices],
-             color=constants.STATUS_COLOR_DICT['成功'], label='成功')
-    plt.barh(launch_statistics.groups, launch_statistics.failure_array[indices],
-             left=launch_statistics.scs_array[indices],
-             color=constants.STATUS_COLOR_DICT['失败'], label='失败')
+    axes.barh(launch_statistics.groups, launch_statistics.scs_array[indices],
+              color=constants.STATUS_COLOR_DICT['成功'], label='成功')
+    axes.barh(launch_statistics.groups, launch_statistics.failure_array[indices],
+              left=launch_statistics.scs_array[indices],
+              color=constants.STATUS_COLOR_DICT['失败'], label='失败')
 
     major_ticks = axes.xaxis.get_major_locator().tick_values(0, axes.get_xlim()[1])
 
@@ -791,39 +955,37 @@ def plot_launch_bar(launch_statistics,
             delta = major_ticks[1]
         x_max = float(launch_statistics.scs_array[indices][-1]) \
             + float(launch_statistics.failure_array[indices][-1]) + delta
-        axes.set_xlim(xmax=x_max)
+        axes.set_xlim(right=x_max)
 
     if major_ticks[1] < 1:
         axes.xaxis.set_major_locator(matplotlib.ticker.MultipleLocator(1))
         major_ticks = axes.xaxis.get_major_locator().tick_values(0, axes.get_xlim()[1])
 
     for i in major_ticks:
-        plt.axvline(x=i,
-                    color=constants.DEFAULT_AXLINE_COLOR,
-                    linestyle='solid',
-                    linewidth=1)
+        axes.axvline(x=i,
+                     color=constants.DEFAULT_AXLINE_COLOR,
+                     linestyle='solid',
+                     linewidth=1)
     draw_labels_on_bars(axes=axes, config_dict=config_dict)
-    plt.gca().xaxis.set_major_formatter(FuncFormatter(count_update_scale_value))
+    axes.xaxis.set_major_formatter(FuncFormatter(count_update_scale_value))
     title_text = config_dict.get('bar_title')
     if title_text:
-        plt.title(label=title_text,
-                  y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
+        axes.set_title(label=title_text,
+                       y=1.01, fontproperties=config_dict['fprop_title'], fontsize=35)
 
-    plt.xlabel('发射次数(总数：{total}，失败：{failure})'.format(
+    axes.set_xlabel('发射次数(总数：{total}，失败：{failure})'.format(
         total=launch_statistics.scs_count + launch_statistics.failure_count,
         failure=launch_statistics.failure_count),
         fontproperties=config_dict['fprop'], fontsize=18)
-    plt.ylabel(launch_statistics.group_text,
-               fontproperties=config_dict['fprop'], rotation=0, fontsize=16)
+    axes.set_ylabel(launch_statistics.group_text,
+                    fontproperties=config_dict['fprop'], rotation=0, fontsize=16)
     axes.xaxis.set_label_coords(0.5, -0.06)
     axes.yaxis.set_label_coords(0, 1.0)
-    plt.legend(prop=config_dict['fprop'], loc=1)
+    axes.legend(prop=config_dict['fprop'], loc=1)
 
     draw_cc_license(axes=axes, fig=fig, text_x=0.5, text_y=0.3,
                     img_x=0.515, img_y=0.1, config_dict=config_dict)
 
-    plt.savefig(config_dict['bar_filename'])
-    plt.cla()
-    plt.clf()
-    plt.close('all')
+    image_output.save_figure(fig=fig, filename=config_dict['bar_filename'],
+                             config_dict=config_dict)
     gc.collect()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a manifest of the time range of every raw data file, so that files outside a time
+filter can be skipped without being opened. The identifiers of the launches are kept as well,
+as a skipped file may still hold a correction of a launch in another file.
+"""
+
+# Import built-in modules
+import datetime
+import json
+import os
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import constants
+
+
+def load_manifest(manifest_path=None):
+    """
+    Load the manifest from disk.
+    :param manifest_path: A path of the manifest file, defaults to constants.MANIFEST_PATH.
+    :return manifest_dict: A dictionary from absolute data file paths to their entries.
+    """
+    if manifest_path is None:
+        manifest_path = constants.MANIFEST_PATH
+    try:
+        with open(manifest_path, encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_dict,
+                  manifest_path=None):
+    """
+    Save the manifest to disk. A manifest which cannot be written is only a lost cache.
+    :param manifest_dict: A dictionary from absolute data file paths to their entries.
+    :param manifest_path: A path of the manifest file, defaults to constants.MANIFEST_PATH.
+    :return None:
+    """
+    if manifest_path is None:
+        manifest_path = constants.MANIFEST_PATH
+    temp_path = manifest_path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest_dict, manifest_file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, manifest_path)
+    except OSError:
+        pass
+
+
+def get_entry(manifest_dict,
+              abs_path):
+    """
+    Get the manifest entry of a data file if it is still valid.
+    :param manifest_dict: A dictionary from absolute data file paths to their entries.
+    :param abs_path: A path of a raw data file.
+    :return entry: A dictionary with 'min_time', 'max_time', 'count' and 'identifiers', or
+    None if the file is new or changed since the entry was made.
+    """
+    entry = manifest_dict.get(abs_path)
+    if not entry or 'identifiers' not in entry:
+        # an entry of an older version without identifiers is made again
+        return None
+    stat_result = os.stat(abs_path)
+    if entry['mtime_ns'] != stat_result.st_mtime_ns or entry['size'] != stat_result.st_size:
+        return None
+    return entry
+
+
+def make_entry(abs_path,
+               time_list,
+               identifier_list):
+    """
+    Make the manifest entry of a data file.
+    :param abs_path: A path of a raw data file.
+    :param time_list: The datetimes of every launch in the file.
+    :param identifier_list: The identifiers of every launch in the file, in order.
+    :return entry: A dictionary of the entry.
+    """
+    stat_result = os.stat(abs_path)
+    entry = {'mtime_ns': stat_result.st_mtime_ns,
+             'size': stat_result.st_size,
+             'count': len(time_list),
+             'min_time': None,
+             'max_time': None,
+             'identifiers': identifier_list}
+    if time_list:
+        entry['min_time'] = min(time_list).isoformat()
+        entry['max_time'] = max(time_list).isoformat()
+    return entry
+
+
+def is_outside(entry,
+               time_filter):
+    """
+    Check whether every launch of a data file is outside a time filter.
+    :param entry: A valid manifest entry.
+    :param time_filter: A list of the start datetime and the end datetime.
+    :return result: True if the file can be skipped.
+    """
+    if not entry['count']:
+        return True
+    return datetime.datetime.fromisoformat(entry['max_time']) < time_filter[0] or \
+        datetime.datetime.fromisoformat(entry['min_time']) > time_filter[1]
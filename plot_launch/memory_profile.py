@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines an opt-in profiler of the memory used by every stage of plotting a config.
+"""
+
+# Import built-in modules
+import contextlib
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+
+DEFAULT_FRAME_INTERVAL = 10
+# measure every Nth frame of image_seq
+DEFAULT_TOP_SITES = 10
+
+
+def get_rss():
+    """
+    Get the resident set size of this process.
+    :return rss: The size in bytes, or None where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryProfiler:
+    """
+    Class to record the tracemalloc peak and the RSS of every stage, i.e. parsing, statistics,
+    every chart and every Nth frame, and to report them with the largest allocation sites.
+    The peak of a stage is only its own when stages do not overlap, so charts are rendered
+    one at a time while profiling.
+    """
+
+    def __init__(self,
+                 frame_interval=DEFAULT_FRAME_INTERVAL,
+                 top_sites=DEFAULT_TOP_SITES):
+        """
+        :param frame_interval: Measure a frame of image_seq every frame_interval frames.
+        :param top_sites: The number of allocation sites to report.
+        """
+        self.frame_interval = max(int(frame_interval), 1)
+        self.top_sites = top_sites
+        self.stages = []
+        self.started_tracing = False
+        # whether tracemalloc was started by this profiler, which then has to stop it
+
+    @contextlib.contextmanager
+    def measure(self,
+                stage):
+        """
+        Measure a stage in a with statement.
+        :param stage: The name of the stage, e.g. 'parse' or 'chart:step_filename'.
+        :return None:
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        tracemalloc.reset_peak()
+        rss_before = get_rss()
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append({'stage': stage,
+                                'seconds': round(time.perf_counter() - time_start, 6),
+                                'current': current,
+                                'peak': peak,
+                                'rss_before': rss_before,
+                                'rss': get_rss()})
+
+    def measure_frame(self,
+                      j,
+                      last=False):
+        """
+        Measure a frame of image_seq if it is one of every frame_interval frames.
+        :param j: The sequence of the frame, from 1.
+        :param last: Whether it is the last frame, which is always measured.
+        :return context: A context manager of the with statement of the frame.
+        """
+        if last or j % self.frame_interval == 0 or j == 1:
+            return self.measure('frame:{j}'.format(j=j))
+        return contextlib.nullcontext()
+
+    def get_top_sites(self):
+        """
+        Get the sites which hold the most traced memory now.
+        :return site_list: A list of dictionaries of the largest allocation sites.
+        """
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        return [{'site': '{filename}:{lineno}'.format(filename=stat.traceback[0].filename,
+                                                      lineno=stat.traceback[0].lineno),
+                 'size': stat.size,
+                 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top_sites]]
+
+    def close(self):
+        """
+        Stop tracing if this profiler started it, so that the rest of the process does not pay
+        for it.
+        :return None:
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def report(self,
+               report_path):
+        """
+        Write the stages and the largest allocation sites as JSON, then stop tracing by close.
+        :param report_path: A path of the JSON report.
+        :return None:
+        """
+        gc.collect()
+        report_dict = {'frame_interval': self.frame_interval,
+                       'stages': self.stages,
+                       'peak': max((stage['peak'] for stage in self.stages), default=0),
+                       'top_sites': self.get_top_sites()}
+        with open(report_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report_dict, report_file, ensure_ascii=False, indent=1)
+        self.close()
+
+
+def measure(config_dict,
+            stage):
+    """
+    Measure a stage if the config profiles memory.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :param stage: The name of the stage.
+    :return context: A context manager of the with statement of the stage.
+    """
+    memory_profiler = config_dict.get('memory_profiler')
+    if memory_profiler is None:
+        return contextlib.nullcontext()
+    return memory_profiler.measure(stage)
+
+
+def measure_frame(config_dict,
+                  j,
+                  last=False):
+    """
+    Measure a frame of image_seq if the config profiles memory and the frame is sampled.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :param j: The sequence of the frame, from 1.
+    :param last: Whether it is the last frame.
+    :return context: A context manager of the with statement of the frame.
+    """
+    memory_profiler = config_dict.get('memory_profiler')
+    if memory_profiler is None:
+        return contextlib.nullcontext()
+    return memory_profiler.measure_frame(j, last=last)
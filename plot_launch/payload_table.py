@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a columnar table of the payloads of orbital launches.
+"""
+
+# Import built-in modules
+from array import array
+import itertools
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+
+
+COLUMN_TYPES = {
+    # column: typecode of array
+    'mass': 'd',
+    # ton
+    'energy': 'd',
+    # unit 10MJ, the same as LaunchInfoLists.orbital_energy
+    'operator': 'I',
+    'developer': 'I'
+    # codes of names in vocabulary
+}
+
+
+class PayloadTable:
+    """
+    Class for the payloads of orbital launches, stored as ragged columns: the payloads of the
+    i-th launch are the rows offsets[i]:offsets[i + 1] of every column. It supports len(),
+    slicing and extend like the lists of LaunchInfoLists, by launch.
+    """
+
+    def __init__(self,
+                 vocabulary=None):
+        """
+        :param vocabulary: A list of operator and developer names to share, or None.
+        """
+        self.offsets = array('q', [0])
+        self.columns = {column: array(typecode) for column, typecode in COLUMN_TYPES.items()}
+        if vocabulary is None:
+            vocabulary = []
+        self.vocabulary = vocabulary
+        self.vocabulary_dict = {name: code for code, name in enumerate(vocabulary)}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self,
+                    index):
+        if not isinstance(index, slice):
+            raise TypeError('PayloadTable only supports slicing by launch')
+        i, j, step = index.indices(len(self))
+        if step != 1:
+            raise ValueError('PayloadTable does not support a slice step')
+        j = max(i, j)
+        new_table = PayloadTable(vocabulary=self.vocabulary)
+        new_table.vocabulary_dict = self.vocabulary_dict
+        start = self.offsets[i]
+        new_table.offsets = array('q', (offset - start for offset in self.offsets[i:j + 1]))
+        for column, values in self.columns.items():
+            new_table.columns[column] = values[start:self.offsets[j]]
+        return new_table
+
+    def get_code(self,
+                 name):
+        """
+        Get the code of an operator or developer name, adding it to the vocabulary if it is new.
+        :param name: A name, or None.
+        :return code: The index of the name in vocabulary.
+        """
+        code = self.vocabulary_dict.get(name)
+        if code is None:
+            code = len(self.vocabulary)
+            self.vocabulary.append(name)
+            self.vocabulary_dict[name] = code
+        return code
+
+    def append(self,
+               mass_list,
+               specific_energy,
+               operator,
+               developer):
+        """
+        Append the payloads of a launch.
+        :param mass_list: A list of the masses of the payloads in tons, may be empty.
+        :param specific_energy: The relative specific orbital energy shared by the payloads in
+        J/kg, the same as get_orbital_energy uses, 0 for a failed launch.
+        :param operator: The payload operator of the launch.
+        :param developer: The payload developer of the launch.
+        :return None:
+        """
+        operator_code = self.get_code(operator)
+        developer_code = self.get_code(developer)
+        for mass in mass_list:
+            self.columns['mass'].append(mass)
+            self.columns['energy'].append(specific_energy * mass / 1E4)
+            # 1E3(ton to kg) / 1E7(unit 10MJ) = 1E4
+            self.columns['operator'].append(operator_code)
+            self.columns['developer'].append(developer_code)
+        self.offsets.append(len(self.columns['mass']))
+
+    def append_launches(self,
+                        mass_lists,
+                        specific_energy_list,
+                        operator_list,
+                        developer_list):
+        """
+        Append the payloads of several launches, the bulk path of append.
+        :param mass_lists: A list of the mass lists of the launches.
+        :param specific_energy_list: A list of the specific energies of the launches.
+        :param operator_list: A list of the payload operators of the launches.
+        :param developer_list: A list of the payload developers of the launches.
+        :return None:
+        """
+        get_code = self.get_code
+        operator_codes = [get_code(operator) for operator in operator_list]
+        developer_codes = [get_code(developer) for developer in developer_list]
+        counts = [len(mass_list) for mass_list in mass_lists]
+        self.columns['mass'].extend(mass for mass_list in mass_lists for mass in mass_list)
+        self.columns['energy'].extend(
+            specific_energy * mass / 1E4
+            for mass_list, specific_energy in zip(mass_lists, specific_energy_list)
+            for mass in mass_list)
+        # 1E3(ton to kg) / 1E7(unit 10MJ) = 1E4
+        self.columns['operator'].extend(
+            code for code, count in zip(operator_codes, counts) for _ in range(count))
+        self.columns['developer'].extend(
+            code for code, count in zip(developer_codes, counts) for _ in range(count))
+        base = self.offsets[-1]
+        self.offsets.extend(base + total for total in itertools.accumulate(counts))
+
+    def extend(self,
+               other):
+        """
+        Append the payloads of the launches of another PayloadTable.
+        :param other: Another PayloadTable object, e.g. a slice.
+        :return None:
+        """
+        base = self.offsets[-1]
+        self.offsets.extend(offset + base for offset in other.offsets[1:])
+        for column in ('mass', 'energy'):
+            self.columns[column].extend(other.columns[column])
+        for column in ('operator', 'developer'):
+            if other.vocabulary is self.vocabulary:
+                self.columns[column].extend(other.columns[column])
+            else:
+                code_list = [self.get_code(name) for name in other.vocabulary]
+                self.columns[column].extend(code_list[code] for code in other.columns[column])
+
+    def get_column(self,
+                   column):
+        """
+        Get a column as a numpy array.
+        :param column: 'mass', 'energy', 'operator' or 'developer'.
+        :return values: A numpy array with a row of every payload.
+        """
+        return numpy.array(self.columns[column], dtype=COLUMN_TYPES[column])
+
+    def get_counts(self):
+        """
+        Get the number of payloads of every launch.
+        :return counts: An int array with an item of every launch.
+        """
+        return numpy.diff(numpy.array(self.offsets, dtype='int64'))
+
+    def get_launch_totals(self,
+                          column):
+        """
+        Sum a column over the payloads of every launch.
+        :param column: 'mass' or 'energy'.
+        :return totals: A float array with an item of every launch, 0 for a launch without any
+        payload.
+        """
+        starts = numpy.array(self.offsets[:-1], dtype='int64')
+        non_empty = self.get_counts() > 0
+        totals = numpy.zeros(len(self))
+        if numpy.any(non_empty):
+            # the rows of an empty launch are none, so reduceat over the other starts is exact
+            totals[non_empty] = numpy.add.reduceat(self.get_column(column), starts[non_empty])
+        return totals
+
+    def sum_by(self,
+               column,
+               key='operator'):
+        """
+        Sum a column over the payloads of every operator or developer, e.g. mass per operator.
+        :param column: 'mass' or 'energy'.
+        :param key: 'operator' or 'developer'.
+        :return names, sums: A list of the names with payloads and an array of their sums.
+        """
+        codes = self.get_column(key)
+        sums = numpy.bincount(codes, weights=self.get_column(column),
+                              minlength=len(self.vocabulary))
+        present = numpy.flatnonzero(numpy.bincount(codes, minlength=len(self.vocabulary)))
+        return [self.vocabulary[code] for code in present], sums[present]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines pre-aggregated time buckets of orbital launches, so that the bar chart of any period
+is a sum of a few buckets instead of a new LaunchStatistics of a slice.
+"""
+
+# Import built-in modules
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+
+MEASURES = ('success', 'failure', 'energy', 'mass')
+# the last axis of every bucket, energy and mass only count successful launches
+ONE_DAY = numpy.timedelta64(1, 'D')
+
+
+class PeriodStatistics:  # pylint: disable=too-few-public-methods
+    """
+    Class for the launch counts of every group in a period. It has the members of
+    LaunchStatistics which plot_launch_bar uses, so it can be plotted in its place.
+    """
+
+    def __init__(self,
+                 groups,
+                 sums,
+                 group_text):
+        """
+        Keep the groups with launches in the period.
+        :param groups: An array of every group of the cube.
+        :param sums: A (groups, MEASURES) int array of the period.
+        :param group_text: A text string to describe the group.
+        """
+        present = sums[:, 0] + sums[:, 1] > 0
+        self.groups = groups[present]
+        self.group_text = group_text
+        self.groups_length = len(self.groups)
+        self.scs_array = sums[present, 0]
+        self.failure_array = sums[present, 1]
+        self.energy_array = sums[present, 2]
+        self.mass_array = sums[present, 3]
+        self.launch_array = self.scs_array + self.failure_array
+        self.scs_count = int(numpy.sum(self.scs_array))
+        self.failure_count = int(numpy.sum(self.failure_array))
+        self.indices = numpy.argsort(self.launch_array)
+        self.r_indices = numpy.flip(self.indices)
+
+
+class PeriodCube:
+    """
+    Class for the launches of every group bucketed by day and by month. Monthly buckets are a
+    dense (months, groups, MEASURES) array. Daily buckets are sparse, in COO form: only the
+    (day, group) cells with launches are stored, sorted by day. A period sums the monthly
+    buckets of its whole months and the daily buckets of the days around them.
+    """
+
+    def __init__(self,
+                 launch_info_lists,
+                 group_list,
+                 group_text):
+        """
+        Aggregate every launch into its buckets.
+        :param launch_info_lists: A LaunchInfoLists object.
+        :param group_list: A group to segment launch data.
+        :param group_text: A text string to describe the group.
+        """
+        self.groups, codes = numpy.unique(group_list, return_inverse=True)
+        self.group_text = group_text
+        groups_length = len(self.groups)
+        time_array = numpy.array(launch_info_lists.time, dtype='datetime64[us]')
+        result_array = numpy.array(launch_info_lists.launch_result, dtype=bool)
+        value_array = numpy.zeros((len(time_array), len(MEASURES)), dtype='int64')
+        value_array[:, 0] = result_array
+        value_array[:, 1] = ~result_array
+        value_array[:, 2] = numpy.where(result_array, launch_info_lists.orbital_energy, 0)
+        value_array[:, 3] = numpy.where(
+            result_array,
+            numpy.round(launch_info_lists.payload_table.get_launch_totals('mass') * 1000), 0)
+        # kg, the same rounding as LaunchStatistics.mass_events
+
+        if len(time_array):
+            self.first_month = time_array.min().astype('datetime64[M]')
+            months_length = int((time_array.max().astype('datetime64[M]')
+                                  - self.first_month).astype('int64')) + 1
+        else:
+            self.first_month = numpy.datetime64('1970-01', 'M')
+            months_length = 0
+        self.first_day = self.first_month.astype('datetime64[D]')
+        self.days_length = int(((self.first_month + months_length).astype('datetime64[D]')
+                                - self.first_day).astype('int64'))
+
+        days = (time_array.astype('datetime64[D]') - self.first_day).astype('int64')
+        cell_keys, inverse = numpy.unique(days * groups_length + codes, return_inverse=True)
+        self.cell_values = numpy.zeros((len(cell_keys), len(MEASURES)), dtype='int64')
+        numpy.add.at(self.cell_values, inverse, value_array)
+        self.cell_days = cell_keys // max(groups_length, 1)
+        self.cell_codes = cell_keys % max(groups_length, 1)
+
+        self.month_starts = (self.first_month + numpy.arange(0, months_length + 1)).astype(
+            'datetime64[D]') - self.first_day
+        # the day index of the start of every month, and of the end of the last one
+        self.month_starts = self.month_starts.astype('int64')
+        cell_months = numpy.searchsorted(self.month_starts, self.cell_days, side='right') - 1
+        self.monthly_array = numpy.zeros((months_length, groups_length, len(MEASURES)),
+                                         dtype='int64')
+        numpy.add.at(self.monthly_array, (cell_months, self.cell_codes), self.cell_values)
+
+    def get_day_index(self,
+                      time,
+                      round_up=False):
+        """
+        :param time: A datetime.
+        :param round_up: Round a time within a day up to the next day instead of down.
+        :return day: The index of the day in the cube, clipped to the days of the cube.
+        """
+        time = numpy.datetime64(time, 'us')
+        if round_up:
+            time = time + ONE_DAY - numpy.timedelta64(1, 'us')
+        day = int((time.astype('datetime64[D]') - self.first_day).astype('int64'))
+        return min(max(day, 0), self.days_length)
+
+    def get_daily_sums(self,
+                       day_start,
+                       day_end):
+        """
+        Sum the daily buckets of [day_start, day_end).
+        :param day_start: The index of the first day.
+        :param day_end: The index of the day after the last day.
+        :return sums: A (groups, MEASURES) int array.
+        """
+        sums = numpy.zeros((len(self.groups), len(MEASURES)), dtype='int64')
+        if day_start < day_end:
+            i, j = numpy.searchsorted(self.cell_days, (day_start, day_end))
+            numpy.add.at(sums, self.cell_codes[i:j], self.cell_values[i:j])
+        return sums
+
+    def get_sums(self,
+                 time_start,
+                 time_end):
+        """
+        Sum the buckets of the whole days from time_start to time_end, exclusive. Both are
+        rounded to whole days: the day of time_start is included, and a time_end within a day
+        includes that day, while a time_end at midnight does not.
+        :param time_start: The datetime of the start of the period.
+        :param time_end: The datetime of the end of the period.
+        :return sums: A (groups, MEASURES) int array.
+        """
+        day_start = self.get_day_index(time_start)
+        day_end = self.get_day_index(time_end, round_up=True)
+        month_start = numpy.searchsorted(self.month_starts, day_start, side='left')
+        month_end = numpy.searchsorted(self.month_starts, day_end, side='right') - 1
+        # the whole months of the period are month_start:month_end
+        if month_start >= month_end:
+            return self.get_daily_sums(day_start, day_end)
+        return numpy.sum(self.monthly_array[month_start:month_end], axis=0) \
+            + self.get_daily_sums(day_start, self.month_starts[month_start]) \
+            + self.get_daily_sums(self.month_starts[month_end], day_end)
+
+    def get_period_statistics(self,
+                              time_start,
+                              time_end):
+        """
+        Get the statistics of a period for plot_launch_bar.
+        :param time_start: The datetime of the start of the period.
+        :param time_end: The datetime of the end of the period.
+        :return period_statistics: A PeriodStatistics object.
+        """
+        return PeriodStatistics(groups=self.groups,
+                                sums=self.get_sums(time_start, time_end),
+                                group_text=self.group_text)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a pipeline which overlaps parsing, rendering and image encoding of a batch of configs.
+The next config is parsed by a loader process while the current one is rendered, and drawn
+figures are encoded and written by a writer thread while the next figure is drawn.
+"""
+
+# Import built-in modules
+import collections
+import concurrent.futures
+import queue
+import threading
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import launch_info
+from plot_launch import shared_dataset
+
+DEFAULT_LOAD_AHEAD = 1
+# parsed configs waiting to be rendered, each holds a whole LaunchInfoLists
+DEFAULT_WRITE_QUEUE_SIZE = 4
+# write tasks waiting to be run, each holds a full RGBA buffer
+
+
+class ImageWriter:
+    """
+    Class for a writer thread which runs write tasks in the order they are submitted.
+    """
+
+    def __init__(self,
+                 max_size=DEFAULT_WRITE_QUEUE_SIZE):
+        """
+        :param max_size: The maximum number of waiting tasks, submit blocks beyond it.
+        """
+        self.task_queue = queue.Queue(maxsize=max_size)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='plot_launch-writer', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Run the submitted tasks until close. Tasks after a failed one are skipped.
+        :return None:
+        """
+        while True:
+            task = self.task_queue.get()
+            if task is None:
+                return
+            if self.error is not None:
+                continue
+            function, args, kwargs = task
+            try:
+                function(*args, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                self.error = error
+
+    def submit(self,
+               function,
+               *args,
+               **kwargs):
+        """
+        Submit a write task, e.g. image_output.encode_rgba.
+        :param function: The function to run in the writer thread.
+        :param args: Positional arguments passed to function.
+        :param kwargs: Keyword arguments passed to function.
+        :return None:
+        """
+        self.raise_error()
+        self.task_queue.put((function, args, kwargs))
+
+    def raise_error(self):
+        """
+        Raise the error of a failed task in the calling thread.
+        :return None:
+        """
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """
+        Wait until every submitted task is done.
+        :return None:
+        """
+        self.task_queue.put(None)
+        self.thread.join()
+        self.raise_error()
+
+
+def load_config(config_dict,
+                data_dir):
+    """
+    Load the launch data of a processed config in a loader process. With
+    config_dict['shared_memory'], the data is published to shared memory and only its
+    descriptor is sent back, instead of a pickled copy.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :param data_dir: A directory path contains several raw data files.
+    :return launch_info_lists, diagnostics: A LaunchInfoLists object, or the descriptor of a
+    SharedDataset, and the Diagnostics object which collected its anomalies.
+    """
+    launch_info_lists = launch_info.get_launch_info_from_files(data_dir, config_dict=config_dict)
+    if config_dict.get('shared_memory'):
+        dataset = shared_dataset.publish(launch_info_lists)
+        dataset.release()
+        # the rendering process attaches and unlinks it
+        return dataset.descriptor, config_dict['diagnostics']
+    return launch_info_lists, config_dict['diagnostics']
+
+
+def discard_loads(future_queue):
+    """
+    Discard the configs which were loaded ahead but will not be rendered, e.g. after an error,
+    so that their shared memory blocks are not left in /dev/shm.
+    :param future_queue: A deque of (config_dict, future) of the loader process.
+    :return None:
+    """
+    while future_queue:
+        config_dict, future = future_queue.popleft()
+        if future.cancel() or not config_dict.get('shared_memory'):
+            continue
+        try:
+            descriptor, _ = future.result()
+        except Exception:  # pylint: disable=broad-except
+            # nothing was published by a failed load
+            continue
+        dataset = shared_dataset.attach(descriptor)
+        dataset.unlink()
+        dataset.close()
+
+
+def run_pipeline(config_list,
+                 data_dir,
+                 plot_function,
+                 force=False,
+                 verbosity=None,
+                 load_ahead=DEFAULT_LOAD_AHEAD):
+    """
+    Plot every config of a batch with parsing, rendering and encoding overlapped.
+    Figures are drawn in the calling thread, as matplotlib is not thread safe.
+    :param config_list: A list of unprocessed configs from the JSON config file.
+    :param data_dir: A directory path contains several raw data files.
+    :param plot_function: A function(launch_info_lists, config_dict) to render a config.
+    :param force: Render every chart even if its outputs are up to date.
+    :param verbosity: The verbosity of the diagnostics, or None to follow the configs.
+    :param load_ahead: The maximum number of configs loaded but not rendered yet.
+    :return None:
+    """
+    config_dicts = []
+    for config_dict in config_list:
+        config_dict = launch_info.prcs_config_dict(config_dict)
+        if force:
+            config_dict['force'] = True
+        if verbosity is not None:
+            config_dict['diagnostics'].verbosity = verbosity
+        config_dicts.append(config_dict)
+
+    future_queue = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        for config_dict in config_dicts[:load_ahead]:
+            future_queue.append((config_dict,
+                                 executor.submit(load_config, config_dict, data_dir)))
+        # the loader process is forked before the writer thread starts
+        image_writer = ImageWriter()
+        try:
+            for k, config_dict in enumerate(config_dicts):
+                launch_info_lists, config_dict['diagnostics'] = \
+                    future_queue.popleft()[1].result()
+                dataset = None
+                if config_dict.get('shared_memory'):
+                    dataset = shared_dataset.attach(launch_info_lists)
+                    dataset.unlink()
+                    # unlinked at once, the block is freed when it is closed or this process exits
+                    launch_info_lists = dataset.launch_info_lists
+                if k + load_ahead < len(config_dicts):
+                    next_config = config_dicts[k + load_ahead]
+                    future_queue.append((next_config,
+                                         executor.submit(load_config, next_config, data_dir)))
+                config_dict['diagnostics'].report(config_dict.get('diagnostics_report'))
+                config_dict['image_writer'] = image_writer
+                plot_function(launch_info_lists=launch_info_lists, config_dict=config_dict)
+                del launch_info_lists
+                if dataset is not None:
+                    dataset.close()
+        finally:
+            discard_loads(future_queue)
+            image_writer.close()
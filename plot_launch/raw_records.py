@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a compact storage for the raw data dictionaries of launches.
+"""
+
+# Import built-in modules
+from array import array
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import constants
+
+
+class RawRecordStorage:  # pylint: disable=too-few-public-methods
+    """
+    Class for the shared buffers of RawRecords. Keys are stored as indices into a key
+    vocabulary seeded from constants.DATA_KEY, values as UTF-8 in one byte pool.
+    """
+
+    def __init__(self):
+        self.key_list = list(constants.DATA_KEY)
+        self.key_index_dict = {key: i for i, key in enumerate(self.key_list)}
+        self.keys = array('H')
+        # key index of every field
+        self.value_ends = array('I')
+        # end offset of every value in pool
+        self.record_ends = array('I')
+        # end offset of every record in keys
+        self.pool = bytearray()
+
+    def get_key_index(self,
+                      key):
+        """
+        Get the index of a key, adding it to the vocabulary if it is new.
+        :param key: A key of a raw data dictionary.
+        :return key_index: The index of the key in key_list.
+        """
+        key_index = self.key_index_dict.get(key)
+        if key_index is None:
+            key_index = len(self.key_list)
+            self.key_list.append(key)
+            self.key_index_dict[key] = key_index
+        return key_index
+
+    def append(self,
+               data_dict):
+        """
+        Append a raw data dictionary.
+        :param data_dict: A dictionary of raw data from a single launch.
+        :return None:
+        """
+        for key, value in data_dict.items():
+            self.keys.append(self.get_key_index(key))
+            if value:
+                self.pool.extend(value.encode('utf-8'))
+            self.value_ends.append(len(self.pool))
+        self.record_ends.append(len(self.keys))
+
+    def get_fields(self,
+                   record_index):
+        """
+        Get the field range of a record.
+        :param record_index: The index of the record in the storage.
+        :return start, stop: The range of the fields in keys and value_ends.
+        """
+        start = self.record_ends[record_index - 1] if record_index else 0
+        return start, self.record_ends[record_index]
+
+    def get_value(self,
+                  field_index):
+        """
+        Decode the value of a field.
+        :param field_index: The index of the field in keys and value_ends.
+        :return value: A string.
+        """
+        start = self.value_ends[field_index - 1] if field_index else 0
+        return self.pool[start:self.value_ends[field_index]].decode('utf-8')
+
+
+class RawRecords:
+    """
+    Class for a sequence of raw data dictionaries. Dictionaries are decoded from the shared
+    RawRecordStorage only when they are accessed, and slicing returns a view of the same
+    storage instead of copying.
+    """
+
+    def __init__(self,
+                 storage=None,
+                 start=0,
+                 stop=None):
+        """
+        :param storage: A RawRecordStorage object to share, or None to create one.
+        :param start: The index of the first record of this view in storage.
+        :param stop: The index after the last record of this view, or None to follow appends.
+        """
+        if storage is None:
+            storage = RawRecordStorage()
+        self.storage = storage
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        stop = len(self.storage.record_ends) if self.stop is None else self.stop
+        return stop - self.start
+
+    def __getitem__(self,
+                    index):
+        if isinstance(index, slice):
+            i, j, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('RawRecords does not support a slice step')
+            return RawRecords(storage=self.storage,
+                              start=self.start + i,
+                              stop=self.start + max(i, j))
+        if index < 0:
+            index = index + len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('RawRecords index out of range')
+        start, stop = self.storage.get_fields(self.start + index)
+        key_list = self.storage.key_list
+        return {key_list[self.storage.keys[k]]: self.storage.get_value(k)
+                for k in range(start, stop)}
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self[i]
+
+    def get(self,
+            index,
+            key,
+            default=None):
+        """
+        Get a single value of a record without decoding the whole record.
+        :param index: The index of the record.
+        :param key: A key of the raw data dictionary.
+        :param default: The value to return if the record does not have the key.
+        :return value: A string, or default.
+        """
+        key_index = self.storage.key_index_dict.get(key)
+        if key_index is None:
+            return default
+        start, stop = self.storage.get_fields(self.start + index)
+        for k in range(start, stop):
+            if self.storage.keys[k] == key_index:
+                return self.storage.get_value(k)
+        return default
+
+    def append(self,
+               data_dict):
+        """
+        Append a raw data dictionary.
+        :param data_dict: A dictionary of raw data from a single launch.
+        :return None:
+        """
+        if self.stop is not None or self.start:
+            raise ValueError('Cannot append to a view of RawRecords')
+        self.storage.append(data_dict)
+
+    def extend(self,
+               data_dicts):
+        """
+        Append several raw data dictionaries.
+        :param data_dicts: An iterable of raw data dictionaries, e.g. another RawRecords.
+        :return None:
+        """
+        for data_dict in data_dicts:
+            self.append(data_dict)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a library API to render a chart into memory instead of a file.
+Example:
+    config_dict = launch_info.prcs_config_dict({'time_filter': [...], ...})
+    png_bytes = render_api.render_chart('step', launch_info_lists, config_dict)
+    rgba = render_api.render_chart('bar', launch_info_lists, config_dict, output_format='rgba')
+"""
+
+# Import built-in modules
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import image_output
+from plot_launch import launch_info
+from plot_launch import launch_plotter
+from plot_launch import rolling_statistics
+from plot_launch import year_statistics
+
+
+def get_group(launch_info_lists,
+              config_dict):
+    """
+    Get the group of a config, raising on an unsupported one.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return group_list, group_text: See launch_info.get_group.
+    """
+    group_list, group_text = launch_info.get_group(launch_info_lists=launch_info_lists,
+                                                   group_by=config_dict['group_by'])
+    if group_list is None:
+        raise ValueError('unknown group_by: {group_by}'.format(group_by=config_dict['group_by']))
+    return group_list, group_text
+
+
+def get_launch_statistics(launch_info_lists,
+                          config_dict):
+    """
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return kwargs: A dictionary with a LaunchStatistics object.
+    """
+    group_list, group_text = get_group(launch_info_lists, config_dict)
+    return {'launch_statistics': launch_plotter.LaunchStatistics(
+        launch_info_lists=launch_info_lists,
+        group_list=group_list,
+        group_text=group_text)}
+
+
+def get_step_statistics(launch_info_lists,
+                        config_dict):
+    """
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return kwargs: A dictionary with a LaunchStatistics object and launch_info_lists.
+    """
+    kwargs = get_launch_statistics(launch_info_lists, config_dict)
+    kwargs['launch_info_lists'] = launch_info_lists
+    return kwargs
+
+
+def get_rolling_statistics(launch_info_lists,
+                           config_dict):
+    """
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return kwargs: A dictionary with a RollingStatistics object.
+    """
+    group_list, group_text = get_group(launch_info_lists, config_dict)
+    return {'rolling_statistics': rolling_statistics.RollingStatistics(
+        launch_info_lists=launch_info_lists,
+        group_list=group_list,
+        group_text=group_text)}
+
+
+def get_year_statistics(launch_info_lists,
+                        config_dict):
+    """
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return kwargs: A dictionary with a YearStatistics object.
+    """
+    group_list, group_text = None, ''
+    if config_dict.get('yoy_by_group'):
+        group_list, group_text = get_group(launch_info_lists, config_dict)
+    return {'year_statistics': year_statistics.YearStatistics(
+        launch_info_lists=launch_info_lists,
+        metric=config_dict.get('yoy_metric', 'count'),
+        group_list=group_list,
+        group_text=group_text)}
+
+
+CHART_DICT = {
+    # chart: (filename key, plot function, function to get the statistics it needs)
+    'step': ('step_filename', launch_plotter.plot_launch_times, get_step_statistics),
+    'energy': ('energy_step_filename', launch_plotter.plot_launch_energy,
+               get_launch_statistics),
+    'r_energy': ('r_energy_step_filename', launch_plotter.plot_launch_r_energy,
+                 get_launch_statistics),
+    'delta_v': ('delta_v_step_filename', launch_plotter.plot_launch_delta_v,
+                get_launch_statistics),
+    'mass': ('mass_step_filename', launch_plotter.plot_launch_mass, get_launch_statistics),
+    'bar': ('bar_filename', launch_plotter.plot_launch_bar, get_launch_statistics),
+    'cadence': ('cadence_step_filename', launch_plotter.plot_launch_cadence,
+                get_rolling_statistics),
+    'yoy': ('yoy_filename', launch_plotter.plot_launch_yoy, get_year_statistics)
+}
+
+
+def render_chart(chart,
+                 launch_info_lists,
+                 config_dict,
+                 output_format='png',
+                 options=None,
+                 statistics=None):
+    """
+    Render a chart into memory. Nothing is written to disk and config_dict is not modified,
+    so it is safe to call from several threads.
+    :param chart: A key of CHART_DICT, e.g. 'step' or 'bar'.
+    :param launch_info_lists: A LaunchInfoLists object, which must not be empty.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :param output_format: 'png', another format of image_output.MemoryOutput, or 'rgba'.
+    :param options: A dictionary of encoder options, see image_output.MemoryOutput.
+    :param statistics: The keyword arguments of the plot function from the function in
+    CHART_DICT, to reuse statistics across charts, or None to compute them.
+    :return value: The encoded bytes, or a (height, width, 4) uint8 array for 'rgba'.
+    """
+    if chart not in CHART_DICT:
+        raise ValueError('unknown chart: {chart}'.format(chart=chart))
+    filename_key, plot_function, get_statistics = CHART_DICT[chart]
+    if statistics is None:
+        statistics = get_statistics(launch_info_lists, config_dict)
+    memory_output = image_output.MemoryOutput(output_format=output_format, options=options)
+    chart_config = dict(config_dict)
+    chart_config[filename_key] = memory_output
+    chart_config.pop('image_writer', None)
+    plot_function(config_dict=chart_config, **statistics)
+    return memory_output.getvalue()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines codes needed to skip rendering charts whose inputs did not change.
+"""
+
+# Import built-in modules
+import hashlib
+import json
+import os
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import constants
+from plot_launch import image_output
+
+FINGERPRINT_SUFFIX = '.fingerprint'
+COMMON_CONFIG_KEYS = ('group_by', 'split_by', 'fig_size', 'dpi', 'outputs', 'reduce_steps')
+CHART_CONFIG_KEYS = {
+    'step_filename': ('step_title',),
+    'energy_step_filename': ('energy_step_title',),
+    'r_energy_step_filename': ('r_energy_step_title',),
+    'delta_v_step_filename': ('delta_v_step_title',),
+    'mass_step_filename': ('mass_step_title',),
+    'cadence_step_filename': ('cadence_step_title', 'cadence_window', 'cadence_metric'),
+    'yoy_filename': ('yoy_title', 'yoy_metric', 'yoy_by_group'),
+    'bar_filename': ('bar_title',),
+    'latest_month_bar': ('month_title', 'latest_month_start', 'latest_month_end'),
+    'period_bar': ('bar_title', 'period_filter')
+}
+
+
+def get_record_digest(launch_info_lists,
+                      i):
+    """
+    Get the digest of the fields of a single launch which can change a chart.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param i: The sequence of the launch.
+    :return digest: A bytes digest.
+    """
+    record = (launch_info_lists.time[i].isoformat(),
+              launch_info_lists.identifier[i],
+              launch_info_lists.launcher_man_country[i],
+              launch_info_lists.launch_provider[i],
+              launch_info_lists.launch_result[i],
+              launch_info_lists.orbital_energy[i],
+              launch_info_lists.r_orbital_energy[i],
+              launch_info_lists.delta_v[i],
+              tuple(launch_info_lists.payload_mass[i]))
+    return hashlib.sha256(repr(record).encode('utf-8')).digest()
+
+
+def get_prefix_digests(launch_info_lists):
+    """
+    Get the chained digests of every prefix of launch_info_lists, so that the digest of the
+    first j launches is prefix_digests[j] and image_seq frames cost O(1) each.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :return prefix_digests: A list of bytes digests with len(launch_info_lists.time) + 1 items.
+    """
+    prefix_digests = [hashlib.sha256(b'').digest()]
+    for i in range(0, len(launch_info_lists.time)):
+        prefix_digests.append(hashlib.sha256(
+            prefix_digests[-1] + get_record_digest(launch_info_lists, i)).digest())
+    return prefix_digests
+
+
+def get_fingerprint(data_digest,
+                    last_time,
+                    filename_key,
+                    config_dict):
+    """
+    Get the fingerprint of a chart job.
+    The end of time_filter, and latest_month_end which is copied from it, is replaced by the
+    time of the latest launch when it was clamped to CURRENT_TIME, otherwise every run would
+    produce a new fingerprint.
+    :param data_digest: The digest of the input data slice from get_prefix_digests.
+    :param last_time: The datetime of the latest launch in the data slice, or None.
+    :param filename_key: The key of the chart filename in config_dict, e.g. 'step_filename'.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return fingerprint: A hex string.
+    """
+    time_start, time_end = config_dict['time_filter']
+    if time_end == constants.CURRENT_TIME and last_time:
+        time_end = last_time
+    config_keys = COMMON_CONFIG_KEYS + CHART_CONFIG_KEYS.get(filename_key, ())
+    relevant_config = {key: config_dict.get(key) for key in config_keys}
+    relevant_config['time_filter'] = [time_start, time_end]
+    if relevant_config.get('latest_month_end') == constants.CURRENT_TIME and last_time:
+        relevant_config['latest_month_end'] = last_time
+    relevant_config[filename_key] = config_dict[filename_key]
+    config_text = json.dumps(relevant_config, default=str, ensure_ascii=False, sort_keys=True)
+
+    sha256 = hashlib.sha256(data_digest)
+    sha256.update(config_text.encode('utf-8'))
+    sha256.update(constants.VERSION.encode('utf-8'))
+    return sha256.hexdigest()
+
+
+def is_up_to_date(filename,
+                  fingerprint,
+                  config_dict):
+    """
+    Check whether the outputs of a chart already carry the fingerprint.
+    :param filename: The filename of the chart from config_dict.
+    :param fingerprint: A hex string from get_fingerprint.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return result: True if the chart does not need to be rendered again.
+    """
+    for target in image_output.get_output_targets(filename, config_dict):
+        if not os.path.exists(target['filename']):
+            return False
+    try:
+        with open(filename + FINGERPRINT_SUFFIX, encoding='utf-8') as fingerprint_file:
+            return fingerprint_file.read().strip() == fingerprint
+    except OSError:
+        return False
+
+
+def store_fingerprint(filename,
+                      fingerprint):
+    """
+    Store the fingerprint of a chart in a sidecar file next to it.
+    :param filename: The filename of the chart from config_dict.
+    :param fingerprint: A hex string from get_fingerprint.
+    :return None:
+    """
+    with open(filename + FINGERPRINT_SUFFIX, 'w', encoding='utf-8') as fingerprint_file:
+        fingerprint_file.write(fingerprint + '\n')
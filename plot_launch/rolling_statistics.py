@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines the statistics of orbital launches over sliding time windows.
+"""
+
+# Import built-in modules
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+from plot_launch import color_registry
+from plot_launch import group_events
+
+
+DEFAULT_WINDOWS = (30, 90, 365)
+# days
+
+
+class RollingStatistics:
+    """
+    Class for the launch cadence and moving averages of every group over sliding windows.
+    The launches are stored by group like GroupEvents: the launches of the k-th group are the
+    rows offsets[k]:offsets[k + 1] of times, in time order. A window sum of a group is the
+    difference of two items of a prefix sum over its own launches, found by searchsorted on
+    its own times, so a window costs O(log n) per evaluated time and a prefix sum takes
+    O(launches) memory whatever the number of groups. Prefix sums are computed on first use.
+    """
+
+    def __init__(self,
+                 launch_info_lists,
+                 group_list,
+                 group_text,
+                 windows=DEFAULT_WINDOWS):
+        """
+        Sort the launches by group.
+        :param launch_info_lists: A LaunchInfoLists object sorted by time.
+        :param group_list: A group to segment launch data.
+        :param group_text: A text string to describe the group.
+        :param windows: The lengths of the default windows in days.
+        """
+        self.groups, codes = numpy.unique(group_list, return_inverse=True)
+        self.group_text = group_text
+        self.groups_length = len(self.groups)
+        self.color = color_registry.get_registry().get_colors(self.groups)
+        self.windows = tuple(windows)
+        self.time_array = numpy.array(launch_info_lists.time, dtype='datetime64[us]')
+        group_events.check_time_sorted(self.time_array)
+
+        self.launch_array = numpy.bincount(codes, minlength=self.groups_length)
+        self.r_indices = numpy.flip(numpy.argsort(self.launch_array, kind='stable'))
+        order = numpy.argsort(codes, kind='stable')
+        self.offsets = numpy.zeros(self.groups_length + 1, dtype='int64')
+        numpy.cumsum(self.launch_array, out=self.offsets[1:])
+        self.times = self.time_array[order]
+
+        self.result_array = numpy.array(launch_info_lists.launch_result, dtype=bool)[order]
+        mass_array = numpy.round(
+            launch_info_lists.payload_table.get_launch_totals('mass') * 1000)
+        # the same rounding as LaunchStatistics.mass_events, in kg
+        self.value_dict = {
+            'energy': numpy.array(launch_info_lists.orbital_energy, dtype=float)[order],
+            'mass': mass_array[order]
+        }
+        self.prefix_dict = {}
+
+    def get_prefix(self,
+                   key):
+        """
+        Get the prefix sum of a value in the order of times.
+        :param key: 'count', 'success', 'energy' or 'mass'.
+        :return prefix: A float array, prefix[offsets[k] + m] - prefix[offsets[k]] is the sum of
+        the first m launches of the k-th group.
+        """
+        if key not in self.prefix_dict:
+            if key == 'count':
+                values = numpy.ones(len(self.times))
+            elif key == 'success':
+                values = self.result_array.astype(float)
+            else:
+                values = numpy.where(self.result_array, self.value_dict[key], 0.0)
+            prefix = numpy.zeros(len(values) + 1)
+            numpy.cumsum(values, out=prefix[1:])
+            self.prefix_dict[key] = prefix
+        return self.prefix_dict[key]
+
+    def get_window_sums(self,
+                        key,
+                        window,
+                        times=None,
+                        k=None):
+        """
+        Sum a value of the launches in (t - window, t] for every time t.
+        :param key: 'count', 'success', 'energy' or 'mass'.
+        :param window: The length of the window in days.
+        :param times: A datetime64 array of the times to evaluate, defaults to the launch times.
+        :param k: The group code, or None for every group.
+        :return sums: A len(times) array of the group, or a (len(times), groups_length) array.
+        """
+        if times is None:
+            times = self.time_array
+        if k is None:
+            sums = numpy.zeros((len(times), self.groups_length))
+            for code in range(0, self.groups_length):
+                sums[:, code] = self.get_window_sums(key, window, times, code)
+            return sums
+        window_delta = numpy.timedelta64(int(window), 'D')
+        i, j = self.offsets[k], self.offsets[k + 1]
+        group_times = self.times[i:j]
+        end_indices = numpy.searchsorted(group_times, times, side='right')
+        start_indices = numpy.searchsorted(group_times, times - window_delta, side='right')
+        prefix = self.get_prefix(key)
+        return prefix[i + end_indices] - prefix[i + start_indices]
+
+    def get_cadence(self,
+                    window,
+                    times=None,
+                    k=None):
+        """
+        Count the launches in the last window days.
+        :param window: The length of the window in days.
+        :param times: A datetime64 array of the times to evaluate, defaults to the launch times.
+        :param k: The group code, or None for every group.
+        :return cadence: An int array, see get_window_sums.
+        """
+        return self.get_window_sums('count', window, times, k).astype(int)
+
+    def get_moving_average(self,
+                           key,
+                           window,
+                           times=None,
+                           k=None):
+        """
+        Average a value over the successful launches in the last window days.
+        :param key: 'energy' or 'mass'.
+        :param window: The length of the window in days.
+        :param times: A datetime64 array of the times to evaluate, defaults to the launch times.
+        :param k: The group code, or None for every group.
+        :return average: A float array, see get_window_sums, 0 without any launch.
+        """
+        sums = self.get_window_sums(key, window, times, k)
+        counts = self.get_window_sums('success', window, times, k)
+        return numpy.divide(sums, counts, out=numpy.zeros_like(sums), where=counts > 0)
+
+    def get_metric(self,
+                   metric,
+                   window,
+                   times=None,
+                   k=None):
+        """
+        Get a metric of the cadence chart.
+        :param metric: 'count', 'energy' or 'mass'.
+        :param window: The length of the window in days.
+        :param times: A datetime64 array of the times to evaluate, defaults to the launch times.
+        :param k: The group code, or None for every group.
+        :return values: An array, see get_window_sums.
+        """
+        if metric == 'count':
+            return self.get_cadence(window, times, k)
+        return self.get_moving_average(metric, window, times, k)
+
+    def get_event_times(self,
+                        window,
+                        k=None):
+        """
+        Get every time at which a window sum can change, i.e. when a launch enters the window
+        and when it leaves it, so that a step chart of the window sums is exact.
+        :param window: The length of the window in days.
+        :param k: The group code, or None for the launches of every group.
+        :return times: A sorted datetime64 array.
+        """
+        if k is None:
+            time_array = self.time_array
+        else:
+            time_array = self.times[self.offsets[k]:self.offsets[k + 1]]
+        window_delta = numpy.timedelta64(int(window), 'D')
+        return numpy.unique(numpy.concatenate((time_array, time_array + window_delta)))
+
+    def get_window_dict(self,
+                        metric='count'):
+        """
+        Get a metric at every launch time for every default window.
+        :param metric: 'count', 'energy' or 'mass'.
+        :return window_dict: A dictionary from window lengths to (n, groups_length) arrays.
+        """
+        return {window: self.get_metric(metric, window) for window in self.windows}
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a local HTTP service which renders charts on demand from launch data in memory.
+"""
+
+# Import built-in modules
+import bisect
+import collections
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import launch_index
+from plot_launch import launch_info
+from plot_launch import watch
+# render_api is imported where charts are rendered, as it loads matplotlib
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+LATENCY_WINDOW = 1024
+MAX_DPI = 1000
+MAX_PIXELS = 10000
+# the maximum width and height of a chart, as the canvas is allocated at once
+
+QUERY_KEYS = ('chart', 'time_filter', 'time_filter_format', 'group_by', 'fig_size', 'dpi',
+              'width', 'step_title', 'energy_step_title', 'r_energy_step_title',
+              'delta_v_step_title', 'mass_step_title', 'bar_title', 'cadence_step_title',
+              'cadence_window', 'cadence_metric', 'yoy_title', 'yoy_metric', 'yoy_by_group')
+_CONFIG_LOCK = threading.Lock()
+# launch_info.prcs_config_dict sets the global matplotlib rcParams and fonts
+
+
+class ImageCache:
+    """
+    Class for a least recently used cache of rendered images bounded by their total size.
+    """
+
+    def __init__(self,
+                 max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        :param max_bytes: The maximum total size of the cached images.
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.images = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self,
+            key):
+        """
+        Get a cached image and mark it as recently used.
+        :param key: A hashable key of the request.
+        :return image: The bytes of the image, or None.
+        """
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+            return image
+
+    def put(self,
+            key,
+            image):
+        """
+        Cache an image and evict the least recently used ones beyond max_bytes.
+        :param key: A hashable key of the request.
+        :param image: The bytes of the image.
+        :return None:
+        """
+        if len(image) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.images:
+                self.total_bytes = self.total_bytes - len(self.images.pop(key))
+            self.images[key] = image
+            self.total_bytes = self.total_bytes + len(image)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.images.popitem(last=False)
+                self.total_bytes = self.total_bytes - len(evicted)
+
+
+class ServiceMetrics:
+    """
+    Class for the latency and cache hit-rate metrics of the chart service.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.server_errors = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.lock = threading.Lock()
+
+    def record(self,
+               latency,
+               hit=None,
+               server_error=False):
+        """
+        Record a finished request.
+        :param latency: The latency of the request in seconds.
+        :param hit: True for a cache hit, False for a cache miss, None for an error.
+        :param server_error: Whether the error was a failure to render, not a bad request.
+        :return None:
+        """
+        with self.lock:
+            self.requests = self.requests + 1
+            if hit is None:
+                self.errors = self.errors + 1
+                if server_error:
+                    self.server_errors = self.server_errors + 1
+            elif hit:
+                self.hits = self.hits + 1
+            else:
+                self.misses = self.misses + 1
+            self.latencies.append(latency)
+
+    def to_dict(self,
+                image_cache):
+        """
+        Get a snapshot of the metrics.
+        :param image_cache: The ImageCache object of the service.
+        :return metrics_dict: A dictionary of the metrics.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            lookups = self.hits + self.misses
+            metrics_dict = {
+                'requests': self.requests,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'server_errors': self.server_errors,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'cache_items': len(image_cache.images),
+                'cache_bytes': image_cache.total_bytes
+            }
+        if latencies:
+            metrics_dict['latency_ms'] = {
+                'mean': sum(latencies) / len(latencies) * 1000,
+                'p50': latencies[len(latencies) // 2] * 1000,
+                'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+                'max': latencies[-1] * 1000
+            }
+        return metrics_dict
+
+
+class ChartService:
+    """
+    Class to render charts from launch data held in memory.
+    """
+
+    def __init__(self,
+                 launch_info_lists,
+                 max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        :param launch_info_lists: A LaunchInfoLists object sorted by time.
+        :param max_bytes: The maximum total size of the cached images.
+        """
+        self.launch_info_lists = launch_info_lists
+        self.image_cache = ImageCache(max_bytes=max_bytes)
+        self.metrics = ServiceMetrics()
+
+    def get_config_dict(self,
+                        query_dict):
+        """
+        Build a config from the query parameters, which accept the same keys as the JSON
+        config. Lists are separated by commas, e.g. time_filter=2019-01-01,2022-12-31, and
+        'width' scales the dpi to get a chart of that many pixels wide.
+        :param query_dict: A dictionary of the query parameters.
+        :return config_dict: A processed dictionary to control the plotting procedure.
+        """
+        from plot_launch import render_api  # pylint: disable=import-outside-toplevel
+        chart = query_dict.get('chart', 'step')
+        if chart not in render_api.CHART_DICT:
+            raise ValueError('unknown chart: {chart}'.format(chart=chart))
+        if 'time_filter' not in query_dict:
+            raise ValueError('time_filter is required')
+        time_filter = query_dict['time_filter'].split(',')
+        if len(time_filter) != 2:
+            raise ValueError('time_filter needs a start and an end')
+        config_dict = {'time_filter': time_filter,
+                       'time_filter_format': query_dict.get('time_filter_format', '%Y-%m-%d')}
+        for key in QUERY_KEYS:
+            if key.endswith('_title') and key in query_dict:
+                config_dict[key] = query_dict[key]
+        if 'group_by' in query_dict:
+            config_dict['group_by'] = query_dict['group_by']
+        if 'fig_size' in query_dict:
+            config_dict['fig_size'] = [float(value) for value in query_dict['fig_size'].split(',')]
+            if len(config_dict['fig_size']) != 2 or not min(config_dict['fig_size']) > 0:
+                raise ValueError('fig_size needs a positive width and height')
+        if 'dpi' in query_dict:
+            config_dict['dpi'] = int(query_dict['dpi'])
+        if 'cadence_window' in query_dict:
+            config_dict['cadence_window'] = int(query_dict['cadence_window'])
+        for key in ('cadence_metric', 'yoy_metric'):
+            if key in query_dict:
+                config_dict[key] = query_dict[key]
+        if 'yoy_by_group' in query_dict:
+            config_dict['yoy_by_group'] = query_dict['yoy_by_group'] in ('1', 'true')
+        with _CONFIG_LOCK:
+            config_dict = launch_info.prcs_config_dict(config_dict)
+        if 'width' in query_dict:
+            width = int(query_dict['width'])
+            if not 0 < width <= MAX_PIXELS:
+                raise ValueError('width must be above 0 and at most {max_pixels} pixels'.format(
+                    max_pixels=MAX_PIXELS))
+            config_dict['dpi'] = width / config_dict['fig_size'][0]
+        check_size(config_dict)
+        config_dict['chart'] = chart
+        return config_dict
+
+    def render(self,
+               config_dict):
+        """
+        Render a chart to PNG bytes.
+        :param config_dict: A dictionary from get_config_dict.
+        :return image: The bytes of the PNG image.
+        """
+        from plot_launch import render_api  # pylint: disable=import-outside-toplevel
+        time_list = self.launch_info_lists.time
+        i = bisect.bisect_left(time_list, config_dict['time_filter'][0])
+        j = bisect.bisect_right(time_list, config_dict['time_filter'][1])
+        new_lists = launch_info.LaunchInfoLists()
+        new_lists.extend(self.launch_info_lists, i, j)
+        if not new_lists.time:
+            raise ValueError('no launches in time_filter')
+        return render_api.render_chart(chart=config_dict['chart'],
+                                       launch_info_lists=new_lists,
+                                       config_dict=config_dict)
+
+    def get_chart(self,
+                  query_dict):
+        """
+        Get a chart from the cache, or render and cache it.
+        :param query_dict: A dictionary of the query parameters.
+        :return image, hit: The bytes of the PNG image and whether it was a cache hit.
+        """
+        key = tuple(sorted((key, value) for key, value in query_dict.items()
+                           if key in QUERY_KEYS))
+        image = self.image_cache.get(key)
+        if image is not None:
+            return image, True
+        image = self.render(self.get_config_dict(query_dict))
+        self.image_cache.put(key, image)
+        return image, False
+
+
+def check_size(config_dict):
+    """
+    Check that a chart of a request is not too large to render.
+    :param config_dict: A processed dictionary to control the plotting procedure.
+    :return None:
+    """
+    dpi = config_dict['dpi']
+    if not 0 < dpi <= MAX_DPI:
+        raise ValueError('dpi must be above 0 and at most {max_dpi}'.format(max_dpi=MAX_DPI))
+    for size in config_dict['fig_size']:
+        if not 0 < size * dpi <= MAX_PIXELS:
+            raise ValueError('the width and height of a chart must be above 0 and at most '
+                             '{max_pixels} pixels'.format(max_pixels=MAX_PIXELS))
+
+
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    """
+    Class to handle the requests of /chart and /metrics.
+    """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Handle a GET request.
+        :return None:
+        """
+        service = self.server.chart_service
+        url = urlsplit(self.path)
+        if url.path == '/metrics':
+            body = json.dumps(service.metrics.to_dict(service.image_cache)).encode('utf-8')
+            self.send_body(200, 'application/json', body)
+            return
+        if url.path != '/chart':
+            self.send_body(404, 'text/plain; charset=utf-8', b'not found')
+            return
+
+        start = time.perf_counter()
+        try:
+            image, hit = service.get_chart(dict(parse_qsl(url.query)))
+        except (ValueError, KeyError) as error:
+            service.metrics.record(time.perf_counter() - start)
+            self.send_body(400, 'text/plain; charset=utf-8', str(error).encode('utf-8'))
+            return
+        except Exception as error:  # pylint: disable=broad-except
+            # any other failure to render, e.g. of matplotlib, still gets a response
+            service.metrics.record(time.perf_counter() - start, server_error=True)
+            self.send_body(500, 'text/plain; charset=utf-8',
+                           '{name}: {error}'.format(name=type(error).__name__,
+                                                    error=error).encode('utf-8'))
+            return
+        service.metrics.record(time.perf_counter() - start, hit=hit)
+        self.send_body(200, 'image/png', image)
+
+    def send_body(self,
+                  code,
+                  content_type,
+                  body):
+        """
+        Send a response with a body.
+        :param code: The HTTP status code.
+        :param content_type: The content type of body.
+        :param body: The bytes of the body.
+        :return None:
+        """
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Keep the requests out of stderr.
+        :return None:
+        """
+
+
+def load_launch_info_lists(data_dir):
+    """
+    Load every launch of every raw data file in filename order, keeping the last launch of an
+    identifier, sorted by time.
+    :param data_dir: A directory path contains several raw data files.
+    :return launch_info_lists: A LaunchInfoLists object.
+    """
+    launch_info_lists = launch_info.LaunchInfoLists()
+    for filename in sorted(os.listdir(data_dir)):
+        if watch.is_data_file(filename):
+            launch_info_lists.extend(watch.parse_file(os.path.join(data_dir, filename), None))
+    return launch_index.deduplicate(launch_info_lists)
+
+
+def make_server(launch_info_lists,
+                host=DEFAULT_HOST,
+                port=DEFAULT_PORT,
+                max_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Make a chart server. Port 0 picks a free port, see server.server_address.
+    :param launch_info_lists: A LaunchInfoLists object sorted by time.
+    :param host: The host to listen on.
+    :param port: The port to listen on.
+    :param max_bytes: The maximum total size of the cached images.
+    :return server: A ThreadingHTTPServer object with a chart_service attribute.
+    """
+    server = ThreadingHTTPServer((host, port), ChartRequestHandler)
+    server.chart_service = ChartService(launch_info_lists=launch_info_lists,
+                                        max_bytes=max_bytes)
+    return server
+
+
+def serve(data_dir,
+          host=DEFAULT_HOST,
+          port=DEFAULT_PORT,
+          max_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Load the data and serve charts until interrupted.
+    :param data_dir: A directory path contains several raw data files.
+    :param host: The host to listen on.
+    :param port: The port to listen on.
+    :param max_bytes: The maximum total size of the cached images.
+    :return None:
+    """
+    server = make_server(launch_info_lists=load_launch_info_lists(data_dir),
+                         host=host, port=port, max_bytes=max_bytes)
+    print('Serving charts on http://{host}:{port}/chart'.format(
+        host=server.server_address[0], port=server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines a hand-off of launch data to other processes through shared memory. The numeric
+columns, the payload table and the statistics of LaunchStatistics are packed into a single
+block, and string columns are stored as codes of a shared vocabulary, so that another process
+attaches all of them from a small descriptor instead of unpickling a copy.
+Example:
+    dataset = shared_dataset.publish(launch_info_lists, {'火箭制造方': launch_statistics})
+    # pass dataset.descriptor to a worker process, which runs
+    worker_dataset = shared_dataset.attach(descriptor)
+    launch_info_lists = worker_dataset.launch_info_lists
+"""
+
+# Import built-in modules
+import collections
+import datetime
+import gc
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+from plot_launch import group_events
+from plot_launch import launch_info
+from plot_launch import payload_table
+
+NUMERIC_COLUMNS = {
+    # column of LaunchInfoLists: dtype
+    'time': 'datetime64[us]',
+    's_orbital_energy': 'float64',
+    'r_orbital_energy': 'int64',
+    'orbital_energy': 'int64',
+    'delta_v': 'int64',
+    'launch_result': 'bool'
+}
+STRING_COLUMNS = ('identifier', 'launcher_man_country', 'location', 'mission_name',
+                  'flight_num', 'launch_provider', 'payload_provider', 'payload_operator',
+                  'payload_developer', 'payload_info', 'launcher', 'orbit', 'remarks',
+                  'recovery_result', 'recovery_ship')
+# columns of LaunchInfoLists stored as codes of the vocabulary, -1 for None
+STATISTICS_ARRAYS = ('groups', 'group_codes', 'result_array', 'launch_array', 'scs_array',
+                     'failure_array', 'indices', 'r_indices')
+STATISTICS_VALUES = ('group_text', 'groups_length', 'color', 'scs_count', 'failure_count')
+# small members of LaunchStatistics carried by the descriptor itself
+EVENT_NAMES = ('launch_events', 'energy_events', 'r_energy_events', 'delta_v_events',
+               'mass_events')
+EVENT_ARRAYS = ('offsets', 'times', 'cumulative_array', 'totals')
+ALIGNMENT = 64
+ITER_CHUNK = 65536
+# items converted to Python objects at once while iterating a column
+EPOCH = datetime.datetime(1970, 1, 1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class SharedColumn:
+    """
+    Class for a numeric column in shared memory. It supports len(), indexing, slicing and
+    iteration like the lists of LaunchInfoLists, converting items to Python objects on access,
+    and numpy.array() without a copy.
+    """
+
+    def __init__(self,
+                 values):
+        """
+        :param values: A numpy array, usually a view of a shared memory block.
+        """
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self,
+                    index):
+        if isinstance(index, slice):
+            return SharedColumn(self.values[index])
+        return self.values[index].item()
+
+    def __iter__(self):
+        for i in range(0, len(self.values), ITER_CHUNK):
+            yield from self.values[i:i + ITER_CHUNK].tolist()
+
+    def __array__(self,
+                  dtype=None):
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype, copy=False)
+
+
+class SharedVocabulary:
+    """
+    Class for the strings of every string column, stored as UTF-8 bytes one after another.
+    A string is only decoded when it is accessed.
+    """
+
+    def __init__(self,
+                 data,
+                 offsets):
+        """
+        :param data: A uint8 array of the encoded strings.
+        :param offsets: An int64 array, the k-th string is data[offsets[k]:offsets[k + 1]].
+        """
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self,
+            code):
+        """
+        :param code: The code of a string, or -1.
+        :return text: The string, or None for -1.
+        """
+        if code < 0:
+            return None
+        return self.data[self.offsets[code]:self.offsets[code + 1]].tobytes().decode('utf-8')
+
+
+class SharedStrings:
+    """
+    Class for a string column stored as codes of a SharedVocabulary. It supports the same
+    operations as SharedColumn, and numpy.array() decodes every distinct string once.
+    """
+
+    def __init__(self,
+                 codes,
+                 vocabulary):
+        """
+        :param codes: An int32 array of the code of every item.
+        :param vocabulary: A SharedVocabulary object.
+        """
+        self.codes = codes
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self,
+                    index):
+        if isinstance(index, slice):
+            return SharedStrings(self.codes[index], self.vocabulary)
+        return self.vocabulary.get(self.codes[index])
+
+    def __iter__(self):
+        for i in range(0, len(self.codes), ITER_CHUNK):
+            for code in self.codes[i:i + ITER_CHUNK].tolist():
+                yield self.vocabulary.get(code)
+
+    def __array__(self,
+                  dtype=None):
+        unique_codes, inverse = numpy.unique(self.codes, return_inverse=True)
+        values = numpy.empty(len(unique_codes), dtype=object)
+        values[:] = [self.vocabulary.get(code) for code in unique_codes.tolist()]
+        values = values[inverse]
+        if dtype is None:
+            return values
+        return values.astype(dtype)
+
+
+class SharedRagged:
+    """
+    Class for a column of lists, e.g. payload_mass, whose i-th item is the list
+    values[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self,
+                 values,
+                 offsets):
+        """
+        :param values: A numpy array of the items of every list.
+        :param offsets: An int64 array with an item more than the number of lists.
+        """
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self,
+                    index):
+        if isinstance(index, slice):
+            i, j, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('SharedRagged does not support a slice step')
+            return SharedRagged(self.values, self.offsets[i:max(i, j) + 1])
+        if index < 0:
+            index = index + len(self)
+        return self.values[self.offsets[index]:self.offsets[index + 1]].tolist()
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self[i]
+
+
+def get_time_array(time_list):
+    """
+    Convert datetimes to an array by integer arithmetic, which is several times faster than
+    the conversion of datetime objects by numpy.
+    :param time_list: A list of naive datetimes.
+    :return time_array: A datetime64[us] array.
+    """
+    return numpy.fromiter(((time_obj - EPOCH) // ONE_MICROSECOND for time_obj in time_list),
+                          dtype='int64', count=len(time_list)).view('datetime64[us]')
+
+
+def get_vocabulary_dict():
+    """
+    Get an empty vocabulary for encode_strings.
+    :return vocabulary_dict: A dictionary of every string to its code, in the order of codes.
+    A string gets the next code when it is first looked up, and None is always -1.
+    """
+    vocabulary_dict = collections.defaultdict()
+    vocabulary_dict[None] = -1
+    vocabulary_dict.default_factory = lambda: len(vocabulary_dict) - 1
+    return vocabulary_dict
+
+
+def encode_strings(value_list,
+                   vocabulary_dict):
+    """
+    Encode a string column as codes, adding new strings to the vocabulary.
+    :param value_list: A list of strings or None.
+    :param vocabulary_dict: A dictionary from get_vocabulary_dict.
+    :return codes: An int32 array, -1 for None.
+    """
+    return numpy.fromiter(map(vocabulary_dict.__getitem__, value_list), dtype='int32',
+                          count=len(value_list))
+
+
+def get_statistics_arrays(launch_statistics,
+                          key):
+    """
+    Get the arrays of a LaunchStatistics object to share, with the events computed so far.
+    :param launch_statistics: A LaunchStatistics object.
+    :param key: The key of the statistics in the descriptor.
+    :return array_dict, event_list: A dictionary of names to arrays and the names of the
+    shared events.
+    """
+    array_dict = {}
+    for name in STATISTICS_ARRAYS:
+        array_dict['{key}.{name}'.format(key=key, name=name)] = getattr(launch_statistics, name)
+    groups_name = '{key}.groups'.format(key=key)
+    if array_dict[groups_name].dtype == object:
+        array_dict[groups_name] = array_dict[groups_name].astype(str)
+    event_list = [name for name in EVENT_NAMES if name in vars(launch_statistics)]
+    # only the events which have been accessed, see the cached properties of LaunchStatistics
+    for name in event_list:
+        events = getattr(launch_statistics, name)
+        for array_name in EVENT_ARRAYS:
+            array_dict['{key}.{name}.{array_name}'.format(
+                key=key, name=name, array_name=array_name)] = getattr(events, array_name)
+    return array_dict, event_list
+
+
+class SharedDataset:
+    """
+    Class for launch data in a block of shared memory, either published by this process or
+    attached from a descriptor. The attached objects are read-only views of the block, so they
+    must be dropped before close().
+    """
+
+    def __init__(self,
+                 block,
+                 descriptor):
+        """
+        Build the views of a block.
+        :param block: A multiprocessing.shared_memory.SharedMemory object.
+        :param descriptor: A dictionary from publish, see get_array.
+        """
+        self.block = block
+        self.descriptor = descriptor
+        vocabulary = SharedVocabulary(data=self.get_array('vocabulary.data'),
+                                      offsets=self.get_array('vocabulary.offsets'))
+        self.launch_info_lists = launch_info.LaunchInfoLists(keep_raw_records=False)
+        for column in NUMERIC_COLUMNS:
+            setattr(self.launch_info_lists, column, SharedColumn(self.get_array(column)))
+        for column in STRING_COLUMNS:
+            setattr(self.launch_info_lists, column,
+                    SharedStrings(self.get_array(column), vocabulary))
+        table = payload_table.PayloadTable(
+            vocabulary=SharedStrings(self.get_array('payload_table.vocabulary'), vocabulary))
+        table.offsets = self.get_array('payload_table.offsets')
+        table.columns = {column: self.get_array('payload_table.{column}'.format(column=column))
+                         for column in payload_table.COLUMN_TYPES}
+        self.launch_info_lists.payload_table = table
+        self.launch_info_lists.payload_mass = SharedRagged(table.columns['mass'], table.offsets)
+        self.statistics_dict = {key: self.get_statistics(key)
+                                for key in descriptor['statistics']}
+
+    def get_array(self,
+                  name):
+        """
+        Get a read-only view of an array in the block.
+        :param name: A name in descriptor['arrays'], e.g. 'time'.
+        :return values: A numpy array.
+        """
+        offset, dtype, shape = self.descriptor['arrays'][name]
+        values = numpy.ndarray(shape, dtype=dtype, buffer=self.block.buf, offset=offset)
+        values.flags.writeable = False
+        return values
+
+    def get_statistics(self,
+                       key):
+        """
+        Rebuild a LaunchStatistics object from the block, with its shared events already
+        computed.
+        :param key: A key of descriptor['statistics'].
+        :return launch_statistics: A LaunchStatistics object.
+        """
+        # imported here, as launch_plotter loads matplotlib
+        from plot_launch import launch_plotter  # pylint: disable=import-outside-toplevel
+        statistics_descriptor = self.descriptor['statistics'][key]
+        launch_statistics = launch_plotter.LaunchStatistics.__new__(
+            launch_plotter.LaunchStatistics)
+        launch_statistics.column_dict = {column: getattr(self.launch_info_lists, column)
+                                         for column in launch_plotter.LAZY_COLUMNS}
+        for name in STATISTICS_ARRAYS:
+            setattr(launch_statistics, name,
+                    self.get_array('{key}.{name}'.format(key=key, name=name)))
+        for name in STATISTICS_VALUES:
+            setattr(launch_statistics, name, statistics_descriptor[name])
+        for name in statistics_descriptor['events']:
+            events = group_events.GroupEvents.__new__(group_events.GroupEvents)
+            for array_name in EVENT_ARRAYS:
+                setattr(events, array_name, self.get_array('{key}.{name}.{array_name}'.format(
+                    key=key, name=name, array_name=array_name)))
+            setattr(launch_statistics, name, events)
+            # fills the cached property
+        return launch_statistics
+
+    def close(self):
+        """
+        Drop the views and unmap the block in this process. The block itself lives on until it
+        is unlinked.
+        :return None:
+        """
+        self.launch_info_lists = None
+        self.statistics_dict = None
+        gc.collect()
+        # views held by reference cycles, e.g. of a figure, would keep the block exported
+        self.block.close()
+
+    def unlink(self):
+        """
+        Free the block, once every process has closed it or will not attach it any more.
+        :return None:
+        """
+        self.block.unlink()
+
+    def release(self):
+        """
+        Close the block without unlinking it, and keep this process from unlinking it at exit,
+        so that it outlives this process, e.g. a loader process, until the process which
+        attaches it unlinks it.
+        :return None:
+        """
+        self.close()
+        resource_tracker.unregister(self.block._name,  # pylint: disable=protected-access
+                                    'shared_memory')
+
+
+def publish(launch_info_lists,
+            statistics_dict=None):
+    """
+    Copy launch data into a new block of shared memory. Raw records are not shared, so the
+    attached LaunchInfoLists has no data_dicts.
+    :param launch_info_lists: A LaunchInfoLists object.
+    :param statistics_dict: A dictionary of keys to LaunchStatistics objects of
+    launch_info_lists to share, or None.
+    :return shared_dataset: A SharedDataset object, whose descriptor is passed to other
+    processes.
+    """
+    array_dict = {}
+    vocabulary_dict = get_vocabulary_dict()
+    for column, dtype in NUMERIC_COLUMNS.items():
+        if column == 'time':
+            array_dict[column] = get_time_array(launch_info_lists.time)
+        else:
+            array_dict[column] = numpy.array(getattr(launch_info_lists, column), dtype=dtype)
+    for column in STRING_COLUMNS:
+        array_dict[column] = encode_strings(getattr(launch_info_lists, column), vocabulary_dict)
+    table = launch_info_lists.payload_table
+    array_dict['payload_table.offsets'] = numpy.array(table.offsets, dtype='int64')
+    for column, typecode in payload_table.COLUMN_TYPES.items():
+        array_dict['payload_table.{column}'.format(column=column)] = numpy.array(
+            table.columns[column], dtype=typecode)
+    array_dict['payload_table.vocabulary'] = encode_strings(table.vocabulary, vocabulary_dict)
+
+    statistics_descriptor = {}
+    for key, launch_statistics in (statistics_dict or {}).items():
+        statistics_arrays, event_list = get_statistics_arrays(launch_statistics, key)
+        array_dict.update(statistics_arrays)
+        statistics_descriptor[key] = {name: getattr(launch_statistics, name)
+                                      for name in STATISTICS_VALUES}
+        statistics_descriptor[key]['events'] = event_list
+
+    encoded_list = [text.encode('utf-8') for text in vocabulary_dict if text is not None]
+    vocabulary_offsets = numpy.zeros(len(encoded_list) + 1, dtype='int64')
+    numpy.cumsum([len(encoded) for encoded in encoded_list], out=vocabulary_offsets[1:])
+    array_dict['vocabulary.data'] = numpy.frombuffer(b''.join(encoded_list), dtype='uint8')
+    array_dict['vocabulary.offsets'] = vocabulary_offsets
+
+    layout = {}
+    size = 0
+    for name, values in array_dict.items():
+        layout[name] = (size, values.dtype.str, values.shape)
+        size = size + -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, values in array_dict.items():
+        offset, dtype, shape = layout[name]
+        numpy.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = values
+    descriptor = {'name': block.name,
+                  'arrays': layout,
+                  'statistics': statistics_descriptor}
+    return SharedDataset(block=block, descriptor=descriptor)
+
+
+def attach(descriptor):
+    """
+    Attach launch data published by another process.
+    :param descriptor: The descriptor of a SharedDataset from publish.
+    :return shared_dataset: A SharedDataset object with launch_info_lists and statistics_dict.
+    """
+    return SharedDataset(block=shared_memory.SharedMemory(name=descriptor['name']),
+                         descriptor=descriptor)
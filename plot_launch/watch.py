@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines codes needed to keep launch data in memory and re-render charts when raw data files
+change.
+"""
+
+# Import built-in modules
+import copy
+import ctypes
+import ctypes.util
+import datetime
+import json
+import os
+import select
+import struct
+import time
+
+# Import third-party modules
+
+# Any changes to the path and your own modules
+from plot_launch import constants
+from plot_launch import diagnostics
+from plot_launch import input_adapters
+from plot_launch import launch_index
+from plot_launch import launch_info
+from plot_launch import render_cache
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+SETTLE_TIME = 0.2
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def is_data_file(filename):
+    """
+    Check whether a filename is a raw data file.
+    :param filename: A filename in the data directory.
+    :return result: True if it is a raw data file.
+    """
+    return input_adapters.is_data_file(filename)
+
+
+class InotifyWatcher:
+    """
+    Class to wait for changed raw data files by inotify.
+    """
+
+    def __init__(self,
+                 data_dir):
+        """
+        Watch a data directory by inotify.
+        :param data_dir: A directory path contains several raw data files.
+        """
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError('libc is not available')
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(data_dir), INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, 'inotify_add_watch failed')
+
+    def read_events(self):
+        """
+        Read the pending inotify events.
+        :return changed_set: A set of changed filenames.
+        """
+        changed_set = set()
+        buffer = os.read(self.fd, 65536)
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, name_length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset = offset + INOTIFY_EVENT.size
+            filename = os.fsdecode(buffer[offset:offset + name_length].rstrip(b'\0'))
+            offset = offset + name_length
+            if is_data_file(filename):
+                changed_set.add(filename)
+        return changed_set
+
+    def wait(self):
+        """
+        Block until some raw data files changed. Events in a short settle time are merged so
+        that a checkout of many files results in one update.
+        :return changed_set: A set of changed filenames.
+        """
+        changed_set = set()
+        while not changed_set:
+            select.select([self.fd], [], [])
+            changed_set = self.read_events()
+            while select.select([self.fd], [], [], SETTLE_TIME)[0]:
+                changed_set = changed_set | self.read_events()
+        return changed_set
+
+    def close(self):
+        """
+        Stop watching.
+        :return None:
+        """
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Class to wait for changed raw data files by polling their modification time and size.
+    """
+
+    def __init__(self,
+                 data_dir,
+                 interval=DEFAULT_POLL_INTERVAL):
+        """
+        Watch a data directory by polling.
+        :param data_dir: A directory path contains several raw data files.
+        :param interval: Seconds between two scans.
+        """
+        self.data_dir = data_dir
+        self.interval = interval
+        self.state = self.scan()
+
+    def scan(self):
+        """
+        Get the modification time and size of every raw data file.
+        :return state: A dictionary from filenames to (mtime_ns, size).
+        """
+        state = {}
+        for filename in os.listdir(self.data_dir):
+            if not is_data_file(filename):
+                continue
+            try:
+                stat_result = os.stat(os.path.join(self.data_dir, filename))
+            except OSError:
+                continue
+            state[filename] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return state
+
+    def wait(self):
+        """
+        Block until some raw data files changed.
+        :return changed_set: A set of changed filenames.
+        """
+        changed_set = set()
+        while not changed_set:
+            time.sleep(self.interval)
+            state = self.scan()
+            for filename in set(state) | set(self.state):
+                if state.get(filename) != self.state.get(filename):
+                    changed_set.add(filename)
+            self.state = state
+        return changed_set
+
+    def close(self):
+        """
+        Stop watching.
+        :return None:
+        """
+
+
+def get_watcher(data_dir,
+                interval=DEFAULT_POLL_INTERVAL):
+    """
+    Get an inotify watcher, or a polling watcher where inotify is not available.
+    :param data_dir: A directory path contains several raw data files.
+    :param interval: Seconds between two scans of the polling watcher.
+    :return watcher: An InotifyWatcher or a PollingWatcher object.
+    """
+    try:
+        return InotifyWatcher(data_dir)
+    except (OSError, AttributeError):
+        return PollingWatcher(data_dir, interval=interval)
+
+
+class WatchSession:
+    """
+    Class to keep the parsed launch data of every raw data file in memory and re-render only
+    the configs affected by changed launches. The anomalies of the files parsed in an update
+    cycle are collected in one Diagnostics object and reported at its end.
+    """
+
+    def __init__(self,
+                 config_list,
+                 data_dir,
+                 plot_function,
+                 force=False,
+                 verbosity=None):
+        """
+        :param config_list: A list of unprocessed configs from the JSON config file.
+        :param data_dir: A directory path contains several raw data files.
+        :param plot_function: A function(launch_info_lists, config_dict) to render a config.
+        :param force: Render every chart even if its outputs are up to date.
+        :param verbosity: The verbosity of the diagnostics, or None to follow the configs.
+        """
+        self.config_list = config_list
+        self.data_dir = data_dir
+        self.plot_function = plot_function
+        self.force = force
+        self.verbosity = verbosity
+        self.config_dicts = []
+        self.file_lists = {}
+        # (split key, filename) -> LaunchInfoLists of the whole file
+        self.diagnostics = self.new_diagnostics()
+
+    def new_diagnostics(self):
+        """
+        :return diagnostics: A Diagnostics object for the files parsed in an update cycle.
+        """
+        if self.verbosity is None:
+            return diagnostics.Diagnostics()
+        return diagnostics.Diagnostics(verbosity=self.verbosity)
+
+    def process_configs(self):
+        """
+        Process every config again with the current time, so that clamped time filters keep
+        following new launches.
+        :return None:
+        """
+        constants.CURRENT_TIME = datetime.datetime.utcnow()
+        self.config_dicts = []
+        for config_dict in self.config_list:
+            config_dict = launch_info.prcs_config_dict(copy.deepcopy(config_dict))
+            if self.force:
+                config_dict['force'] = True
+            if self.verbosity is not None:
+                config_dict['diagnostics'].verbosity = self.verbosity
+            self.config_dicts.append(config_dict)
+
+    def get_file_lists(self,
+                       filename,
+                       config_dict):
+        """
+        Get the launch data of a whole raw data file for a config, parsing it only once.
+        :param filename: A raw data filename in data_dir.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :return launch_info_lists: A LaunchInfoLists object.
+        """
+        key = (get_split_key(config_dict), filename)
+        if key not in self.file_lists:
+            self.file_lists[key] = parse_file(os.path.join(self.data_dir, filename),
+                                              config_dict.get('split_by'),
+                                              diagnostics=self.diagnostics)
+        return self.file_lists[key]
+
+    def get_launch_info_lists(self,
+                              config_dict):
+        """
+        Build the launch data of a config from the parsed files in memory. Every launch is
+        filtered by its own time, as get_launch_info_from_files does, since a file of
+        corrections is not sorted by time.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :return launch_info_lists: A LaunchInfoLists object sorted by time.
+        """
+        time_start, time_end = config_dict['time_filter']
+        launch_info_lists = launch_info.LaunchInfoLists()
+        identifier_list = []
+        kept_list = []
+        for filename in sorted(os.listdir(self.data_dir)):
+            if config_dict.get('filename_filter', '') not in filename or not is_data_file(filename):
+                continue
+            file_lists = self.get_file_lists(filename, config_dict)
+            file_kept_list = [time_start <= time_obj <= time_end for time_obj in file_lists.time]
+            sequence_list = [i for i, kept in enumerate(file_kept_list) if kept]
+            for i, j in launch_index.get_runs(sequence_list):
+                launch_info_lists.extend(file_lists, i, j)
+            identifier_list.extend(file_lists.identifier)
+            kept_list.extend(file_kept_list)
+        # duplicates are found among every launch before the time filter, as in
+        # get_launch_info_from_files
+        return launch_index.deduplicate(
+            launch_info_lists=launch_info_lists,
+            rule=config_dict.get('duplicate_rule', launch_index.DEFAULT_DUPLICATE_RULE),
+            diagnostics=config_dict.get('diagnostics'),
+            identifier_list=identifier_list,
+            kept_list=kept_list)
+
+    def render(self,
+               config_dict):
+        """
+        Render every chart of a config from the data in memory.
+        :param config_dict: A dictionary to control the plotting procedure.
+        :return None:
+        """
+        launch_info_lists = self.get_launch_info_lists(config_dict)
+        config_dict['diagnostics'].report(config_dict.get('diagnostics_report'))
+        self.plot_function(launch_info_lists=launch_info_lists, config_dict=config_dict)
+
+    def update(self,
+               changed_set):
+        """
+        Parse the changed files again and re-render the configs whose time ranges include
+        changed launches.
+        :param changed_set: A set of changed filenames.
+        :return count: The number of re-rendered configs.
+        """
+        self.diagnostics = self.new_diagnostics()
+        changed_times = {}
+        for key in list(self.file_lists):
+            split_key, filename = key
+            if filename not in changed_set:
+                continue
+            old_lists = self.file_lists.pop(key)
+            abs_path = os.path.join(self.data_dir, filename)
+            if os.path.exists(abs_path):
+                new_lists = parse_file(abs_path, json.loads(split_key),
+                                       diagnostics=self.diagnostics)
+                self.file_lists[key] = new_lists
+            else:
+                new_lists = launch_info.LaunchInfoLists()
+            changed_times[key] = get_changed_times(old_lists, new_lists)
+
+        self.process_configs()
+        count = 0
+        for config_dict in self.config_dicts:
+            if is_affected(config_dict, changed_set, changed_times):
+                self.render(config_dict)
+                count = count + 1
+        self.diagnostics.report()
+        return count
+
+    def run(self,
+            watcher):
+        """
+        Render every config once, then re-render affected configs on every change.
+        :param watcher: An InotifyWatcher or a PollingWatcher object.
+        :return None:
+        """
+        self.process_configs()
+        for config_dict in self.config_dicts:
+            self.render(config_dict)
+        self.diagnostics.report()
+        while True:
+            changed_set = watcher.wait()
+            count = self.update(changed_set)
+            print('{files} changed, {count} config(s) re-rendered'.format(
+                files=', '.join(sorted(changed_set)), count=count))
+
+
+def get_split_key(config_dict):
+    """
+    Get a hashable key of the parsing options of a config.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :return split_key: A JSON string of config_dict['split_by'].
+    """
+    return json.dumps(config_dict.get('split_by'), ensure_ascii=False, sort_keys=True)
+
+
+def parse_file(abs_path,
+               split_by,
+               diagnostics=None):
+    """
+    Parse every launch of a raw data file without filtering by time.
+    :param abs_path: A path of a raw data file.
+    :param split_by: The 'split_by' option of a config, or None.
+    :param diagnostics: A Diagnostics object to collect the anomalies of the file, or None to
+    ignore them.
+    :return launch_info_lists: A LaunchInfoLists object.
+    """
+    parse_config = {'time_filter': [datetime.datetime.min, datetime.datetime.max],
+                    'keep_raw_records': False,
+                    'diagnostics': diagnostics}
+    if split_by:
+        parse_config['split_by'] = split_by
+    return launch_info.LaunchInfoLists.from_file(abs_path=abs_path, config_dict=parse_config)
+
+
+def get_changed_times(old_lists,
+                      new_lists):
+    """
+    Get the times of the launches which were added, removed or modified.
+    :param old_lists: The LaunchInfoLists object of a file before the change.
+    :param new_lists: The LaunchInfoLists object of a file after the change.
+    :return changed_times: A list of datetimes.
+    """
+    old_dict = {render_cache.get_record_digest(old_lists, i): old_lists.time[i]
+                for i in range(0, len(old_lists.time))}
+    new_dict = {render_cache.get_record_digest(new_lists, i): new_lists.time[i]
+                for i in range(0, len(new_lists.time))}
+    changed_times = [old_dict[digest] for digest in old_dict.keys() - new_dict.keys()]
+    changed_times.extend(new_dict[digest] for digest in new_dict.keys() - old_dict.keys())
+    return changed_times
+
+
+def is_affected(config_dict,
+                changed_set,
+                changed_times):
+    """
+    Check whether a config has to be re-rendered.
+    :param config_dict: A dictionary to control the plotting procedure.
+    :param changed_set: A set of changed filenames.
+    :param changed_times: A dictionary from (split key, filename) to changed launch times.
+    :return result: True if a changed launch is in the time range of the config.
+    """
+    split_key = get_split_key(config_dict)
+    time_start, time_end = config_dict['time_filter']
+    for filename in changed_set:
+        if config_dict.get('filename_filter', '') not in filename:
+            continue
+        if (split_key, filename) not in changed_times:
+            # a file this config has never loaded
+            return True
+        for time_obj in changed_times[(split_key, filename)]:
+            if time_start <= time_obj <= time_end:
+                return True
+    return False
+
+
+def watch_data(config_list,
+               data_dir,
+               plot_function,
+               force=False,
+               interval=DEFAULT_POLL_INTERVAL,
+               verbosity=None):
+    """
+    Run plot_launch in watch mode until interrupted.
+    :param config_list: A list of unprocessed configs from the JSON config file.
+    :param data_dir: A directory path contains several raw data files.
+    :param plot_function: A function(launch_info_lists, config_dict) to render a config.
+    :param force: Render every chart even if its outputs are up to date.
+    :param interval: Seconds between two scans of the polling watcher.
+    :param verbosity: The verbosity of the diagnostics, or None to follow the configs.
+    :return None:
+    """
+    watcher = get_watcher(data_dir, interval=interval)
+    session = WatchSession(config_list=config_list,
+                           data_dir=data_dir,
+                           plot_function=plot_function,
+                           force=force,
+                           verbosity=verbosity)
+    try:
+        session.run(watcher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
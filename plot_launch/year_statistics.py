@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Defines the cumulative statistics of orbital launches aligned by day of year, so that several
+years loaded at once can be compared on one axis.
+"""
+
+# Import built-in modules
+
+# Import third-party modules
+import numpy
+
+# Any changes to the path and your own modules
+from plot_launch import color_registry
+
+
+class YearStatistics:  # pylint: disable=too-few-public-methods
+    """
+    Class for the cumulative values of every year, or of every group in every year.
+    All series are accumulated by a single cumsum over launches sorted by series, which is
+    reset at the first launch of every series.
+    """
+
+    def __init__(self,
+                 launch_info_lists,
+                 metric='count',
+                 group_list=None,
+                 group_text=''):
+        """
+        Get the cumulative series of a metric.
+        :param launch_info_lists: A LaunchInfoLists object sorted by time.
+        :param metric: 'count' for every launch, 'energy' or 'mass' for successful launches.
+        :param group_list: A group to segment every year, or None to compare whole years.
+        :param group_text: A text string to describe the group.
+        """
+        self.metric = metric
+        self.group_text = group_text
+        time_array = numpy.array(launch_info_lists.time, dtype='datetime64[us]')
+        if metric == 'count':
+            value_array = numpy.ones(len(time_array), dtype=int)
+            mask = numpy.ones(len(time_array), dtype=bool)
+        else:
+            mask = numpy.array(launch_info_lists.launch_result, dtype=bool)
+            if metric == 'energy':
+                value_array = numpy.array(launch_info_lists.orbital_energy, dtype=int)
+            else:
+                value_array = numpy.round(
+                    launch_info_lists.payload_table.get_launch_totals('mass') * 1000).astype(int)
+        time_array = time_array[mask]
+        value_array = value_array[mask]
+
+        year_array = time_array.astype('datetime64[Y]')
+        self.offset_array = time_array - year_array
+        # time since the start of the year of every launch
+        self.years, year_codes = numpy.unique(year_array.astype(int) + 1970, return_inverse=True)
+        if group_list is None:
+            self.groups = numpy.array([''])
+            group_codes = numpy.zeros(len(time_array), dtype=int)
+        else:
+            self.groups, group_codes = numpy.unique(numpy.asarray(group_list)[mask],
+                                                    return_inverse=True)
+        self.color = color_registry.get_registry().get_colors(self.groups)
+
+        series_codes = year_codes * len(self.groups) + group_codes
+        self.order = numpy.argsort(series_codes, kind='stable')
+        # launches of every series in time order
+        sorted_codes = series_codes[self.order]
+        sorted_values = value_array[self.order]
+        self.starts = numpy.flatnonzero(numpy.diff(sorted_codes, prepend=-1))
+        self.ends = numpy.append(self.starts[1:], len(sorted_codes))
+        cumulative = numpy.cumsum(sorted_values)
+        resets = cumulative[self.starts] - sorted_values[self.starts]
+        self.cumulative_array = cumulative - numpy.repeat(resets, self.ends - self.starts)
+        self.series_years = self.years[sorted_codes[self.starts] // len(self.groups)]
+        self.series_groups = sorted_codes[self.starts] % len(self.groups)
+
+    def get_series(self,
+                   k):
+        """
+        Get a series of cumulative values.
+        :param k: The index of the series.
+        :return offsets, values: A timedelta64 array since the start of the year and the
+        cumulative values after every launch of the series.
+        """
+        indices = self.order[self.starts[k]:self.ends[k]]
+        return self.offset_array[indices], self.cumulative_array[self.starts[k]:self.ends[k]]